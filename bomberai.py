@@ -0,0 +1,203 @@
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+import array
+import time
+
+from levels import FIXED_SHIFT
+
+# --- Bomber AI Constants ---
+AI_BUDGET_US = const(1500) # Planning time allowed per frame, out of the 10 ms frame
+AI_CANDIDATE_STEP = const(4) # px between drop positions the planner scores
+AI_REACTION_TICKS = const(12) # How long a player takes to react to a new bomb
+AI_MAX_BOMBS = const(16)
+# Bucket movement, as in Player.update (8.8 fixed point)
+BUCKET_MAX_SPEED = const(1536)
+BUCKET_ACCEL = const(256)
+BUCKET_RAMP_TICKS = BUCKET_MAX_SPEED // BUCKET_ACCEL
+BUCKET_RAMP_DISTANCE = BUCKET_ACCEL * BUCKET_RAMP_TICKS * (BUCKET_RAMP_TICKS + 1) // 2
+
+def bucket_reach(ticks):
+    """Pixels a bucket starting from rest can cover in ticks."""
+    if ticks <= 0:
+        return 0
+    if ticks <= BUCKET_RAMP_TICKS:
+        return (BUCKET_ACCEL * ticks * (ticks + 1) // 2) >> FIXED_SHIFT
+    return (BUCKET_RAMP_DISTANCE + (ticks - BUCKET_RAMP_TICKS) * BUCKET_MAX_SPEED) >> FIXED_SHIFT
+
+def approach(x, target, velocity):
+    """One bomber move from fixed-point x toward pixel target, stopping on it."""
+    target <<= FIXED_SHIFT
+    if abs(target - x) <= velocity:
+        return target
+    return x + velocity if target > x else x - velocity
+
+# --- BomberPlanner Class ---
+class BomberPlanner:
+    """Picks where the bomber should drop next, a few candidates per frame.
+
+    begin() takes a snapshot of the bomber, the bucket and every bomb in
+    flight. Each bomb already falling is a place the bucket has to be when
+    it lands, so a new bomb is scored by how far it lands from where the
+    bucket must be just before and just after it, less the distance the
+    bucket can cover in between. run() scores candidate drop positions
+    until the per-frame budget would be exceeded, then returns; the plan
+    finishes over as many frames as it needs and only then moves target.
+    The snapshot is a few frames old by then, which the reaction margin
+    covers. Positions are screen pixels; unit is screen pixels per 320x240
+    layout pixel, which the bucket's speeds and step are given in.
+    """
+    def __init__(self, left, right, bomb_width, bucket_width, drop_y, catch_y, screen_width,
+                 budget_us=AI_BUDGET_US, step=AI_CANDIDATE_STEP, unit=1):
+        self.left = left
+        self.right = right # Rightmost bomber x
+        self.bomb_width = bomb_width
+        self.bucket_width = bucket_width
+        self.max_center = screen_width - bucket_width // 2 # The bucket stops at the screen's right edge
+        self.catch_y = catch_y # Bucket's top edge
+        self.fall_px = catch_y - drop_y # From a new bomb's bottom edge
+        self.budget_ns = budget_us * 1000
+        self.step = step * unit
+        self.unit = unit
+        self.target = left
+        self.planning = False
+        # Snapshot, filled by begin() and add_bomb()
+        self.bomb_x = array.array("h", [0] * AI_MAX_BOMBS) # Center px
+        self.bomb_land = array.array("h", [0] * AI_MAX_BOMBS) # Ticks until it reaches the bucket
+        self.bomb_count = 0
+        self.bomber_x = 0
+        self.bucket_center = 0
+        self.move_ticks = 1 # Per move of the bomber
+        self.step_velocity = 1 << FIXED_SHIFT # Per move
+        self.drop_velocity = 1 << FIXED_SHIFT
+        self.fall_ticks = 0
+        self.wait = 0
+        self.candidate = 0
+        self.best_x = 0
+        self.best_score = 0
+        self.eval_ns = 0 # Slowest candidate last slice; that much is kept free at the end of each slice
+        # Totals, for report()
+        self.frames = 0
+        self.plans = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.over_budget = 0
+
+    def begin(self, bomber_x, bucket_x, bucket_vx, step_velocity, bomber_speed, drop_velocity, wait):
+        """Start a new plan from the current positions (pixels; velocities 8.8 fixed point).
+
+        wait is the ticks until the next drop is allowed; a far target
+        lands that much later, which score() accounts for.
+        """
+        self.bomber_x = bomber_x
+        self.wait = wait
+        # Where the bucket is heading by the time a player could react to anything new
+        center = bucket_x + self.bucket_width // 2 + ((bucket_vx * AI_REACTION_TICKS) >> FIXED_SHIFT)
+        self.bucket_center = min(max(center, self.bucket_width // 2), self.max_center)
+        self.move_ticks = bomber_speed
+        self.step_velocity = step_velocity
+        self.drop_velocity = drop_velocity
+        self.fall_ticks = ((self.fall_px << FIXED_SHIFT) + drop_velocity - 1) // drop_velocity
+        self.bomb_count = 0
+        self.candidate = self.left
+        self.best_x = bomber_x
+        self.best_score = -0x7FFF
+        self.planning = True
+
+    def add_bomb(self, x, bottom_y):
+        """Add a bomb in flight: left edge x and bottom edge y, in pixels."""
+        if self.bomb_count >= AI_MAX_BOMBS:
+            return
+        remaining = (((self.catch_y - bottom_y) << FIXED_SHIFT) + self.drop_velocity - 1) // self.drop_velocity
+        if remaining < 0:
+            return # Already past the bucket
+        self.bomb_x[self.bomb_count] = x + self.bomb_width // 2
+        self.bomb_land[self.bomb_count] = remaining
+        self.bomb_count += 1
+
+    def score(self, x):
+        """How badly the bucket is placed to catch a bomb dropped at x. Higher is better for the bomber."""
+        travel = (abs(x - self.bomber_x) << FIXED_SHIFT) // self.step_velocity * self.move_ticks
+        land = max(travel, self.wait) + self.fall_ticks # The drop waits for the bomber to get there
+        center = x + self.bomb_width // 2
+        # The bucket's last and next appointments around this landing
+        before_center = self.bucket_center
+        before_gap = land - AI_REACTION_TICKS
+        after_gap = 0x7FFF
+        after_center = center
+        bomb_x, bomb_land = self.bomb_x, self.bomb_land
+        for i in range(self.bomb_count):
+            when = bomb_land[i]
+            if when <= land:
+                if land - when < before_gap:
+                    before_gap = land - when
+                    before_center = bomb_x[i]
+            elif when - land < after_gap:
+                after_gap = when - land
+                after_center = bomb_x[i]
+        catch_width = (self.bucket_width + self.bomb_width) // 2
+        unit = self.unit
+        margin = abs(center - before_center) - catch_width - bucket_reach(before_gap) * unit
+        if after_gap != 0x7FFF:
+            margin = min(margin, abs(after_center - center) - catch_width - bucket_reach(after_gap) * unit)
+        return margin
+
+    def run(self):
+        """Score candidates until this frame's budget is spent. Returns True when the plan is done."""
+        if not self.planning:
+            return False
+        start = time.monotonic_ns()
+        deadline = start + self.budget_ns
+        reserve = self.eval_ns
+        eval_ns = 0
+        step, right = self.step, self.right
+        first = x = self.candidate
+        now = start
+        while x <= right:
+            if x != first and now + reserve > deadline:
+                break # The next candidate might not fit; the first always runs so plans finish
+            score = self.score(x)
+            if score > self.best_score:
+                self.best_score = score
+                self.best_x = x
+            x += step
+            then = now
+            now = time.monotonic_ns()
+            if now - then > eval_ns:
+                eval_ns = now - then
+                if eval_ns > reserve:
+                    reserve = eval_ns
+        self.eval_ns = eval_ns
+        self.candidate = x
+        spent = now - start
+        self.frames += 1
+        self.total_ns += spent
+        if spent > self.max_ns:
+            self.max_ns = spent
+        if spent > self.budget_ns:
+            self.over_budget += 1
+        if x <= right:
+            return False
+        self.target = self.best_x
+        self.planning = False
+        self.plans += 1
+        return True
+
+    def ready_to_drop(self, x, waited, interval):
+        """Drop once the interval is up and the bomber is on target, or after twice the interval regardless."""
+        if waited < interval:
+            return False
+        return x == self.target or waited >= 2 * interval
+
+    def report(self, out=None):
+        frames = max(self.frames, 1)
+        line = (f"bomber ai budget={self.budget_ns // 1000}us avg={self.total_ns // frames // 1000}us "
+                f"max={self.max_ns // 1000}us over_budget={self.over_budget} plans={self.plans} "
+                f"frames_per_plan={self.frames / max(self.plans, 1):.1f}")
+        if out is None:
+            print(line)
+        else:
+            out.write(line + "\n")
@@ -1,17 +1,32 @@
 from micropython import const
-import sys
 import time
+BOOT_START_NS = time.monotonic_ns() # Start of the boot timeline
+import sys
 import supervisor
-from displayio import Group,TileGrid,Palette,Bitmap,OnDiskBitmap
-from adafruit_display_text.text_box import TextBox
-from adafruit_fruitjam.peripherals import request_display_config, Peripherals
+from displayio import Group,TileGrid,Palette,Bitmap
 import random
 import gc
+import struct
+import binascii
 import terminalio
 from adafruit_display_text.bitmap_label import Label
 import array
-import math
-import audiocore
+import bitmaptools
+from highscores import HighScoreTable, HIGH_SCORE_NVM_OFFSET, HIGH_SCORE_NVM_LENGTH
+from levels import (load_levels, LevelTable, FRAME_BUDGET_US, FIXED_SHIFT, SPLASH_STAGE_TICKS, SPLASH_TICKS,
+                    LEVEL_BOMB_COUNT, LEVEL_BOMB_SCORE, LEVEL_DROP_SPEED, LEVEL_DROP_LB, LEVEL_DROP_UB, LEVEL_BOMBER_SPEED, LEVEL_ENEMY_STEP,
+                    LEVEL_CHANGE_LB, LEVEL_CHANGE_UB, LEVEL_DROP_FIXED, LEVEL_CHANGE_FIXED,
+                    LEVEL_DROP_VELOCITY, LEVEL_STEP_VELOCITY, LEVEL_AI_TIER)
+from bomberai import BomberPlanner, approach
+from hidinput import find_hid_inputs, HeldKeys
+from leaderboard import open_leaderboard
+from netplay import (open_link, connect_socket_pool, RollbackSession, input_bits, input_direction,
+                     INPUT_DROP, FLAG_READY)
+from telemetry import (Telemetry, EVENT_BOOT, EVENT_SPAWN, EVENT_CATCH,
+                       EVENT_MISS, EVENT_LEVEL, EVENT_OVERRUN, EVENT_QUALITY, EVENT_FRAMESKIP, LatencyTracker,
+                       HOP_AVAILABLE, HOP_DECODED, HOP_APPLIED, HOP_REFRESHED)
+# OnDiskBitmap, audiocore, math and adafruit_fruitjam.peripherals are imported
+# where they are first needed so the title can show sooner
 
 # --- Game Constants ---
 MAX_BUCKETS = const(3)
@@ -21,8 +36,112 @@ STATE_READY = const(1)
 STATE_PAUSED = const(2)
 STATE_GAME_OVER = const(3)
 STATE_TITLE = const(4)
+# Layout: positions and speeds below (and in levels.json) are in pixels of a
+# 320x240 screen. The game multiplies them by Game.unit, the screen pixels per
+# layout pixel, so the same layout fills a 640x480 display
+DISPLAY_WIDTH = const(320) # Or 640x480; requested at startup
+DISPLAY_HEIGHT = const(240)
+LAYOUT_HEIGHT = const(240)
+ART_SCALE = const(2) # Screen pixels per sprite pixel at 320x240
+TITLE_ART_SCALE = const(5) # Same, for the title bomb and explosion
 BUCKET_TOP_Y = const(164)
+BUCKET_CATCH_Y = const(20) # From the bucket's top edge to where it catches
+BOMBER_START_X = const(10)
+BOMBER_START_Y = const(4)
+BOMBER_LEFT_X = const(8) # The bomber stops this far from the left edge
+BOMBER_WIDTH = const(32) # Keeps the bomber this far from the right edge
+BOMB_DROP_Y = const(25) # Top edge of a new bomb
 DEBUG_START_LEVEL = const(1) # Set this to 1 for normal play, or any level to test
+DEBUG_PARTICLE_BENCHMARK = const(0) # Set to 1 to time the particle system at boot
+DEBUG_RESOLUTION_BENCHMARK = const(0) # Set to 1 to time gameplay frames at 320x240 and 640x480 at boot
+DEBUG_LATENCY = const(0) # Set to 1 to time key press -> refresh (turns off auto-refresh)
+DEBUG_OVERLAY = const(0) # Set to 1 to show the quality level and frame time in a corner
+DEBUG_STATS = const(0) # Set to 1 to print barrage, explosion pool and idle CPU stats to the serial console
+WAVE_CHUNK = const(2048) # Samples generated per staged-startup step
+
+# Draw layers, bottom to top
+LAYER_BACKGROUND = const(0)
+LAYER_WALLS = const(1)
+LAYER_BOMBS = const(2)
+LAYER_CHARACTERS = const(3)
+LAYER_EFFECTS = const(4)
+LAYER_HUD = const(5)
+LAYER_COUNT = const(6)
+MAX_BOMBS = const(16) # Pre-attached bomb slots
+MOTION_SLOTS = MAX_BOMBS + 2 # Every bomb, plus the bucket and the bomber
+FIXED_HALF = const(128) # Rounds 8.8 fixed point to the nearest pixel
+# Held-key bucket movement, in 8.8 fixed point px/tick
+BUCKET_MAX_SPEED = const(1536) # 6 px/tick
+BUCKET_ACCEL = const(256) # Per tick while a direction is held
+BUCKET_FRICTION = const(512) # Per tick once it is released
+P2_DROP_TICKS = const(50) # P2 bomb drop rate limit
+MAX_EXPLOSIONS = const(32) # Explosion pool capacity
+MISS_EXPLOSION_FRAMES = const(100) # ~1 second at 100 Hz
+GAME_OVER_EXPLOSION_FRAMES = const(200) # ~2 seconds
+TITLE_EXPLOSION_FRAMES = const(60)
+
+# Fixed-rate simulation: refreshes give way when a tick runs late
+TICK_NS = const(10000000) # 100 Hz
+MAX_FRAME_SKIP = const(3) # Refreshes skipped in a row at most, so the screen still moves
+MAX_TICK_LAG_NS = const(100000000) # Further behind than this, the schedule restarts instead of catching up
+
+# Idle screens (title, READY, game over) slow down while nothing happens
+IDLE_TICK_NS = const(100000000) # 10 Hz once the screen has been still for a while
+IDLE_LINGER_TICKS = const(50) # Full-rate ticks after the last key before slowing down
+IDLE_POLL_NS = const(10000000) # How often a sleeping idle tick checks for input
+IDLE_HID_EVERY = const(3) # USB devices are read on every third check
+IDLE_STATE_NAMES = ("playing", "ready", "paused", "game over", "title") # By state number
+
+# Quality governor: cosmetic work sheds in steps while frames run over budget
+QUALITY_WINDOW = const(50) # Frames per check (~0.5 seconds)
+QUALITY_DOWN_OVERRUNS = const(3) # Overruns in one window that step quality down
+QUALITY_UP_WINDOWS = const(4) # Clean windows in a row needed to step back up
+QUALITY_HEADROOM_PCT = const(70) # A clean window averages under this share of the budget
+# Per level: flicker every N frames, explosion sprites, particles per explosion,
+# splash in one palette change at each end, score digits redrawn every N frames
+QUALITY_LEVELS = (
+    (1, MAX_EXPLOSIONS, 16, False, 1), # Full
+    (4, MAX_EXPLOSIONS, 16, False, 1),
+    (4, 12, 8, False, 1),
+    (8, 6, 4, True, 1),
+    (16, 3, 0, True, 10),
+)
+
+# Suspend/resume snapshot, stored in NVM right after the high score log
+SNAPSHOT_MAGIC = const(0x5A)
+SNAPSHOT_NVM_OFFSET = HIGH_SCORE_NVM_OFFSET + HIGH_SCORE_NVM_LENGTH
+# magic, mode, level, level reached, buckets, surprised, bomber direction,
+# score, next extra life, bombs dropped, bomber x, bomber move/change ticks,
+# direction change, bomb drop ticks, drop interval, RNG seed (0 in network
+# tick states, which leave the RNG alone), live bombs.
+# Positions are layout px, so a game saved at one resolution resumes at the other
+SNAPSHOT_HEADER = "<BBBBBBbIIHhHHHHHIB"
+SNAPSHOT_HEADER_SIZE = struct.calcsize(SNAPSHOT_HEADER)
+SNAPSHOT_SIZE = SNAPSHOT_HEADER_SIZE + MAX_BOMBS * 4 + 4 # bomb (x, y) pairs, then CRC32 (NVM copies only)
+# Network play rewinds to per-tick states: a snapshot, then what it rounds
+# away. splash, splash count, game won, bucket x and velocity, bomber x.
+# These are screen px, so both boards must run at the same resolution
+TICK_STATE_FORMAT = "<BBBlll"
+TICK_STATE_SIZE = SNAPSHOT_SIZE + struct.calcsize(TICK_STATE_FORMAT) + MAX_BOMBS * 8 # Then bomb (x, y), 8.8 fixed point
+
+# Palette cycles (PaletteAnimator)
+PALETTE_TRANSPARENT = const(-1) # Table value that hides an entry
+FUSE_ENTRY = const(8) # Bomb fuse, flickers while a round is played
+SPLASH_ENTRIES = (9, 11, 12) # Bucket splash drops, lowest first; timing (SPLASH_TICKS) is in levels.py
+
+MAX_PARTICLES = const(512)
+PARTICLE_SHIFT = const(4) # Particle positions/velocities are 1/16 px fixed point
+PARTICLE_SIZE = const(2) # Particles are drawn as 2x2 layout px squares
+PARTICLE_GRAVITY = const(3) # 1/16 px per frame per frame
+PARTICLE_FADE = const(12) # Frames of life left when a particle turns dark
+
+# Barrage: endless stress mode, picked with '3' on the title screen
+MODE_BARRAGE = const(3) # game_mode value; 1 and 2 are the normal modes
+BARRAGE_BOMBS = const(384) # Bombs the field can hold in flight
+BARRAGE_DROP_SPEED = const(2) # Slow bombs so hundreds fit on screen
+BARRAGE_START_RATE = const(10) # Bombs per second at the start
+BARRAGE_RATE_STEP = const(5) # Added to the rate every report window
+BARRAGE_REPORT_FRAMES = const(100) # Frames per stats window (~1 second)
 
 # Title animation states
 TITLE_ANIM_START = const(0)
@@ -30,129 +149,45 @@ TITLE_ANIM_DROPPING = const(1)
 TITLE_ANIM_EXPLODING = const(2)
 TITLE_ANIM_DONE = const(3)
 
-# Levels parameter dictionary
-LEVELS = {
-    1: {
-        'bomberSpeed': 1,
-        'bombCount': 10,
-        'bombScore': 1,
-        'directionChangeLB': 80,
-        'directionChangeUB': 150,
-        'dropIntervalLB': 12,
-        'dropIntervalUB': 22,
-        'drop_speed': 4,
-        'successState': 1,
-        'enemy_step': 4 # This is P2's move speed in 2P, AI speed in 1P
-    },
-    2: {
-        'bomberSpeed': 1,
-        'bombCount': 15,
-        'bombScore': 2,
-        'directionChangeLB': 70,
-        'directionChangeUB': 140,
-        'dropIntervalLB': 10,
-        'dropIntervalUB': 20,
-        'drop_speed': 5,
-        'successState': 1,
-        'enemy_step': 4
-    },
-    3: {
-        'bomberSpeed': 1,
-        'bombCount': 20,
-        'bombScore': 3,
-        'directionChangeLB': 60,
-        'directionChangeUB': 120,
-        'dropIntervalLB': 8,
-        'dropIntervalUB': 18,
-        'drop_speed': 5,
-        'successState': 1,
-        'enemy_step': 5
-    },
-    4: {
-        'bomberSpeed': 1,
-        'bombCount': 25,
-        'bombScore': 4,
-        'directionChangeLB': 50,
-        'directionChangeUB': 100,
-        'dropIntervalLB': 7,
-        'dropIntervalUB': 16,
-        'drop_speed': 6,
-        'successState': 1,
-        'enemy_step': 5
-    },
-    5: {
-        'bomberSpeed': 1,
-        'bombCount': 30,
-        'bombScore': 5,
-        'directionChangeLB': 40,
-        'directionChangeUB': 80,
-        'dropIntervalLB': 6,
-        'dropIntervalUB': 13,
-        'drop_speed': 7,
-        'successState': 1,
-        'enemy_step': 6
-    },
-    6: {
-        'bomberSpeed': 1,
-        'bombCount': 40,
-        'bombScore': 6,
-        'directionChangeLB': 30,
-        'directionChangeUB': 70,
-        'dropIntervalLB': 5,
-        'dropIntervalUB': 10,
-        'drop_speed': 9,
-        'successState': 1,
-        'enemy_step': 6
-    },
-    7: {
-        'bomberSpeed': 1,
-        'bombCount': 50,
-        'bombScore': 7,
-        'directionChangeLB': 25,
-        'directionChangeUB': 60,
-        'dropIntervalLB': 4,
-        'dropIntervalUB': 8,
-        'drop_speed': 11,
-        'successState': 1,
-        'enemy_step': 7
-    },
-    8: {
-        'bomberSpeed': 1,
-        'bombCount': 60,
-        'bombScore': 8,
-        'directionChangeLB': 20,
-        'directionChangeUB': 50,
-        'dropIntervalLB': 3,
-        'dropIntervalUB': 6,
-        'drop_speed': 13,
-        'successState': 0,
-        'enemy_step': 8
-    }
-}
+# Level parameters are loaded from levels.json by levels.load_levels()
 
 # --- Audio Class ---
 class Audio:
     def __init__(self):
+        # Samples stay None until load() has generated them; play() skips them
+        self.sound_start = None
+        self.sound_catch = None
+        self.sound_miss = None
+        self.sound_level_up = None
+        self.sound_game_over = None
+        self.muted = False # Set while network play re-simulates ticks already heard
+
+    def load(self):
+        """Generator: set up the DAC, then build the samples a chunk per step."""
         try:
+            from adafruit_fruitjam.peripherals import Peripherals
             self.fruit_jam = Peripherals()
             self.fruit_jam.dac.headphone_output = True
             self.fruit_jam.dac.dac_volume = 0
             self.sample_rate = self.fruit_jam.dac.sample_rate
 
-            # Generate sound samples
-            self.sound_start = self._generate_sample(440, 0.1) # 100ms A4
-            self.sound_catch = self._generate_sample(880, 0.05) # 50ms A5
-            self.sound_miss = self._generate_sample(165, 0.3) # 300ms E3
-            self.sound_level_up = self._generate_sample(523, 0.2) # 200ms C5
-            self.sound_game_over = self._generate_sample(110, 1.0) # 1s A2
-
         except (ImportError, AttributeError, OSError):
             print("Fruit Jam peripherals not found. Running without sound.")
             # Create dummy functions if hardware isn't present
             self.play = self._dummy_play
             self.stop = self._dummy_play
+            return
+        yield
+
+        # Generate sound samples
+        self.sound_start = yield from self._generate_sample(440, 0.1) # 100ms A4
+        self.sound_catch = yield from self._generate_sample(880, 0.05) # 50ms A5
+        self.sound_miss = yield from self._generate_sample(165, 0.3) # 300ms E3
+        self.sound_level_up = yield from self._generate_sample(523, 0.2) # 200ms C5
+        self.sound_game_over = yield from self._generate_sample(110, 1.0) # 1s A2
 
     def _generate_wave(self, frequency, duration_seconds):
+        import math
         length = int(duration_seconds * self.sample_rate)
         if frequency == 0: # For silence
              return array.array("h", [0] * length)
@@ -168,14 +203,19 @@ class Audio:
         sine_wave = array.array("h", [0] * length)
         for i in range(length):
             sine_wave[i] = sine_wave_cycle[i % int(period)]
+            if i % WAVE_CHUNK == WAVE_CHUNK - 1:
+                yield
 
         return sine_wave
 
     def _generate_sample(self, frequency, duration):
-        wave = self._generate_wave(frequency, duration)
+        import audiocore
+        wave = yield from self._generate_wave(frequency, duration)
         return audiocore.RawSample(wave, sample_rate=self.sample_rate)
 
     def play(self, sample, loop=False):
+        if sample is None or self.muted:
+            return
         if hasattr(self, 'fruit_jam') and self.fruit_jam.audio.playing:
             self.fruit_jam.audio.stop()
         if hasattr(self, 'fruit_jam'):
@@ -185,23 +225,34 @@ class Audio:
         if hasattr(self, 'fruit_jam') and self.fruit_jam.audio.playing:
             self.fruit_jam.audio.stop()
 
-    def _dummy_play(self, sample, loop=False):
+    def _dummy_play(self, sample=None, loop=False):
         pass # Do nothing if audio hardware fails
 
 # --- SpriteManager Class ---
 class SpriteManager:
-    def __init__(self):
+    """Sprite art, turned into shared Bitmaps pre-scaled for the display.
+
+    Sprites are drawn with x/y, tile and grid sizes in art pixels; every
+    Bitmap is built at scale screen pixels per art pixel once, so sprite
+    Groups draw at scale 1. A grid size of None repeats the tile to the
+    screen edge.
+    """
+    def __init__(self, scale=ART_SCALE, width=DISPLAY_WIDTH, height=DISPLAY_HEIGHT):
+        self.scale = scale
+        self.width = width
+        self.height = height
         self.palette = self._setup_palette()
+        self.bitmaps = {} # (name, scale): built once and shared by every TileGrid
         self.SPRITES = {
             "top_wall": {
                 "bitmap": 'top_wall', "w": 16, "h": 8, "p": 16,
                 "value_map": [3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,3,2,2,2,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4,4],
-                "tile_grid": 'top_wall_sprite', "map_tg": True, "tile_w": 16, "tile_h": 8, "grid_w": 40, "grid_h": 1, "x": 0, "y": 25
+                "tile_grid": 'top_wall_sprite', "map_tg": True, "tile_w": 16, "tile_h": 8, "grid_w": None, "grid_h": 1, "x": 0, "y": 25
             },
             "wall": {
                 "bitmap": 'wall', "w": 14, "h": 6, "p": 16,
                 "value_map": [3,3,3,3,3,3,3,3,3,3,3,3,3,3,2,2,2,3,2,2,2,2,2,2,3,2,2,2,2,2,2,3,2,2,2,2,2,2,3,2,2,2,3,3,3,3,3,3,3,3,3,3,3,3,3,3,3,2,2,2,2,2,2,3,2,2,2,2,2,2,3,2,2,2,2,2,2,3,2,2,2,2,2,2],
-                "tile_grid": 'wall_sprite', "map_tg": True, "tile_w": 14, "tile_h": 6, "grid_w": 23, "grid_h": 40, "x": 0, "y": 32
+                "tile_grid": 'wall_sprite', "map_tg": True, "tile_w": 14, "tile_h": 6, "grid_w": None, "grid_h": None, "x": 0, "y": 32
             },
             "bomb":  {
                 "bitmap": 'bomb', "w": 8, "h": 12, "p": 16,
@@ -298,7 +349,7 @@ class SpriteManager:
         gc.collect()
         return pallette
 
-    def _map_values_to_bitmap(self, bitmap, value_map, w, h):
+    def _map_values_to_bitmap(self, bitmap, value_map, w, h, scale=1):
         for y in range(h):
             for x in range(w):
                 idx = y * w + x
@@ -310,7 +361,10 @@ class SpriteManager:
                 else:
                     # Fall back to transparent / empty if the value_map is shorter than w*h
                     value = 0
-                bitmap[x, y] = value
+                if scale == 1:
+                    bitmap[x, y] = value
+                else:
+                    bitmaptools.fill_region(bitmap, x * scale, y * scale, (x + 1) * scale, (y + 1) * scale, value)
 
     def _map_bitmap_to_tilegrid(self, tilegrid, item, w, h):
         # iterate full grid width/height (0..w-1, 0..h-1)
@@ -318,22 +372,35 @@ class SpriteManager:
             for x in range(w):
                 tilegrid[x, y] = item
 
-    def create_sprite(self, sprite_name, new_x=None, new_y=None):
+    def get_bitmap(self, sprite_name, scale=None):
+        """The shared Bitmap for a sprite at scale (default: the display's), built on first use."""
+        scale = scale or self.scale
+        key = (sprite_name, scale)
+        bitmap = self.bitmaps.get(key)
+        if bitmap is None:
+            sprite_data = self.SPRITES[sprite_name]
+            w, h, p = sprite_data["w"], sprite_data["h"], sprite_data["p"]
+            bitmap = Bitmap(w * scale, h * scale, p)
+            self._map_values_to_bitmap(bitmap, sprite_data["value_map"], w, h, scale)
+            self.bitmaps[key] = bitmap
+        return bitmap
+
+    def create_sprite(self, sprite_name, new_x=None, new_y=None, scale=None):
+        """A TileGrid of a sprite; new_x/new_y are screen pixels, the sprite's own x/y art pixels."""
         sprite_data = self.SPRITES.get(sprite_name)
         if not sprite_data:
             raise ValueError(f"Sprite '{sprite_name}' not found.")
 
-        w, h, p = sprite_data["w"], sprite_data["h"], sprite_data["p"]
-        value_map = sprite_data["value_map"]
+        scale = scale or self.scale
         map_tg = sprite_data["map_tg"]
-        tile_w, tile_h = sprite_data["tile_w"], sprite_data["tile_h"]
-        grid_w, grid_h = sprite_data["grid_w"], sprite_data["grid_h"]
+        tile_w, tile_h = sprite_data["tile_w"] * scale, sprite_data["tile_h"] * scale
 
-        x = new_x if new_x is not None else sprite_data["x"]
-        y = new_y if new_y is not None else sprite_data["y"]
+        x = new_x if new_x is not None else sprite_data["x"] * scale
+        y = new_y if new_y is not None else sprite_data["y"] * scale
+        grid_w = sprite_data["grid_w"] or (self.width - x + tile_w - 1) // tile_w
+        grid_h = sprite_data["grid_h"] or (self.height - y + tile_h - 1) // tile_h
 
-        bitmap = Bitmap(w, h, p)
-        self._map_values_to_bitmap(bitmap, value_map, w, h)
+        bitmap = self.get_bitmap(sprite_name, scale)
         tile_grid = TileGrid(bitmap, pixel_shader=self.palette,
                              width=grid_w, height=grid_h,
                              tile_width=tile_w, tile_height=tile_h,
@@ -343,67 +410,336 @@ class SpriteManager:
             self._map_bitmap_to_tilegrid(tile_grid, 0, grid_w, grid_h)
         return tile_grid
 
+# --- PaletteAnimator Class ---
+class PaletteCycle:
+    """One palette animation: a precomputed table of values per palette entry.
+
+    Every table has the same length and holds colours or
+    PALETTE_TRANSPARENT. The step shown is (clock + phase) // rate. A
+    looping cycle runs on the animator's frame clock and wraps; any other
+    cycle follows the clock its owner sets (for the splash, a counter in
+    the simulation) and holds on its last step.
+    """
+    def __init__(self, entries, tables, rate=1, phase=0, loop=True):
+        self.entries = entries
+        self.tables = tables
+        self.length = len(tables[0])
+        self.rate = rate
+        self.phase = phase
+        self.loop = loop
+        self.clock = 0
+        self.shown = -1 # Step last written; -1 forces a write
+
+    def set_tables(self, tables):
+        self.tables = tables
+        self.shown = -1
+
+class PaletteAnimator:
+    """Advances every palette cycle in one step per frame.
+
+    step() works out each cycle's table step and skips cycles whose step
+    hasn't changed. Entries are written only when their value differs from
+    the last one written, so frames where nothing changes leave the
+    palette, and the display, untouched.
+    """
+    def __init__(self, palette):
+        self.palette = palette
+        self.cycles = []
+        self.frame = 0
+        self.written = [None] * len(palette) # Last value written per entry; None until the first
+
+    def add(self, cycle):
+        self.cycles.append(cycle)
+        return cycle
+
+    def step(self):
+        self.frame += 1
+        palette, written = self.palette, self.written
+        for cycle in self.cycles:
+            position = ((self.frame if cycle.loop else cycle.clock) + cycle.phase) // cycle.rate
+            if cycle.loop:
+                position %= cycle.length
+            elif position >= cycle.length:
+                position = cycle.length - 1
+            if position == cycle.shown:
+                continue
+            cycle.shown = position
+            entries, tables = cycle.entries, cycle.tables
+            for i in range(len(entries)):
+                entry = entries[i]
+                value = tables[i][position]
+                last = written[entry]
+                if value == last:
+                    continue
+                written[entry] = value
+                if value == PALETTE_TRANSPARENT:
+                    palette.make_transparent(entry)
+                else:
+                    if last is None or last == PALETTE_TRANSPARENT:
+                        palette.make_opaque(entry)
+                    palette[entry] = value
+
+def splash_tables(color, cheap=False):
+    """Tables for the splash cycle over SPLASH_ENTRIES: hidden, then one stage per entry.
+
+    The cheap version shows the lowest drops for the whole splash, one
+    palette change at each end.
+    """
+    off = PALETTE_TRANSPARENT
+    if cheap:
+        return ((off, color, color, color), (off, off, off, off), (off, off, off, off))
+    return ((off, color, off, off), (off, off, color, off), (off, off, off, color))
+
+# --- ScoreDisplay Class ---
+class ScoreDisplay:
+    """Fixed-width score readout drawn from a strip of digit glyphs.
+
+    Tile 0 of the strip is blank and tiles 1-10 hold '0'-'9', so a new
+    score only rewrites the tile indices of the digits that changed.
+    """
+    def __init__(self, font, color, x, y, digits=8):
+        glyph_w, glyph_h = font.get_bounding_box()[:2]
+        self.digits = digits
+        self.value = -1
+
+        self.bitmap = Bitmap(glyph_w * 11, glyph_h, 2)
+        font_bitmap = None
+        for i in range(10):
+            glyph = font.get_glyph(ord("0") + i)
+            if font_bitmap is None:
+                font_bitmap = glyph.bitmap
+            tiles_per_row = font_bitmap.width // glyph_w
+            src_x = (glyph.tile_index % tiles_per_row) * glyph_w
+            src_y = (glyph.tile_index // tiles_per_row) * glyph_h
+            dst_x = (i + 1) * glyph_w
+            for gy in range(glyph_h):
+                for gx in range(glyph_w):
+                    self.bitmap[dst_x + gx, gy] = font_bitmap[src_x + gx, src_y + gy]
+
+        self.palette = Palette(2)
+        self.palette[1] = color
+        self.palette.make_transparent(0)
+
+        self.tile_grid = TileGrid(self.bitmap, pixel_shader=self.palette,
+                                  width=digits, height=1,
+                                  tile_width=glyph_w, tile_height=glyph_h,
+                                  x=x, y=y)
+        # Mirror of the tile indices currently shown, so unchanged digits are skipped
+        self._tiles = bytearray(digits)
+        self.set_value(0)
+
+    @property
+    def hidden(self):
+        return self.tile_grid.hidden
+
+    @hidden.setter
+    def hidden(self, value):
+        self.tile_grid.hidden = value
+
+    def set_value(self, value):
+        """Right-align value and rewrite only the digit tiles that changed."""
+        value = int(value)
+        if value == self.value:
+            return
+        self.value = value
+
+        tiles = self._tiles
+        for i in range(self.digits - 1, -1, -1):
+            if value or i == self.digits - 1:
+                tile = value % 10 + 1
+                value //= 10
+            else:
+                tile = 0 # Leading blank
+            if tiles[i] != tile:
+                tiles[i] = tile
+                self.tile_grid[i, 0] = tile
+
+# --- LabelRegistry Class ---
+class LabelRegistry:
+    """Creates every on-screen message once and reuses it.
+
+    Screens only change text, colour, position and visibility, so switching
+    between them never constructs a Label or searches a Group.
+    """
+    def __init__(self, font):
+        self.font = font
+        self.labels = {}
+
+    def add(self, name, group, text, color=0xFFFFFF, x=0, y=0):
+        label = Label(self.font, text=text, color=color, x=x, y=y)
+        label.hidden = True
+        group.append(label)
+        self.labels[name] = label
+        return label
+
+    def set(self, name, text=None, color=None, x=None, y=None):
+        """Update a label in place, skipping properties that already match."""
+        label = self.labels[name]
+        if text is not None and label.text != text:
+            label.text = text
+        if color is not None and label.color != color:
+            label.color = color
+        if x is not None:
+            label.x = x
+        if y is not None:
+            label.y = y
+        return label
+
+    def show(self, name, text=None, color=None, x=None, y=None):
+        label = self.set(name, text, color, x, y)
+        label.hidden = False
+        return label
+
+    def hide(self, *names):
+        for name in names:
+            self.labels[name].hidden = True
+
+# --- Scene Class ---
+class Scene:
+    """Fixed draw layers, created once and never reordered.
+
+    Entities are pre-attached to their layer and shown or hidden in place,
+    so nothing is inserted into or searched for in the root group at runtime.
+    """
+    def __init__(self):
+        self.root = Group()
+        self.layers = []
+        for _ in range(LAYER_COUNT):
+            layer = Group()
+            self.root.append(layer)
+            self.layers.append(layer)
+
+    def layer(self, index):
+        return self.layers[index]
+
+# --- Motion Class ---
+class Motion:
+    """Fixed-point positions and velocities for every moving Group.
+
+    Each Group that moves gets a slot in preallocated 8.8 fixed-point
+    arrays. Simulation code only adds integers to the arrays; the Group is
+    given the position rounded to a whole pixel, so speeds can be a
+    fraction of a pixel per tick without any floats in the hot path.
+    """
+    def __init__(self, capacity):
+        self.x = array.array("l", [0] * capacity)
+        self.y = array.array("l", [0] * capacity)
+        self.vx = array.array("l", [0] * capacity)
+        self.vy = array.array("l", [0] * capacity)
+        self.groups = []
+
+    def add(self, group):
+        """Give group a slot, starting at its current pixel position. Returns the slot index."""
+        index = len(self.groups)
+        self.groups.append(group)
+        self.set_position(index, group.x, group.y)
+        return index
+
+    def set_position(self, index, x, y):
+        """Place a slot at whole pixel (x, y)."""
+        self.x[index] = x << FIXED_SHIFT
+        self.y[index] = y << FIXED_SHIFT
+        group = self.groups[index]
+        group.x = x
+        group.y = y
+
+    def set_x(self, index, x):
+        self.set_position(index, x, self.groups[index].y)
+
+    def set_fixed(self, index, x, y):
+        """Place a slot at fixed-point (x, y), keeping the sub-pixel part."""
+        self.x[index] = x
+        self.y[index] = y
+        group = self.groups[index]
+        group.x = (x + FIXED_HALF) >> FIXED_SHIFT
+        group.y = (y + FIXED_HALF) >> FIXED_SHIFT
+
+    def step(self, index):
+        """Advance one slot by its velocity for one tick."""
+        x = self.x[index] + self.vx[index]
+        y = self.y[index] + self.vy[index]
+        self.x[index] = x
+        self.y[index] = y
+        group = self.groups[index]
+        group.x = (x + FIXED_HALF) >> FIXED_SHIFT
+        group.y = (y + FIXED_HALF) >> FIXED_SHIFT
+
 # --- Player Class (P1 - Bucket) ---
 class Player:
-    def __init__(self, sprite_manager, main_group, scale, display):
+    def __init__(self, sprite_manager, layer, unit, display, motion):
         self.sprite_manager = sprite_manager
-        self.main_group = main_group
-        self.scale = scale
+        self.motion = motion
+        self.layer = layer
+        self.unit = unit # Screen px per layout px
         self.display = display
         self.bucket_count = MAX_BUCKETS
-
-        self.sprite = self.sprite_manager.create_sprite("bucket3")
-
-        bx = self.display.width // 2 - (self.sprite.tile_width * self.sprite.width * self.scale) // 2
-        by = BUCKET_TOP_Y
-
-        self.group = Group(scale=self.scale, x=bx, y=by)
-        self.group.append(self.sprite)
-        self.main_group.append(self.group)
+        self.accel = BUCKET_ACCEL * unit
+        self.max_speed = BUCKET_MAX_SPEED * unit
+        self.friction = BUCKET_FRICTION * unit
+
+        # One pre-attached sprite per bucket count, index 0 unused
+        self.sprites = [None,
+                        self.sprite_manager.create_sprite("bucket1"),
+                        self.sprite_manager.create_sprite("bucket2"),
+                        self.sprite_manager.create_sprite("bucket3")]
+        self.sprite = self.sprites[MAX_BUCKETS]
+
+        bx = self.display.width // 2 - (self.sprite.tile_width * self.sprite.width) // 2
+        by = BUCKET_TOP_Y * unit
+
+        self.group = Group(x=bx, y=by)
+        for sprite in self.sprites[1:]:
+            sprite.hidden = sprite is not self.sprite
+            self.group.append(sprite)
+        self.layer.append(self.group)
+        self.index = self.motion.add(self.group)
 
     def set_buckets(self, count):
         self.bucket_count = count
-        if self.sprite in self.group:
-            self.group.remove(self.sprite)
-
-        if self.bucket_count == 3:
-            self.sprite = self.sprite_manager.create_sprite("bucket3")
-        elif self.bucket_count == 2:
-            self.sprite = self.sprite_manager.create_sprite("bucket2")
-        elif self.bucket_count == 1:
-            self.sprite = self.sprite_manager.create_sprite("bucket1")
-
-        self.group.append(self.sprite)
+        if 1 <= count <= MAX_BUCKETS:
+            self.sprite.hidden = True
+            self.sprite = self.sprites[count]
+            self.sprite.hidden = False
 
         # Recenter
-        bx = self.display.width // 2 - (self.sprite.tile_width * self.sprite.width * self.scale) // 2
-        self.group.x = bx
-
-    def move(self, direction_char):
-        bucket_move = False
-        bucket_x = self.group.x
-
-        if direction_char in ("a", "A"):
-            bucket_x -= self.sprite.tile_width * self.scale
-            bucket_move = True
-        if direction_char in ("d", "D"):
-            bucket_x += self.sprite.tile_width * self.scale
-            bucket_move = True
-
-        if bucket_move:
-            if bucket_x <= 0:
-                bucket_x = 0
-            elif bucket_x > self.display.width - (self.sprite.tile_width * self.scale):
-                bucket_x = self.display.width - (self.sprite.tile_width * self.scale)
+        bx = self.display.width // 2 - (self.sprite.tile_width * self.sprite.width) // 2
+        self.motion.vx[self.index] = 0
+        self.motion.set_x(self.index, bx)
+
+    def update(self, direction):
+        """Accelerate toward the held direction (-1, 0 or 1) and move one tick."""
+        vx = self.motion.vx[self.index]
+        if direction:
+            if vx * direction < 0:
+                vx = 0 # Turning round stops dead first
+            vx += direction * self.accel
+            if vx > self.max_speed:
+                vx = self.max_speed
+            elif vx < -self.max_speed:
+                vx = -self.max_speed
+        elif vx > 0:
+            vx = max(vx - self.friction, 0)
+        elif vx < 0:
+            vx = min(vx + self.friction, 0)
+        self.motion.vx[self.index] = vx
+        if not vx:
+            return
+        self.motion.step(self.index)
 
-            self.group.x = bucket_x
+        max_x = self.display.width - self.sprite.tile_width
+        if self.group.x <= 0:
+            self.motion.set_x(self.index, 0)
+            self.motion.vx[self.index] = 0
+        elif self.group.x > max_x:
+            self.motion.set_x(self.index, max_x)
+            self.motion.vx[self.index] = 0
 
     def get_rect(self):
         # Return collision rectangle
         bucket_left = self.group.x
-        bucket_right = self.group.x + (self.sprite.tile_width * self.sprite.width * self.scale)
-        bucket_top = self.group.y + 20
-        bucket_bottom = self.group.y + (self.sprite.tile_height * self.sprite.height * self.scale)
+        bucket_right = self.group.x + (self.sprite.tile_width * self.sprite.width)
+        bucket_top = self.group.y + BUCKET_CATCH_Y * self.unit
+        bucket_bottom = self.group.y + (self.sprite.tile_height * self.sprite.height)
         return (bucket_left, bucket_top, bucket_right, bucket_bottom)
 
     def hide(self):
@@ -418,258 +754,738 @@ class Player:
 
 # --- Bomber Class (P2 - Bomber) ---
 class Bomber:
-    def __init__(self, sprite_manager, main_group, scale, display):
+    def __init__(self, sprite_manager, layer, unit, display, motion):
         self.sprite_manager = sprite_manager
-        self.main_group = main_group
-        self.scale = scale
+        self.motion = motion
+        self.layer = layer
+        self.unit = unit # Screen px per layout px
         self.display = display
 
         self.sad_sprite = self.sprite_manager.create_sprite("sad_baddy")
         self.happy_sprite = self.sprite_manager.create_sprite("happy_baddy")
         self.surprised_sprite = self.sprite_manager.create_sprite("surprised_baddy")
 
-        self.start_x = 10
-        self.start_y = 4
+        self.start_x = BOMBER_START_X * unit
+        self.start_y = BOMBER_START_Y * unit
+        self.left_x = BOMBER_LEFT_X * unit
 
-        self.group = Group(scale=self.scale)
+        self.group = Group()
         self.group.append(self.sad_sprite)
-        self.main_group.append(self.group)
-
-        self.width = 16 # From old enemy_width
-        self.move_step = 2 # Default move speed, will be set by level
+        self.group.append(self.happy_sprite)
+        self.group.append(self.surprised_sprite)
+        self.layer.append(self.group)
+        self.index = self.motion.add(self.group)
+
+        self.width = BOMBER_WIDTH * unit # From old enemy_width
+        self.right_x = self.display.width - self.width
+        self.move_velocity = (2 << FIXED_SHIFT) * unit # Default move speed, will be set by level
         
         # --- Add back AI variables ---
+        # Timers count ticks
         self.direction = 1
         self.move_timer = 0
         self.change_timer = 0
-        # self.direction_change is set in update()
+        self.direction_change = 0 # Picked on the first update()
 
         self.reset()
 
     def reset(self):
-        self.group.x = self.start_x
-        self.group.y = self.start_y
+        self.motion.set_position(self.index, self.start_x, self.start_y)
         self.set_state("sad")
         # --- Reset AI variables ---
         self.direction = 1
         self.move_timer = 0
         self.change_timer = 0
+        self.direction_change = 0
 
     def set_state(self, state):
-        if self.sad_sprite in self.group:
-            self.group.remove(self.sad_sprite)
-        if self.happy_sprite in self.group:
-            self.group.remove(self.happy_sprite)
-        if self.surprised_sprite in self.group:
-            self.group.remove(self.surprised_sprite)
-
-        if state == "sad":
-            self.group.append(self.sad_sprite)
-        elif state == "happy":
-            self.group.append(self.happy_sprite)
-        elif state == "surprised":
-            self.group.append(self.surprised_sprite)
+        self.sad_sprite.hidden = state != "sad"
+        self.happy_sprite.hidden = state != "happy"
+        self.surprised_sprite.hidden = state != "surprised"
 
     def move(self, direction_key):
         """Move the bomber based on player input."""
-        bomber_x = self.group.x
-        
         if direction_key == 'left':
-            bomber_x -= self.move_step
+            self.motion.vx[self.index] = -self.move_velocity
         elif direction_key == 'right':
-            bomber_x += self.move_step
+            self.motion.vx[self.index] = self.move_velocity
+        else:
+            return
+        self.motion.step(self.index)
             
         # Clamp position to screen edges
-        if bomber_x <= 8: # Left wall
-            bomber_x = 8
-        elif bomber_x >= self.display.width - (self.width * self.scale): # Right wall
-            bomber_x = self.display.width - (self.width * self.scale)
-            
-        self.group.x = bomber_x
+        if self.group.x <= self.left_x: # Left wall
+            self.motion.set_x(self.index, self.left_x)
+        elif self.group.x >= self.right_x: # Right wall
+            self.motion.set_x(self.index, self.right_x)
+
+    def next_direction_change(self, level):
+        if level[LEVEL_CHANGE_FIXED]:
+            return level[LEVEL_CHANGE_LB] # Avoid error if lb >= ub
+        return random.randint(level[LEVEL_CHANGE_LB], level[LEVEL_CHANGE_UB])
 
-    def update(self, speed, step, change_lb, change_ub):
-        """AI update logic for 1-Player mode."""
-        self.move_timer += 1 / 100
-        self.change_timer += 1 / 100
+    def update(self, level):
+        """AI update logic for 1-Player mode, driven by a compiled level record."""
+        self.move_timer += 1
+        self.change_timer += 1
 
         # Initialize direction_change if it hasn't been set yet
-        if not hasattr(self, 'direction_change') or self.direction_change == 0:
-            if change_lb >= change_ub:
-                 self.direction_change = change_lb # Avoid error if lb >= ub
-            else:
-                 self.direction_change = random.randint(change_lb, change_ub)
+        if self.direction_change == 0:
+            self.direction_change = self.next_direction_change(level)
 
 
-        if self.move_timer >= speed / 100:
+        if self.move_timer >= level[LEVEL_BOMBER_SPEED]:
             self.move_timer = 0
 
-            self.group.x += step * self.direction
+            self.motion.vx[self.index] = level[LEVEL_STEP_VELOCITY] * self.unit * self.direction
+            self.motion.step(self.index)
 
-            if (self.group.x <= 8 and self.direction < 0) or \
-               (self.group.x >= self.display.width - (self.width * self.scale) and self.direction > 0):
+            if (self.group.x <= self.left_x and self.direction < 0) or \
+               (self.group.x >= self.right_x and self.direction > 0):
                 self.direction *= -1
                 self.change_timer = 0
                 # Also reset direction_change when hitting wall
-                if change_lb >= change_ub:
-                    self.direction_change = change_lb
-                else:
-                    self.direction_change = random.randint(change_lb, change_ub)
+                self.direction_change = self.next_direction_change(level)
 
             # Correctly use self.direction_change, not the parameter
-            if self.change_timer >= self.direction_change / 100:
+            if self.change_timer >= self.direction_change:
                 self.direction *= -1
                 self.change_timer = 0
                 # Update self.direction_change with a new random value
-                if change_lb >= change_ub:
-                    self.direction_change = change_lb
-                else:
-                    self.direction_change = random.randint(change_lb, change_ub)
+                self.direction_change = self.next_direction_change(level)
+
+    def steer(self, level, target):
+        """AI update for aiTier 1 levels: move toward the planner's drop position."""
+        self.move_timer += 1
+        if self.move_timer >= level[LEVEL_BOMBER_SPEED]:
+            self.move_timer = 0
+            motion, index = self.motion, self.index
+            motion.set_fixed(index, approach(motion.x[index], target, level[LEVEL_STEP_VELOCITY] * self.unit),
+                             motion.y[index])
 
     def run_off_screen(self):
         while self.group.x < self.display.width:
-            self.group.x += 5
+            self.motion.set_x(self.index, self.group.x + 5 * self.unit)
             self.display.refresh()
             time.sleep(0.01)
 
 # --- Bomb Class ---
 class Bomb:
-    def __init__(self, sprite_manager, main_group, x, y, scale):
-        self.main_group = main_group
+    """A pre-attached bomb slot; spawning and destroying only toggle visibility."""
+    def __init__(self, sprite_manager, layer, free_list, motion):
+        self.free_list = free_list
+        self.motion = motion
         self.sprite = sprite_manager.create_sprite("bomb", 0, 0)
-        self.group = Group(scale=scale, x=x, y=y)
+        self.group = Group()
         self.group.append(self.sprite)
-        self.main_group.append(self.group)
-        self.scale = scale
+        self.group.hidden = True
+        layer.append(self.group)
+        self.index = motion.add(self.group)
+        self.free_list.append(self)
+
+    def place(self, x, y, velocity):
+        """Show the bomb at pixel (x, y), falling velocity fixed-point px per tick."""
+        self.motion.set_position(self.index, x, y)
+        self.motion.vy[self.index] = velocity
+        self.group.hidden = False
 
-    def update(self, drop_speed):
-        self.group.y += drop_speed
+    def update(self):
+        self.motion.step(self.index)
 
     def get_rect(self):
         bomb_left = self.group.x
-        bomb_right = self.group.x + (self.sprite.tile_width * self.scale)
+        bomb_right = self.group.x + self.sprite.tile_width
         bomb_top = self.group.y
-        bomb_bottom = self.group.y + (self.sprite.tile_height * self.scale)
+        bomb_bottom = self.group.y + self.sprite.tile_height
         return (bomb_left, bomb_top, bomb_right, bomb_bottom)
 
     def is_off_screen(self, display_height):
-        bomb_bottom = self.group.y + (self.sprite.tile_height * self.scale)
+        bomb_bottom = self.group.y + self.sprite.tile_height
         return bomb_bottom > display_height
 
     def destroy(self):
-        if self.group in self.main_group:
-            self.main_group.remove(self.group)
+        if not self.group.hidden:
+            self.group.hidden = True
+            self.free_list.append(self)
+
+# --- ExplosionPool Class ---
+class ExplosionPool:
+    """Fixed-capacity explosion effects that all share one explosion Bitmap.
+
+    Slots are pre-attached to the effects layer. Each spawn records the frame
+    it expires on and update() hides expired slots, so showing explosions
+    never allocates and never sleeps.
+    """
+    def __init__(self, sprite_manager, layer, capacity):
+        self.groups = []
+        self.expires = [0] * capacity
+        self.free = []
+        self.active = 0
+        self.peak = 0
+        self.limit = capacity # Lowered by the quality governor
+        for i in range(capacity):
+            group = Group()
+            group.append(sprite_manager.create_sprite("explosion", 0, 0))
+            group.hidden = True
+            layer.append(group)
+            self.groups.append(group)
+            self.free.append(capacity - 1 - i)
+
+    def spawn(self, x, y, now, frames):
+        """Show an explosion until frame now + frames. Returns False when full."""
+        if not self.free or self.active >= self.limit:
+            return False
+        index = self.free.pop()
+        group = self.groups[index]
+        group.x = x
+        group.y = y
+        group.hidden = False
+        self.expires[index] = now + frames
+        self.active += 1
+        if self.active > self.peak:
+            self.peak = self.active
+        return True
+
+    def update(self, now):
+        if not self.active:
+            return
+        for index in range(len(self.groups)):
+            group = self.groups[index]
+            if not group.hidden and self.expires[index] <= now:
+                self._release(index)
+
+    def clear(self):
+        for index in range(len(self.groups)):
+            if not self.groups[index].hidden:
+                self._release(index)
+
+    def _release(self, index):
+        self.groups[index].hidden = True
+        self.free.append(index)
+        self.active -= 1
+
+# --- ParticleSystem Class ---
+class ParticleSystem:
+    """Explosion particles drawn into one full-screen indexed Bitmap.
+
+    Particle state lives in preallocated arrays and live particles are kept
+    packed at the front, so emitting and expiring never allocate. Each frame
+    only the bounding box drawn on the previous frame is cleared.
+    """
+    def __init__(self, palette, width, height, capacity=MAX_PARTICLES, unit=1):
+        self.width = width
+        self.height = height
+        self.capacity = capacity
+        self.count = 0
+        # Sizes and speeds are in layout px; unit scales them to the screen
+        self.unit = unit
+        self.size = PARTICLE_SIZE * unit
+        self.gravity = PARTICLE_GRAVITY * unit
+
+        self.px = array.array("h", [0] * capacity)
+        self.py = array.array("h", [0] * capacity)
+        self.vx = array.array("h", [0] * capacity)
+        self.vy = array.array("h", [0] * capacity)
+        self.life = bytearray(capacity)
+        self.color = bytearray(capacity)
+
+        self.bitmap = Bitmap(width, height, 16)
+        self.tile_grid = TileGrid(self.bitmap, pixel_shader=palette)
+        self.dirty = None # (x1, y1, x2, y2) drawn last frame
+
+    def emit(self, x, y, amount, lifetime=40, speed=40):
+        """Burst amount particles from screen pixel (x, y)."""
+        x <<= PARTICLE_SHIFT
+        y <<= PARTICLE_SHIFT
+        speed *= self.unit
+        for _ in range(amount):
+            i = self.count
+            if i >= self.capacity:
+                return
+            self.px[i] = x
+            self.py[i] = y
+            self.vx[i] = random.randint(-speed, speed)
+            self.vy[i] = random.randint(-speed - speed // 2, speed // 2)
+            self.life[i] = random.randint(lifetime // 2, lifetime)
+            self.color[i] = random.choice((1, 10, 10, 15, 15))
+            self.count = i + 1
+
+    def clear(self):
+        self.count = 0
+        self.render()
+
+    def update(self):
+        px, py, vx, vy = self.px, self.py, self.vx, self.vy
+        life, color = self.life, self.color
+        gravity = self.gravity
+        max_x = self.width << PARTICLE_SHIFT
+        max_y = self.height << PARTICLE_SHIFT
+        i = 0
+        while i < self.count:
+            x = px[i] + vx[i]
+            y = py[i] + vy[i]
+            remaining = life[i] - 1
+            if remaining <= 0 or x < 0 or y < 0 or x >= max_x or y >= max_y:
+                # Swap the last live particle into this slot
+                last = self.count - 1
+                px[i], py[i], vx[i], vy[i] = px[last], py[last], vx[last], vy[last]
+                life[i], color[i] = life[last], color[last]
+                self.count = last
+                continue
+            px[i] = x
+            py[i] = y
+            vy[i] += gravity
+            life[i] = remaining
+            if remaining == PARTICLE_FADE:
+                color[i] = 14
+            i += 1
+
+    def render(self):
+        bitmap = self.bitmap
+        if self.dirty:
+            x1, y1, x2, y2 = self.dirty
+            bitmaptools.fill_region(bitmap, x1, y1, x2, y2, 0)
+            self.dirty = None
+        if not self.count:
+            return
+
+        px, py, color = self.px, self.py, self.color
+        size = self.size
+        max_x = self.width - size
+        max_y = self.height - size
+        x1 = self.width
+        y1 = self.height
+        x2 = y2 = 0
+        for i in range(self.count):
+            x = min(px[i] >> PARTICLE_SHIFT, max_x)
+            y = min(py[i] >> PARTICLE_SHIFT, max_y)
+            bitmaptools.fill_region(bitmap, x, y, x + size, y + size, color[i])
+            if x < x1:
+                x1 = x
+            if x > x2:
+                x2 = x
+            if y < y1:
+                y1 = y
+            if y > y2:
+                y2 = y
+        self.dirty = (x1, y1, x2 + size, y2 + size)
+
+    def step(self):
+        """Advance and redraw; does nothing once the screen is clear."""
+        if self.count or self.dirty:
+            self.update()
+            self.render()
+
+# --- BombField Class ---
+class BombField:
+    """Barrage-mode bombs drawn into one full-screen indexed Bitmap.
+
+    Hundreds of bombs would need hundreds of TileGrids, so positions live in
+    preallocated arrays instead. update() moves and collides every bomb in
+    one batched pass and culls bombs that leave the screen by swapping the
+    last live bomb into their slot. render() clears last frame's bounding
+    box and blits the sprite manager's pre-scaled bomb Bitmap per bomb.
+    """
+    def __init__(self, sprite_manager, width, height, capacity=BARRAGE_BOMBS):
+        self.width = width
+        self.height = height
+        self.capacity = capacity
+        self.count = 0
+        self.peak = 0
+        self.bx = array.array("h", [0] * capacity)
+        self.by = array.array("h", [0] * capacity)
+
+        # Already scaled for the display, so blits copy it 1:1
+        self.bomb = sprite_manager.get_bitmap("bomb")
+        self.bomb_w = self.bomb.width
+        self.bomb_h = self.bomb.height
+
+        self.bitmap = Bitmap(width, height, 16)
+        self.tile_grid = TileGrid(self.bitmap, pixel_shader=sprite_manager.palette)
+        self.dirty = None # (x1, y1, x2, y2) drawn last frame
+
+    def emit(self, x, y):
+        if self.count >= self.capacity:
+            return False
+        self.bx[self.count] = min(max(x, 0), self.width - self.bomb_w)
+        self.by[self.count] = y
+        self.count += 1
+        if self.count > self.peak:
+            self.peak = self.count
+        return True
+
+    def clear(self):
+        self.count = 0
+        self.render()
+
+    def update(self, drop_speed, left, top, right, bottom):
+        """Move every bomb and cull caught or missed ones. Returns (caught, missed)."""
+        bx, by = self.bx, self.by
+        bomb_w, bomb_h = self.bomb_w, self.bomb_h
+        floor = self.height - bomb_h
+        caught = missed = 0
+        i = 0
+        while i < self.count:
+            x = bx[i]
+            y = by[i] + drop_speed
+            if x + bomb_w >= left and x <= right and y + bomb_h >= top and y <= bottom:
+                caught += 1
+            elif y > floor:
+                missed += 1
+            else:
+                by[i] = y
+                i += 1
+                continue
+            last = self.count - 1
+            bx[i], by[i] = bx[last], by[last]
+            self.count = last
+        return caught, missed
+
+    def render(self):
+        bitmap = self.bitmap
+        if self.dirty:
+            x1, y1, x2, y2 = self.dirty
+            bitmaptools.fill_region(bitmap, x1, y1, x2, y2, 0)
+            self.dirty = None
+        if not self.count:
+            return
+
+        bx, by, bomb = self.bx, self.by, self.bomb
+        x1 = self.width
+        y1 = self.height
+        x2 = y2 = 0
+        for i in range(self.count):
+            x = bx[i]
+            y = by[i]
+            bitmaptools.blit(bitmap, bomb, x, y, skip_source_index=0)
+            if x < x1:
+                x1 = x
+            if x > x2:
+                x2 = x
+            if y < y1:
+                y1 = y
+            if y > y2:
+                y2 = y
+        self.dirty = (x1, y1, x2 + self.bomb_w, y2 + self.bomb_h)
+
+# --- QualityGovernor Class ---
+class QualityGovernor:
+    """Steps cosmetic effects down while frames overrun, and back up with headroom.
+
+    observe() takes each PLAYING frame's time. Every QUALITY_WINDOW frames
+    the window is judged: QUALITY_DOWN_OVERRUNS overruns drop one level,
+    and QUALITY_UP_WINDOWS clean windows in a row raise one. The settings
+    for the current level are plain attributes the game reads; nothing
+    here touches the simulation, so ticks never slow down.
+    """
+    def __init__(self, budget_us=FRAME_BUDGET_US):
+        self.budget_us = budget_us
+        self.level = 0
+        self.frames = 0
+        self.total_us = 0
+        self.overruns = 0
+        self.clean_windows = 0
+        self.average_us = 0 # Last window's average frame time
+        self.changes = 0
+        self.apply()
+
+    def apply(self):
+        (self.flicker_every, self.explosion_limit, self.particles,
+         self.cheap_splash, self.score_every) = QUALITY_LEVELS[self.level]
+
+    def observe(self, frame_us):
+        """Count one frame. Returns True when the quality level changed."""
+        self.frames += 1
+        self.total_us += frame_us
+        if frame_us > self.budget_us:
+            self.overruns += 1
+        if self.frames < QUALITY_WINDOW:
+            return False
+        self.average_us = self.total_us // self.frames
+        level = self.level
+        if self.overruns >= QUALITY_DOWN_OVERRUNS:
+            self.clean_windows = 0
+            if level < len(QUALITY_LEVELS) - 1:
+                level += 1
+        elif not self.overruns and self.average_us * 100 < self.budget_us * QUALITY_HEADROOM_PCT:
+            self.clean_windows += 1
+            if self.clean_windows >= QUALITY_UP_WINDOWS and level:
+                self.clean_windows = 0
+                level -= 1
+        else:
+            self.clean_windows = 0
+        self.frames = self.total_us = self.overruns = 0
+        if level == self.level:
+            return False
+        self.level = level
+        self.changes += 1
+        self.apply()
+        return True
+
+# --- IdleScheduler Class ---
+class IdleScheduler:
+    """Low tick rate and light sleep for screens that are waiting for a key.
+
+    wait() ends an idle tick. For IDLE_LINGER_TICKS after the last
+    activity() it keeps the normal tick rate, then it stretches ticks to
+    IDLE_TICK_NS. The sleep is taken in IDLE_POLL_NS slices and
+    poll_input(read_usb) is asked between slices, so a key press wakes it
+    at once. Where the alarm module exists, each tick builds one TimeAlarm
+    for its deadline and light-sleeps the last slice on it. Time between
+    wait() calls counts as busy and the rest as asleep, per idle period;
+    finish() adds the duty cycle to the per-state totals and, with
+    DEBUG_STATS, prints it.
+    """
+    def __init__(self, poll_input):
+        self.poll_input = poll_input
+        try:
+            import alarm
+            self.alarm = alarm
+        except ImportError:
+            self.alarm = None
+        self.state = None # Idle state being timed, or None
+        self.dirty = True # The screen needs one refresh
+        self.quiet_ticks = 0
+        self.woke_ns = 0
+        self.period_start_ns = 0
+        self.busy_ns = 0
+        # Totals per game state, for report()
+        self.total_busy_ns = [0] * len(IDLE_STATE_NAMES)
+        self.total_ns = [0] * len(IDLE_STATE_NAMES)
+
+    def begin(self, state):
+        self.finish()
+        self.state = state
+        self.dirty = True
+        self.quiet_ticks = 0
+        self.period_start_ns = self.woke_ns = time.monotonic_ns()
+        self.busy_ns = 0
+
+    def activity(self):
+        """Something changed on screen: refresh once and stay at the full tick rate a while."""
+        self.dirty = True
+        self.quiet_ticks = 0
+
+    def wait(self):
+        """Sleep out the rest of this idle tick, waking early for input."""
+        now = time.monotonic_ns()
+        self.busy_ns += now - self.woke_ns
+        interval = TICK_NS if self.quiet_ticks < IDLE_LINGER_TICKS else IDLE_TICK_NS
+        self.quiet_ticks += 1
+        deadline = self.woke_ns + interval
+        wake = None
+        if self.alarm and now < deadline:
+            wake = self.alarm.time.TimeAlarm(monotonic_time=time.monotonic() + (deadline - now) / 1000000000)
+        checks = 0
+        while now < deadline:
+            if self.poll_input(checks % IDLE_HID_EVERY == 0):
+                break
+            checks += 1
+            if wake is not None and deadline - now <= IDLE_POLL_NS:
+                self.alarm.light_sleep_until_alarms(wake)
+                now = time.monotonic_ns()
+                break # The tick's alarm has gone off
+            time.sleep(min(IDLE_POLL_NS, deadline - now) / 1000000000)
+            now = time.monotonic_ns()
+        self.woke_ns = now
+
+    def finish(self):
+        """The idle period is over: add up its duty cycle."""
+        if self.state is None:
+            return
+        now = time.monotonic_ns()
+        self.busy_ns += now - self.woke_ns
+        elapsed = now - self.period_start_ns
+        self.total_busy_ns[self.state] += self.busy_ns
+        self.total_ns[self.state] += elapsed
+        if DEBUG_STATS:
+            self.print_duty(self.state, self.busy_ns, elapsed)
+        self.state = None
+
+    def print_duty(self, state, busy_ns, elapsed_ns):
+        permille = busy_ns * 1000 // max(elapsed_ns, 1)
+        print(f"Idle {IDLE_STATE_NAMES[state]}: CPU busy {permille // 10}.{permille % 10}% of {elapsed_ns // 1000000} ms")
+
+    def report(self):
+        """Duty cycle per state over every idle period so far."""
+        if not DEBUG_STATS:
+            return
+        for state in range(len(IDLE_STATE_NAMES)):
+            if self.total_ns[state]:
+                self.print_duty(state, self.total_busy_ns[state], self.total_ns[state])
+
+def benchmark_particles(game, counts=(100, 500, 2000), frames=50):
+    """Print per-frame cost of particles versus explosion TileGrids."""
+    display = game.display
+    particles = ParticleSystem(game.sprite_manager.palette, display.width, display.height,
+                               capacity=max(counts), unit=game.unit)
+    game.effects_layer.append(particles.tile_grid)
+    for count in counts:
+        particles.count = 0
+        while particles.count < count:
+            particles.emit(random.randint(0, display.width - 1),
+                           random.randint(0, display.height - 1), 20, lifetime=255, speed=8)
+        start = time.monotonic_ns()
+        for _ in range(frames):
+            particles.update()
+            particles.render()
+            display.refresh()
+        per_frame_us = (time.monotonic_ns() - start) // (frames * 1000)
+        print(f"particles={count} live={particles.count} {per_frame_us} us/frame")
+    particles.clear()
+    game.effects_layer.remove(particles.tile_grid)
+
+    # Same workload with the static explosion sprites this replaces
+    pool = game.explosions
+    size = 16 * game.scale
+    for _ in range(30):
+        pool.spawn(random.randint(0, display.width - size), random.randint(0, display.height - size), 0, frames)
+    start = time.monotonic_ns()
+    for _ in range(frames):
+        for group in pool.groups:
+            if not group.hidden:
+                group.y = (group.y + 1) % (display.height - size)
+        display.refresh()
+    per_frame_us = (time.monotonic_ns() - start) // (frames * 1000)
+    print(f"explosion_sprites={pool.active} {per_frame_us} us/frame")
+    pool.clear()
+
+def benchmark_resolution(game, frames=200):
+    """Print per-frame cost of a busy gameplay scene at the game's display size.
+
+    DEBUG_RESOLUTION_BENCHMARK runs this at 320x240 and at 640x480: every
+    bomb slot falling, the bucket sweeping, an explosion with particles
+    every 20 frames, and one refresh per frame, timed separately.
+    """
+    display = game.display
+    game.finish_gameplay_loading()
+    game.title_bg_group.hidden = True
+    game.bg_group.hidden = False
+    game.wall_group.hidden = False
+    game.player.show()
+    game.bomber.group.hidden = False
+    display.root_group = game.main_group
+
+    velocity = (4 << FIXED_SHIFT) * game.unit # 4 layout px/tick
+    lane = (display.width - game.free_bombs[0].sprite.tile_width) // MAX_BOMBS
+    bombs = []
+    while game.free_bombs:
+        bomb = game.free_bombs.pop()
+        bomb.place(len(bombs) * lane, game.drop_y + (len(bombs) * 37) % (display.height // 2), velocity)
+        bombs.append(bomb)
+    explosion_size = 16 * game.scale
+    sim_ns = refresh_ns = 0
+    direction = 1
+    for frame in range(frames):
+        start = time.monotonic_ns()
+        if frame % 60 == 0:
+            direction = -direction
+        game.player.update(direction)
+        for bomb in bombs:
+            bomb.update()
+            if bomb.is_off_screen(display.height):
+                bomb.place(bomb.group.x, game.drop_y, velocity)
+        if frame % 20 == 0:
+            game.explode(random.randint(0, display.width - explosion_size),
+                         display.height // 2, MISS_EXPLOSION_FRAMES)
+        game.tick_frame()
+        drawn = time.monotonic_ns()
+        display.refresh()
+        sim_ns += drawn - start
+        refresh_ns += time.monotonic_ns() - drawn
+    print(f"display={display.width}x{display.height} scale={game.scale} "
+          f"update={sim_ns // (frames * 1000)} us/frame refresh={refresh_ns // (frames * 1000)} us/frame")
+    game.explosions.clear()
+    game.particles.clear()
+
+def open_display(width, height):
+    """The board's display at width x height (320x240 if that isn't offered), or a stand-in."""
+    try:
+        from adafruit_fruitjam.peripherals import request_display_config
+        try:
+            request_display_config(width, height)
+        except ValueError as e:
+            print(f"No {width}x{height} display mode ({e}); using 320x240")
+            request_display_config(320, 240)
+        return supervisor.runtime.display
+    except (ImportError, AttributeError, OSError) as e:
+        print(f"Could not request display: {e}")
+        # Create a dummy display object if hardware fails
+        class DummyDisplay:
+            root_group = None
+            auto_refresh = True
+            def refresh(self):
+                pass
+        display = DummyDisplay()
+        display.width = width
+        display.height = height
+        return display
 
 # --- Main Game Class ---
 class Game:
     def __init__(self, display):
         self.display = display
-        self.scale = 2
+        # Every layout position is multiplied by unit; sprites are pre-scaled to scale
+        self.unit = max(display.height // LAYOUT_HEIGHT, 1)
+        self.scale = ART_SCALE * self.unit
+        self.boot_timeline = []
+        self.mark_boot("imports")
 
         # Init core systems
+        # Only what the title screen needs is built here; gameplay assets
+        # are built by _load_stages during the title's idle frames
         gc.collect()
         self.audio = Audio()
-        self.sprite_manager = SpriteManager()
+        self.sprite_manager = SpriteManager(self.scale, display.width, display.height)
         self.font = terminalio.FONT
         
-        # Create display groups
-        self.main_group = Group()
-        self.scaled_group = Group(scale=self.scale)
-        self.main_group.append(self.scaled_group)
-
-        self.text_group = Group(scale=2)
+        # Create display layers
+        self.scene = Scene()
+        self.main_group = self.scene.root
+        background_layer = self.scene.layer(LAYER_BACKGROUND)
+        hud_layer = self.scene.layer(LAYER_HUD)
+        self.effects_layer = self.scene.layer(LAYER_EFFECTS)
+
+        self.text_group = Group(scale=self.scale)
         
-        self.title_text_group = Group(scale=1) # New group for small text
-        self.main_group.append(self.title_text_group)
+        self.title_text_group = Group(scale=self.unit) # New group for small text
+        hud_layer.append(self.title_text_group)
         self.title_text_group.hidden = True
 
-        # Setup background (BLUE)
-        bg_bmp = Bitmap(16, 12, 1)
-        bg_palette = Palette(1)
-        bg_palette[0] = 0x87F2FF
-        bg_tilegrid = TileGrid(bg_bmp, pixel_shader=bg_palette)
-        self.bg_group = Group(scale=10) # Store as self.bg_group
-        self.bg_group.append(bg_tilegrid)
-        self.scaled_group.append(self.bg_group) # Add to scaled_group
-        self.bg_group.hidden = True # Hide by default
-
-        # Setup wall (GAMEPLAY)
-        self.wall_group = Group(scale=self.scale) # Store as self.wall_group
-        self.wall_group.append(self.sprite_manager.create_sprite("top_wall"))
-        self.wall_group.append(self.sprite_manager.create_sprite("wall"))
-        self.main_group.append(self.wall_group)
-        self.wall_group.hidden = True # Hide by default
-
         # Setup Title Screen Background (FULLSCREEN WALL)
-        self.title_bg_group = Group(scale=self.scale) # Apply scale
+        self.title_bg_group = Group()
         try:
-            # Manually create the wall bitmap
-            wall_sprite_data = self.sprite_manager.SPRITES.get("wall")
-            wall_w, wall_h, wall_p = wall_sprite_data["w"], wall_sprite_data["h"], wall_sprite_data["p"]
-            wall_value_map = wall_sprite_data["value_map"]
-            wall_tile_w, wall_tile_h = wall_sprite_data["tile_w"], wall_sprite_data["tile_h"]
-            
-            wall_bitmap = Bitmap(wall_w, wall_h, wall_p)
-            self.sprite_manager._map_values_to_bitmap(wall_bitmap, wall_value_map, wall_w, wall_h)
-            
-            # Calculate tiles needed to fill 320x240
-            scaled_tile_w = wall_tile_w * self.scale
-            scaled_tile_h = wall_tile_h * self.scale
-            bg_tiles_w = (self.display.width + scaled_tile_w - 1) // scaled_tile_w
-            bg_tiles_h = (self.display.height + scaled_tile_h - 1) // scaled_tile_h
-            
-            title_wall_tg = TileGrid(wall_bitmap, pixel_shader=self.sprite_manager.palette,
-                                     width=bg_tiles_w, height=bg_tiles_h,
-                                     tile_width=wall_tile_w, tile_height=wall_tile_h,
-                                     x=0, y=0)
-            
-            self.sprite_manager._map_bitmap_to_tilegrid(title_wall_tg, 0, bg_tiles_w, bg_tiles_h)
-            
+            # The wall sprite from the top left corner; its grid fills the screen
+            title_wall_tg = self.sprite_manager.create_sprite("wall", 0, 0)
             self.title_bg_group.append(title_wall_tg)
-            self.main_group.append(self.title_bg_group)
+            background_layer.append(self.title_bg_group)
             self.title_bg_group.hidden = False # Show by default
         
         except Exception as e:
             print(f"Error creating title background: {e}")
             # Fallback in case "wall" sprite is missing
-            self.main_group.append(self.title_bg_group) # Add empty group
+            background_layer.append(self.title_bg_group) # Add empty group
 
 
-        # Setup score display
-        self.score_area = Label(self.font, text="       0", color=self.sprite_manager.palette[10], x=(display.width // 2) - 50, y=6)
-        self.text_group.append(self.score_area)
-        
-        # --- Setup Ready Labels ---
-        self.p1_ready_label = Label(self.font, text="P1: PRESS START", color=0xFFFFFF, x=10, y=60)
-        self.p1_ready_label.hidden = True
-        self.text_group.append(self.p1_ready_label)
-
-        self.p2_ready_label = Label(self.font, text="P2: PRESS START", color=0xFFFFFF, x=10, y=80)
-        self.p2_ready_label.hidden = True
-        self.text_group.append(self.p2_ready_label)
-        
         # --- Setup Mode Select Labels ---
-        # Centered x for 24 chars at scale 1: (320 - (24 * 6)) // 2 = 88
-        self.p1_mode_label = Label(self.font, text="PRESS '1' FOR 1-PLAYER", color=0xFFF700, x=88, y=190)
-        self.p1_mode_label.hidden = True
-        self.title_text_group.append(self.p1_mode_label) # Add to new group
-
-        self.p2_mode_label = Label(self.font, text="PRESS '2' FOR 2-PLAYER", color=0xFFF700, x=88, y=205)
-        self.p2_mode_label.hidden = True
-        self.title_text_group.append(self.p2_mode_label) # Add to new group
-
-        self.main_group.append(self.text_group)
+        # Every message is created once; screens only update and show/hide them
+        self.labels = LabelRegistry(self.font)
+        # Left-aligned block centered on the longest line, 50 layout px from the bottom
+        mode_texts = ("PRESS '1' FOR 1-PLAYER", "PRESS '2' FOR 2-PLAYER", "PRESS '3' FOR BARRAGE")
+        mode_x = (self.display.width // self.unit - max(len(text) for text in mode_texts) * 6) // 2
+        mode_y = self.display.height // self.unit - 50
+        self.p1_mode_label = self.labels.add("p1_mode", self.title_text_group, mode_texts[0], color=0xFFF700, x=mode_x, y=mode_y)
+        self.p2_mode_label = self.labels.add("p2_mode", self.title_text_group, mode_texts[1], color=0xFFF700, x=mode_x, y=mode_y + 15)
+        self.p3_mode_label = self.labels.add("p3_mode", self.title_text_group, mode_texts[2], color=0xFFF700, x=mode_x, y=mode_y + 30)
+
+        hud_layer.append(self.text_group) # Filled in by _build_hud
         self.text_group.hidden = True # Hide by default
 
-        # Create game objects
-        self.player = Player(self.sprite_manager, self.main_group, self.scale, self.display)
-        self.player.hide() # Hide by default
-        self.bomber = Bomber(self.sprite_manager, self.main_group, self.scale, self.display)
-        self.bomber.group.hidden = True # Hide by default
-
         # --- Setup Title Screen Logo ---
-        self.title_group = Group()
+        self.title_group = Group(scale=self.unit)
         try:
             # Load the bitmap from the file
+            from displayio import OnDiskBitmap
             title_bitmap = OnDiskBitmap('pyboom.bmp') # Use the new filename
 
             # Create a palette to key out the green background
@@ -684,9 +1500,9 @@ class Game:
                                       pixel_shader=title_palette,
                                       x=0, y=0) # We set x/y later
             
-            # Calculate position to center the 160x120 bitmap
-            center_x = (self.display.width - title_bitmap.width) // 2
-            center_y = (self.display.height - title_bitmap.height) // 2
+            # Calculate position to center the 160x120 bitmap (scaled by the group)
+            center_x = (self.display.width - title_bitmap.width * self.unit) // 2
+            center_y = (self.display.height - title_bitmap.height * self.unit) // 2
             
             self.title_group.x = center_x
             self.title_group.y = center_y
@@ -697,35 +1513,92 @@ class Game:
             # This is a fallback in case the 'pyboom.bmp' file is missing
             print(f"Failed to load title screen: {e}")
             fallback_label = Label(self.font, text="PYBOOM!", color=0x78DC52, scale=5)
-            fallback_label.x = (self.display.width - fallback_label.bounding_box[2]) // (2 * self.scale) # Adjust for text_group scale
-            fallback_label.y = (self.display.height - fallback_label.bounding_box[3]) // (2 * self.scale) # Adjust for text_group scale
-            self.text_group.append(fallback_label) # Add to text_group as fallback
-            # We don't hide the text_group here, so fallback is visible
+            fallback_label.x = (self.display.width // self.unit - fallback_label.bounding_box[2] * 5) // 2
+            fallback_label.y = self.display.height // self.unit // 2
+            # Lives in the logo group so it follows the logo's show/hide
+            self.title_group.append(fallback_label)
+            self.title_group.hidden = True
 
-        self.main_group.append(self.title_group)
+        hud_layer.append(self.title_group)
         gc.collect()
 
         # --- Title Animation ---
         self.title_animation_state = TITLE_ANIM_START
-        self.title_anim_bomb = None
-        self.title_anim_explosion = None
         self.title_explosion_timer = 0
         
         # Pre-calculate target X/Y
-        # Target X: Center of screen minus half of 5x scaled bomb width (8px)
-        self.title_target_x = (self.display.width // 2) - ((8 * 5) // 2)
-        # Target Y: Center of screen minus half of 5x scaled bomb height (12px)
-        self.title_target_y = (self.display.height // 2) - ((12 * 5) // 2)
+        title_scale = TITLE_ART_SCALE * self.unit
+        # Target X: Center of screen minus half of the scaled bomb width (8px)
+        self.title_target_x = (self.display.width // 2) - ((8 * title_scale) // 2)
+        # Target Y: Center of screen minus half of the scaled bomb height (12px)
+        self.title_target_y = (self.display.height // 2) - ((12 * title_scale) // 2)
+
+        # Big bomb and explosion with their own pre-scaled bitmaps, attached once and shown by the animation
+        self.title_anim_bomb = Group(x=self.title_target_x, y=-100 * self.unit) # Start off-screen
+        self.title_anim_bomb.append(self.sprite_manager.create_sprite("bomb", 0, 0, scale=title_scale))
+        self.title_anim_bomb.hidden = True
+        self.effects_layer.append(self.title_anim_bomb)
+
+        # Center of screen minus half of the scaled explosion size (16px)
+        self.title_explosion = self.sprite_manager.create_sprite(
+            "explosion", (self.display.width - 16 * title_scale) // 2,
+            (self.display.height - 16 * title_scale) // 2, scale=title_scale)
+        self.title_explosion.hidden = True
+        self.effects_layer.append(self.title_explosion)
+
+        # Every gameplay explosion comes from this pool
+        self.frame = 0
+        self.explosions = ExplosionPool(self.sprite_manager, self.effects_layer, MAX_EXPLOSIONS)
+        self.particles = None # Built by _load_stages
+        self.barrage = None # Built by _load_stages
 
         # Init game state variables
         self.game_state = STATE_TITLE # Start at the title screen
         self.game_mode = 0 # 0 = Not Selected, 1 = 1P, 2 = 2P
         self.bombs = []
-        self.params = {}
+        self.free_bombs = []
+        self.levels = None # Compiled by _load_stages
+        self.level = None # Record for the current level
         self.splash = False
         self.splash_count = 0
 
+        # Fuse flicker and catch splash, drawn once per PLAYING frame by animate_palette
+        palette = self.sprite_manager.palette
+        self.palette_anim = PaletteAnimator(palette)
+        self.fuse_cycle = self.palette_anim.add(
+            PaletteCycle((FUSE_ENTRY,), ((palette[14], palette[10], palette[15]),)))
+        self.splash_cycle = self.palette_anim.add(
+            PaletteCycle(SPLASH_ENTRIES, splash_tables(palette[9]), SPLASH_STAGE_TICKS,
+                         SPLASH_STAGE_TICKS - 1, loop=False)) # Tick 1 of a splash shows stage 1
+
+        # High scores and snapshots persist in NVM; fall back to RAM if the board has none
+        try:
+            import microcontroller
+            nvm = microcontroller.nvm
+            if nvm is None:
+                raise AttributeError("no nvm")
+        except (ImportError, AttributeError):
+            print("NVM not found. High scores will not be saved.")
+            nvm = bytearray(SNAPSHOT_NVM_OFFSET + SNAPSHOT_SIZE)
+        self.nvm = nvm
+        self.snapshot_buffer = bytearray(SNAPSHOT_SIZE)
+        self.snapshot_body = memoryview(self.snapshot_buffer)[:SNAPSHOT_SIZE - 4] # What the CRC covers, never copied
+        self.high_scores = None # Scanned by _load_stages
         self.high_score = 0
+
+        # Gameplay events are buffered in RAM and only written out in idle states
+        self.telemetry = Telemetry()
+        self.telemetry.log(self.frame, EVENT_BOOT, DEBUG_START_LEVEL)
+        self.latency = LatencyTracker() if DEBUG_LATENCY else None
+        self.quality = QualityGovernor()
+        self.idle = IdleScheduler(self.input_pending)
+        # Frame pacing (end_frame)
+        self.next_tick_ns = 0
+        self.skip_run = 0 # Refreshes skipped in a row
+        self.frames_skipped = 0 # Since PLAYING began; logged when it ends
+        self.longest_skip_run = 0
+        self.schedule_resets = 0
+        self.debug_shown = [-1, -1, -1] # DEBUG_OVERLAY: quality level, average us, skips on screen
         self.game_win = False
 
         # Set level params from attributes
@@ -744,38 +1617,218 @@ class Game:
         
         # ANSI escape sequence buffer for arrow keys
         self.key_buffer = ""
+        self.hid_inputs = [] # USB keyboards and gamepads, attached by _load_stages
+        self.hid_turn = 0 # The device read_input polls this tick
+        self.key_backlog = "" # USB keys read while an idle tick slept
+        self.serial_keys = "" # This read's serial console text; only it starts a hold timer
+        # P1 and P2 movement keys, held between presses and releases (or serial autorepeat)
+        self.held_keys = HeldKeys(("a", "d", "\x1b[D", "\x1b[C"))
+        self.drop_requested = False # P2's drop key, applied on the next tick
+
+        # Network 2-player: set up by _load_stages when settings.toml names a peer
+        self.netplay = None
+        self.networked = False # The current game is against the peer board
+        self.leaderboard = None # Score uploads, when settings.toml names a server
+        # CRC32 of every tick's input bits: a fingerprint of the game for the leaderboard
+        self.replay_crc = 0
+        self.replay_inputs = bytearray(2)
+
+        self.loader = self._load_stages()
+        self.gameplay_loaded = False # Set once the stages reset_game needs have run
+        self.mark_boot("title_ready")
+        gc.collect()
+
+    def mark_boot(self, stage):
+        """Record milliseconds since boot for a startup stage."""
+        self.boot_timeline.append((stage, (time.monotonic_ns() - BOOT_START_NS) // 1000000))
+
+    def _build_backgrounds(self):
+        # Setup background (BLUE)
+        # One flat colour: a 16x12 bitmap scaled up to the screen costs far less than a full-size one
+        bg_bmp = Bitmap(16, 12, 1)
+        bg_palette = Palette(1)
+        bg_palette[0] = 0x87F2FF
+        bg_tilegrid = TileGrid(bg_bmp, pixel_shader=bg_palette)
+        self.bg_group = Group(scale=(self.display.width + 15) // 16) # Store as self.bg_group
+        self.bg_group.append(bg_tilegrid)
+        self.scene.layer(LAYER_BACKGROUND).insert(0, self.bg_group) # Under the title wall
+        self.bg_group.hidden = True # Hide by default
+
+        # Setup wall (GAMEPLAY); both grids fill the screen from their sprite's y
+        self.wall_group = Group() # Store as self.wall_group
+        self.wall_group.append(self.sprite_manager.create_sprite("top_wall"))
+        self.wall_group.append(self.sprite_manager.create_sprite("wall"))
+        self.scene.layer(LAYER_WALLS).append(self.wall_group)
+        self.wall_group.hidden = True # Hide by default
 
+    def _build_hud(self):
+        # Setup score display
+        self.score_area = ScoreDisplay(self.font, self.sprite_manager.palette[10],
+                                       x=(self.display.width // self.unit // 2) - 50, y=0)
+        self.text_group.append(self.score_area.tile_grid)
+        
+        # --- Setup Ready Labels ---
+        self.p1_ready_label = self.labels.add("p1_ready", self.text_group, "P1: PRESS START", x=10, y=60)
+        self.p2_ready_label = self.labels.add("p2_ready", self.text_group, "P2: PRESS START", x=10, y=80)
+
+        # Game over screen (text and colour are filled in by handle_game_over)
+        self.result_label_y = (self.display.height // 2) // self.scale - 10
+        self.score_label_y = (self.display.height // 2) // self.scale + 10
+        reset_text = "Press 'R' to Restart"
+        self.labels.add("result", self.text_group, "P1 (BUCKET) WINS!", y=self.result_label_y)
+        self.labels.add("final_score", self.text_group, "Score: 0", x=10, y=self.score_label_y)
+        self.labels.add("restart", self.text_group, reset_text, color=self.sprite_manager.palette[1],
+                        x=self.centered_label_x(reset_text), y=self.score_label_y + 20)
+        # Live barrage stats, top left under the bomber's lane
+        self.labels.add("barrage", self.text_group, "BOMBS:0 FPS:0", x=2, y=6)
+        # DEBUG_OVERLAY: quality level and average frame time, on its own row under the barrage stats,
+        # clear of the score digits at the top right
+        self.labels.add("debug", self.text_group, "Q0", x=2, y=20)
+
+    def _build_characters(self):
+        characters_layer = self.scene.layer(LAYER_CHARACTERS)
+        self.motion = Motion(MOTION_SLOTS)
+        self.player = Player(self.sprite_manager, characters_layer, self.unit, self.display, self.motion)
+        self.player.hide() # Hide by default
+        self.bomber = Bomber(self.sprite_manager, characters_layer, self.unit, self.display, self.motion)
+        self.bomber.group.hidden = True # Hide by default
+
+        # Bomb slots are attached once; spawning takes one from free_bombs
+        bombs_layer = self.scene.layer(LAYER_BOMBS)
+        for _ in range(MAX_BOMBS):
+            Bomb(self.sprite_manager, bombs_layer, self.free_bombs, self.motion)
+        self.drop_y = BOMB_DROP_Y * self.unit
+
+        # Predictive bomber for aiTier 1 levels, in screen pixels
+        bomb_sprite = self.free_bombs[0].sprite
+        self.planner = BomberPlanner(self.bomber.left_x, self.bomber.right_x,
+                                     bomb_sprite.tile_width, self.player.sprite.tile_width,
+                                     self.drop_y + bomb_sprite.tile_height,
+                                     (BUCKET_TOP_Y + BUCKET_CATCH_Y) * self.unit, self.display.width,
+                                     unit=self.unit)
+        self.planned_drop = -1 # bombs_dropped when the last plan began
+
+    def _load_stages(self):
+        """Generator that builds gameplay assets, one short step per idle frame."""
+        self._build_backgrounds()
+        self.mark_boot("backgrounds")
+        yield
+        self._build_hud()
+        self.mark_boot("hud")
+        yield
+        self.levels = LevelTable(load_levels(), MAX_BOMBS)
+        self.mark_boot("levels")
+        yield
+        self._build_characters()
+        self.mark_boot("characters")
+        yield
+        self.particles = ParticleSystem(self.sprite_manager.palette, self.display.width, self.display.height,
+                                        unit=self.unit)
+        self.effects_layer.append(self.particles.tile_grid)
+        self.mark_boot("particles")
+        yield
+        self.barrage = BombField(self.sprite_manager, self.display.width, self.display.height, BARRAGE_BOMBS)
+        self.scene.layer(LAYER_BOMBS).append(self.barrage.tile_grid)
+        self.mark_boot("barrage")
+        yield
+        self.high_scores = HighScoreTable(self.nvm)
+        self.high_score = self.high_scores.best()
         self.reset_game()
+        self.gameplay_loaded = True
+        self.mark_boot("high_scores")
+        yield
+        # Nothing a game needs from here on: a resumed game plays while these finish
+        self.hid_inputs = find_hid_inputs()
+        self.held_keys.devices = self.hid_inputs
+        self.mark_boot("usb_input")
+        yield
+        link, role = yield from open_link() # WiFi comes up a short poll per frame
+        if link is not None:
+            self.netplay = RollbackSession(link, role, TICK_STATE_SIZE, self.save_tick_state,
+                                           self.load_tick_state, self.simulate_netplay)
+            self.labels.set("p2_mode", "PRESS '2' FOR NETWORK 2P")
+        self.mark_boot("network")
+        yield
+        self.leaderboard = open_leaderboard()
+        if self.leaderboard:
+            self.leaderboard.attach((yield from connect_socket_pool())) # At once if netplay brought WiFi up
+        self.mark_boot("leaderboard")
+        yield
+        yield from self.audio.load()
+        self.mark_boot("audio")
+        self.mark_boot("loaded")
+        print("Boot timeline (ms):", self.boot_timeline)
         gc.collect()
 
-    def set_level_params(self, level):
-        level_key = level
-        if level > 8:
-            level_key = 8
+    def load_step(self):
+        """Run one staged-startup step, if any are left."""
+        if self.loader is None:
+            return
+        try:
+            next(self.loader)
+        except StopIteration:
+            self.loader = None
 
-        self.params = LEVELS.get(level_key)
-        self.drop_speed = self.params["drop_speed"]
+    def finish_gameplay_loading(self):
+        """Run startup steps until a game can start; USB, network and audio stay staged."""
+        while not self.gameplay_loaded:
+            self.load_step()
+
+    def set_level_params(self, level):
+        # Levels past the last defined one are generated (and memoized) by LevelTable
+        self.level = self.levels.get(level)
+        self.drop_speed = self.level[LEVEL_DROP_SPEED]
         self.bombs_dropped = 0
-        self.bomb_score = self.params["bombScore"]
-        self.bomb_count = self.params["bombCount"]
-        self.enemy_step = self.params["enemy_step"]
+        self.bomb_score = self.level[LEVEL_BOMB_SCORE]
+        self.bomb_count = self.level[LEVEL_BOMB_COUNT]
+        self.enemy_step = self.level[LEVEL_ENEMY_STEP]
         
         # --- Add back AI variables ---
-        self.bomber_speed = self.params["bomberSpeed"]
-        if self.params["dropIntervalLB"] >= self.params["dropIntervalUB"]:
-            self.drop_interval = self.params["dropIntervalLB"]
-        else:
-            self.drop_interval = random.randint(self.params["dropIntervalLB"], self.params["dropIntervalUB"])
+        self.bomber_speed = self.level[LEVEL_BOMBER_SPEED]
+        self.drop_interval = self.next_drop_interval()
+        self.planned_drop = -1
+        self.planner.planning = False
         
         # Set bomber (P2) speed
-        self.bomber.move_step = self.enemy_step
+        self.bomber.move_velocity = self.level[LEVEL_STEP_VELOCITY] * self.unit
         
-        print("Level:", level, self.params)
+        self.telemetry.log(self.frame, EVENT_LEVEL, level, 0, self.bomb_count)
         gc.collect()
 
+    def next_drop_interval(self):
+        if self.level[LEVEL_DROP_FIXED]:
+            return self.level[LEVEL_DROP_LB]
+        return random.randint(self.level[LEVEL_DROP_LB], self.level[LEVEL_DROP_UB])
+
+    def plan_bomber(self):
+        """AI update for aiTier 1 levels: a budgeted slice of planning, then a move toward the plan."""
+        planner = self.planner
+        if not planner.planning and self.planned_drop != self.bombs_dropped:
+            # Plan the next drop once per drop, from where everything is now
+            self.planned_drop = self.bombs_dropped
+            level = self.level
+            planner.begin(self.bomber.group.x, self.player.group.x, self.motion.vx[self.player.index],
+                          level[LEVEL_STEP_VELOCITY] * self.unit, level[LEVEL_BOMBER_SPEED],
+                          level[LEVEL_DROP_VELOCITY] * self.unit, self.drop_interval - self.bomb_drop_timer)
+            for bomb in self.bombs:
+                planner.add_bomb(bomb.group.x, bomb.get_rect()[3])
+        planner.run()
+        self.bomber.steer(self.level, planner.target)
+
+    def drop_due(self):
+        """The 1P bomber's drop timer has run out (and, on aiTier 1 levels, it has reached its target)."""
+        if self.level[LEVEL_AI_TIER]:
+            return self.planner.ready_to_drop(self.bomber.group.x, self.bomb_drop_timer, self.drop_interval)
+        return self.bomb_drop_timer >= self.drop_interval
+
+    def centered_label_x(self, text):
+        """X position that centers text in the scaled text_group."""
+        return (self.display.width - (len(text) * 6 * self.scale)) // (2 * self.scale)
+
     def reset_game(self):
         self.score = 0
         self.current_level = DEBUG_START_LEVEL
+        self.level_reached = self.current_level
         self.set_level_params(self.current_level)
 
         self.player.reset()
@@ -784,9 +1837,13 @@ class Game:
         for bomb in self.bombs:
             bomb.destroy()
         self.bombs.clear()
+        self.barrage.clear()
 
         self.bombs_dropped = 0
         self.bomb_drop_timer = 0 # Used for P2 bomb drop rate limiting / AI
+        self.splash = False
+        self.splash_count = 0
+        self.replay_crc = 0
 
         self.next_extra_life = MAX_LIFE_INTERVAL
         self.surprised_baddy_triggered = False
@@ -796,48 +1853,48 @@ class Game:
         # Reset ready state
         self.p1_ready = False
         self.p2_ready = False
-        self.p1_ready_label.text = "P1: PRESS START"
-        self.p1_ready_label.color = 0xFFFFFF
-        self.p2_ready_label.text = "P2: PRESS START"
-        self.p2_ready_label.color = 0xFFFFFF
+        self.labels.set("p1_ready", "P1: PRESS START", 0xFFFFFF)
+        self.labels.set("p2_ready", "P2: PRESS START", 0xFFFFFF)
         self.p1_ready_label.hidden = True
         self.p2_ready_label.hidden = True
         
         # Hide mode select labels
         self.p1_mode_label.hidden = True
         self.p2_mode_label.hidden = True
+        self.p3_mode_label.hidden = True
         
-        # Clear old game over/win labels
-        # This is safer than popping
-        for i in range(len(self.text_group) - 1, -1, -1):
-            item = self.text_group[i]
-            if item not in (self.score_area, self.p1_ready_label, self.p2_ready_label, self.p1_mode_label, self.p2_mode_label):
-                self.text_group.pop(i)
-
-        self.score_area.text = f"{int(self.score):>8}"
+        # Hide game over/win labels
+        self.labels.hide("result", "final_score", "restart", "barrage")
+
+        self.score_area.set_value(self.score)
         # We don't make score_area visible here,
         # we do it when the game starts
         gc.collect()
 
     def spawn_bomb(self):
         # --- Simplified: AI and P2 logic will check *before* calling ---
-        if self.bombs_dropped >= self.bomb_count:
+        if self.bombs_dropped >= self.bomb_count or not self.free_bombs:
             return
 
         drop_bomb_x = self.bomber.group.x
-        drop_bomb_y = self.bomber.group.y * self.scale + 17 # 17 was bomb_start_y
 
-        new_bomb = Bomb(self.sprite_manager, self.main_group, drop_bomb_x, drop_bomb_y, self.scale)
+        new_bomb = self.free_bombs.pop()
+        new_bomb.place(drop_bomb_x, self.drop_y, self.level[LEVEL_DROP_VELOCITY] * self.unit)
         self.bombs.append(new_bomb)
         self.bombs_dropped += 1
-        print(f"bomb_sprite_{self.bombs_dropped - 1}") # Match log output
+        # Telemetry x is in layout px, so logs from either resolution compare
+        self.telemetry.log(self.frame, EVENT_SPAWN, self.current_level, drop_bomb_x // self.unit, self.bombs_dropped)
             
     def update_bombs(self):
         player_rect = self.player.get_rect()
         player_l, player_t, player_r, player_b = player_rect
 
-        for bomb in self.bombs[:]: # Iterate over a copy
-            bomb.update(self.drop_speed)
+        # By index over the live slots; a removed bomb's slot takes the last one, as in BombField
+        bombs = self.bombs
+        i = 0
+        while i < len(bombs):
+            bomb = bombs[i]
+            bomb.update()
 
             bomb_l, bomb_t, bomb_r, bomb_b = bomb.get_rect()
 
@@ -847,11 +1904,13 @@ class Game:
 
             if x_collision and y_collision:
                 bomb.destroy()
-                self.bombs.remove(bomb)
+                last = bombs.pop()
+                if i < len(bombs):
+                    bombs[i] = last
                 self.splash = True
-                self.score += self.bomb_score
-                self.score_area.text = f"{int(self.score):>8}"
+                self.score += self.bomb_score # Drawn by show_score()
                 self.audio.play(self.audio.sound_catch)
+                self.telemetry.log(self.frame, EVENT_CATCH, self.current_level, bomb_l // self.unit, self.score)
 
                 if self.score >= 100000:
                     self.game_win = True
@@ -868,47 +1927,30 @@ class Game:
                     self.bomber.set_state("surprised")
                     self.surprised_baddy_triggered = True
 
-                continue # Go to next bomb
+                continue # Slot i now holds the next bomb
 
             if bomb.is_off_screen(self.display.height):
                 self.audio.play(self.audio.sound_miss)
+                self.telemetry.log(self.frame, EVENT_MISS, self.current_level, bomb_l // self.unit, self.player.bucket_count)
                 self.game_state = STATE_PAUSED
                 self.success_state = False
                 return # Exit update_bombs
-
-    def bomb_flicker(self):
-        pal = self.sprite_manager.palette
-        if pal[8] == pal[14]:
-            pal[8] = pal[10]
-        elif pal[8] == pal[10]:
-            pal[8] = pal[15]
-        elif pal[8] == pal[15]:
-            pal[8] = pal[14]
+            i += 1
 
     def bucket_splash(self, is_splash):
-        pal = self.sprite_manager.palette
+        """Count one tick of the catch splash; animate_palette draws it from splash_count."""
         if not is_splash:
             self.splash_count = 0
-            # Note: We no longer need to modify the palette here
-            # because it's set to transparent by default in _setup_palette
-            return
+        elif self.splash_count < SPLASH_TICKS:
+            self.splash_count += 1
+        else:
+            self.splash_count = 0
+            self.splash = False
 
-        if is_splash:
-            if self.splash_count < 10:
-                pal.make_opaque(9)
-                self.splash_count += 1
-            elif self.splash_count < 20:
-                pal.make_transparent(9)
-                pal.make_opaque(11)
-                self.splash_count += 1
-            elif self.splash_count < 30:
-                pal.make_transparent(11)
-                pal.make_opaque(12)
-                self.splash_count += 1
-            elif self.splash_count > 29:
-                pal.make_transparent(12)
-                self.splash_count = 0
-                self.splash = False
+    def animate_palette(self):
+        """Once per PLAYING frame: step the fuse flicker and show the splash for the current tick."""
+        self.splash_cycle.clock = self.splash_count
+        self.palette_anim.step()
     
     def process_keyboard_input(self, cur_btn_val):
         """Processes raw keyboard input, including ANSI for arrow keys."""
@@ -918,21 +1960,24 @@ class Game:
         self.key_buffer += cur_btn_val
 
         # --- Simple Keys (P1) ---
+        # Movement keys only mark the key held; the tick does the moving
         if 'a' in self.key_buffer or 'A' in self.key_buffer:
             if self.game_state == STATE_PLAYING:
-                self.player.move('a')
+                if 'a' in self.serial_keys or 'A' in self.serial_keys: # USB devices report their own releases
+                    self.held_keys.press('a')
+                self.mark_latency(HOP_DECODED)
         
         if 'd' in self.key_buffer or 'D' in self.key_buffer:
              if self.game_state == STATE_PLAYING:
-                self.player.move('d')
+                if 'd' in self.serial_keys or 'D' in self.serial_keys:
+                    self.held_keys.press('d')
+                self.mark_latency(HOP_DECODED)
         
         if ' ' in self.key_buffer:
             if self.game_state == STATE_TITLE:
                 pass # P1 'start' (space) no longer used on title
             elif self.game_state == STATE_READY:
                 self.p1_ready = True
-            elif self.game_state == STATE_PAUSED:
-                self.resume_game_from_pause()
 
         if '\r' in self.key_buffer or '\n' in self.key_buffer: # Enter key (Check for \r and \n)
             if self.game_state == STATE_TITLE:
@@ -944,6 +1989,17 @@ class Game:
              if self.game_state == STATE_GAME_OVER:
                 self.reset_game_from_game_over()
 
+        if 's' in self.key_buffer or 'S' in self.key_buffer:
+            if self.game_state in (STATE_PLAYING, STATE_READY) and self.game_mode != MODE_BARRAGE \
+               and not self.networked:
+                self.save_snapshot()
+
+        if 'r' in self.key_buffer or 'R' in self.key_buffer:
+            if self.game_state == STATE_PLAYING and self.game_mode == MODE_BARRAGE:
+                # Barrage never ends on its own
+                self.game_win = False
+                self.game_state = STATE_GAME_OVER
+
         # --- Mode Select Keys ---
         if '1' in self.key_buffer and self.game_state == STATE_TITLE:
             self.game_mode = 1
@@ -953,28 +2009,33 @@ class Game:
             self.game_mode = 2
             self.start_game_from_title()
 
+        if '3' in self.key_buffer and self.game_state == STATE_TITLE:
+            self.game_mode = MODE_BARRAGE
+            self.start_game_from_title()
+
         # --- Arrow Keys (P2) ---
         # Look for escape sequences
         
         # Left: \x1b[D
         if '\x1b[D' in self.key_buffer and self.game_mode == 2:
             if self.game_state == STATE_PLAYING:
-                self.bomber.move('left')
+                if '\x1b[D' in self.serial_keys:
+                    self.held_keys.press('\x1b[D')
+                self.mark_latency(HOP_DECODED)
             self.key_buffer = self.key_buffer.replace('\x1b[D', '')
             
         # Right: \x1b[C
         if '\x1b[C' in self.key_buffer and self.game_mode == 2:
             if self.game_state == STATE_PLAYING:
-                self.bomber.move('right')
+                if '\x1b[C' in self.serial_keys:
+                    self.held_keys.press('\x1b[C')
+                self.mark_latency(HOP_DECODED)
             self.key_buffer = self.key_buffer.replace('\x1b[C', '')
         
         # Down: \x1b[B
         if '\x1b[B' in self.key_buffer and self.game_mode == 2:
             if self.game_state == STATE_PLAYING:
-                # P2 bomb drop logic
-                if self.bombs_dropped < self.bomb_count and self.bomb_drop_timer <= 0:
-                    self.spawn_bomb()
-                    self.bomb_drop_timer = 50 # Set P2 rate limit
+                self.drop_requested = True # tick_versus applies the rate limit
             self.key_buffer = self.key_buffer.replace('\x1b[B', '')
         
         # Up: \x1b[A (unused, but good to clear)
@@ -991,21 +2052,99 @@ class Game:
             self.key_buffer = ""
 
 
+    def mark_latency(self, hop):
+        if self.latency:
+            self.latency.mark(hop)
+
+    def read_input(self):
+        """Keys from the serial console and any USB keyboards or gamepads, as one string."""
+        available = supervisor.runtime.serial_bytes_available
+        # Keep a partial escape sequence from the last read so a split arrow key still matches
+        serial = self.serial_keys
+        escape = serial.rfind('\x1b', max(len(serial) - 2, 0))
+        serial = serial[escape:] if escape >= 0 else ""
+        keys = self.key_backlog
+        if available:
+            typed = sys.stdin.read(available)
+            keys += typed
+            serial += typed
+        self.serial_keys = serial
+        self.key_backlog = ""
+        if self.hid_inputs:
+            # One device per tick, as each read may wait READ_TIMEOUT_MS; the rest keep their last report
+            self.hid_turn = (self.hid_turn + 1) % len(self.hid_inputs)
+            keys += self.hid_inputs[self.hid_turn].read()
+        if keys:
+            self.idle.activity()
+            if self.latency:
+                self.latency.mark(HOP_AVAILABLE)
+        if self.networked and self.game_state != STATE_PLAYING:
+            self.sync_netplay() # Every waiting loop reads input, so the peer keeps hearing from us
+        return keys or None
+
+    def input_pending(self, read_usb):
+        """IdleScheduler's wake check. USB keys read here wait in key_backlog for read_input."""
+        if supervisor.runtime.serial_bytes_available:
+            return True
+        if read_usb:
+            for device in self.hid_inputs:
+                self.key_backlog += device.read()
+        return bool(self.key_backlog)
+
+    def local_inputs(self):
+        """Input bits for P1 and P2 from the keys held this tick, with any P2 drop."""
+        held = self.held_keys
+        held.tick()
+        p2_input = input_bits(held.direction('\x1b[D', '\x1b[C'))
+        if self.drop_requested:
+            p2_input |= INPUT_DROP
+            self.drop_requested = False
+        p1_input = input_bits(held.direction('a', 'd'))
+        replay = self.replay_inputs
+        replay[0] = p1_input
+        replay[1] = p2_input
+        self.replay_crc = binascii.crc32(replay, self.replay_crc)
+        return p1_input, p2_input
+
+    def move_players(self, p1_input, p2_input=0):
+        """Move the bucket, and P2's bomber, by this tick's input bits."""
+        bucket_x = self.player.group.x
+        bomber_x = self.bomber.group.x
+        self.player.update(input_direction(p1_input))
+        direction = input_direction(p2_input)
+        if direction:
+            self.bomber.move('left' if direction < 0 else 'right')
+        if self.player.group.x != bucket_x or self.bomber.group.x != bomber_x:
+            self.mark_latency(HOP_APPLIED)
+
+    def tick_versus(self, p1_input, p2_input):
+        """One 2-player tick from both players' input bits, for local and network games alike."""
+        if p2_input & INPUT_DROP and self.bombs_dropped < self.bomb_count and self.bomb_drop_timer <= 0:
+            self.spawn_bomb()
+            self.bomb_drop_timer = P2_DROP_TICKS # Set P2 rate limit
+        if self.bomb_drop_timer > 0:
+            self.bomb_drop_timer -= 1
+        self.move_players(p1_input, p2_input)
+        self.update_bombs()
+        self.bucket_splash(self.splash)
+
+    def level_complete(self):
+        """The bomber is out of bombs, every one is gone and the last splash has played."""
+        return self.bombs_dropped == self.bomb_count and not self.bombs and not self.splash
+
     def handle_gameplay_input(self):
         """Handles input only for the PLAYING state."""
-        available = supervisor.runtime.serial_bytes_available
-        cur_btn_val = sys.stdin.read(available) if available else None
-        self.process_keyboard_input(cur_btn_val)
+        self.process_keyboard_input(self.read_input())
             
     def handle_title_input(self):
         """Handles input for the TITLE screen (non-blocking).."""
-        available = supervisor.runtime.serial_bytes_available
-        cur_btn_val = sys.stdin.read(available) if available else None
-        self.process_keyboard_input(cur_btn_val)
+        self.process_keyboard_input(self.read_input())
         # Action is handled by ' ' or '\r' in process_keyboard_input
 
     def start_game_from_title(self):
         """Transition from TITLE to READY."""
+        self.finish_gameplay_loading() # In case a mode was picked before startup finished
+        self.networked = self.game_mode == 2 and self.netplay is not None
         self.audio.play(self.audio.sound_start)
         self.title_group.hidden = True # Hide title logo
         self.title_bg_group.hidden = True # Hide title wall background
@@ -1030,22 +2169,24 @@ class Game:
 
     def handle_ready_input(self):
         """Handles input for the READY screen (non-blocking)."""
-        available = supervisor.runtime.serial_bytes_available
-        cur_btn_val = sys.stdin.read(available) if available else None
-        self.process_keyboard_input(cur_btn_val)
+        self.process_keyboard_input(self.read_input())
+        if self.networked:
+            # The other player's ready flag comes from their board
+            if self.netplay.role:
+                self.p1_ready = self.netplay.remote_ready
+            else:
+                self.p2_ready = self.netplay.remote_ready
         
         # Update UI based on ready state
         if self.p1_ready:
-            self.p1_ready_label.text = "P1: READY!"
-            self.p1_ready_label.color = 0x78DC52 # Green
+            self.labels.set("p1_ready", "P1: READY!", 0x78DC52) # Green
             
         if self.game_mode == 2 and self.p2_ready:
-            self.p2_ready_label.text = "P2: READY!"
-            self.p2_ready_label.color = 0x78DC52 # Green
+            self.labels.set("p2_ready", "P2: READY!", 0x78DC52) # Green
         
         # Check if ready to start
         start_game = False
-        if self.game_mode == 1 and self.p1_ready:
+        if self.game_mode in (1, MODE_BARRAGE) and self.p1_ready:
             start_game = True
         elif self.game_mode == 2 and self.p1_ready and self.p2_ready:
             start_game = True
@@ -1057,40 +2198,32 @@ class Game:
             self.p1_ready_label.hidden = True
             self.p2_ready_label.hidden = True
             
+            self.held_keys.release()
+            self.drop_requested = False
             self.game_state = STATE_PLAYING
+            if self.game_mode == MODE_BARRAGE:
+                self.start_barrage()
+            elif self.networked:
+                self.start_netplay_round()
 
 
     def handle_title_animation(self):
         """Runs the title screen animation sequence."""
         if self.title_animation_state == TITLE_ANIM_START:
-            # Create a 5x scaled bomb
-            bomb_sprite = self.sprite_manager.create_sprite("bomb", 0, 0)
-            self.title_anim_bomb = Group(scale=5, x=self.title_target_x, y=-100) # Start off-screen
-            self.title_anim_bomb.append(bomb_sprite)
-            self.main_group.append(self.title_anim_bomb)
+            # Show the big bomb
+            self.title_anim_bomb.y = -100 * self.unit # Start off-screen
+            self.title_anim_bomb.hidden = False
             self.title_animation_state = TITLE_ANIM_DROPPING
         
         elif self.title_animation_state == TITLE_ANIM_DROPPING:
             # Move the bomb down
             if self.title_anim_bomb.y < self.title_target_y:
-                self.title_anim_bomb.y += 8 # Drop speed
+                self.title_anim_bomb.y += 8 * self.unit # Drop speed
             else:
                 # Reached target, switch to exploding
                 self.title_anim_bomb.y = self.title_target_y
-                if self.title_anim_bomb in self.main_group:
-                    self.main_group.remove(self.title_anim_bomb)
-                self.title_anim_bomb = None
-                
-                # Create 5x scaled explosion
-                exp_sprite = self.sprite_manager.create_sprite("explosion", 0, 0)
-                # Target X: Center of screen minus half of 5x scaled explosion width (16px)
-                exp_x = (self.display.width // 2) - ((16 * 5) // 2)
-                # Target Y: Center of screen minus half of 5x scaled explosion height (16px)
-                exp_y = (self.display.height // 2) - ((16 * 5) // 2)
-                
-                self.title_anim_explosion = Group(scale=5, x=exp_x, y=exp_y)
-                self.title_anim_explosion.append(exp_sprite)
-                self.main_group.append(self.title_anim_explosion)
+                self.title_anim_bomb.hidden = True
+                self.title_explosion.hidden = False
                 
                 self.audio.play(self.audio.sound_miss) # Re-use a sound
                 
@@ -1099,12 +2232,8 @@ class Game:
         
         elif self.title_animation_state == TITLE_ANIM_EXPLODING:
             self.title_explosion_timer += 1
-            if self.title_explosion_timer >= 60: # Show explosion for ~1 second (60 frames)
-                # Clean up explosion
-                if self.title_anim_explosion in self.main_group:
-                    self.main_group.remove(self.title_anim_explosion)
-                self.title_anim_explosion = None
-                
+            if self.title_explosion_timer >= TITLE_EXPLOSION_FRAMES:
+                self.title_explosion.hidden = True
                 # Show the logo
                 self.title_group.hidden = False
                 
@@ -1113,83 +2242,452 @@ class Game:
                 self.title_text_group.hidden = False # Show small text group
                 self.p1_mode_label.hidden = False
                 self.p2_mode_label.hidden = False
+                self.p3_mode_label.hidden = False
                 
                 # Animation is done
                 self.title_animation_state = TITLE_ANIM_DONE
 
-    def resume_game_from_pause(self):
-        """Action to resume from pause (called by input)."""
+    def complete_level(self):
+        """P1 (Bucket) cleared the level: move up one and wait in READY."""
+        self.audio.stop()
+        self.audio.play(self.audio.sound_level_up)
+        self.current_level += 1
+        self.level_reached = max(self.level_reached, self.current_level)
+
+        for bomb in self.bombs:
+            bomb.destroy()
+        self.bombs.clear()
+        self.bombs_dropped = 0
+
+        self.set_level_params(self.current_level)
+        self.bomb_drop_timer = 0
+        self.enter_ready()
+
+    def enter_ready(self):
+        """Go back to READY with both players' ready flags cleared."""
+        self.p1_ready = False
+        self.p2_ready = False
+        self.labels.set("p1_ready", "P1: PRESS START", 0xFFFFFF)
+        self.labels.set("p2_ready", "P2: PRESS START", 0xFFFFFF)
+        self.p1_ready_label.hidden = False
+        if self.game_mode == 2:
+            self.p2_ready_label.hidden = False
+
+        self.game_state = STATE_READY
+
+    def start_barrage(self):
+        """Reset the barrage field and stats; the bomber uses the hardest defined level."""
+        self.set_level_params(len(self.levels))
+        self.barrage.clear()
+        self.barrage.peak = 0
+        self.barrage_rate = BARRAGE_START_RATE
+        self.barrage_drops = 0 # Hundredths of a bomb owed to the field
+        self.barrage_missed = 0
+        self.barrage_frames = 0
+        self.barrage_work_ns = 0
+        self.barrage_window_start = time.monotonic_ns()
+        self.barrage_window_skips = self.frames_skipped
+        self.labels.show("barrage", "BOMBS:0 FPS:0")
+
+    def update_barrage(self):
+        """One barrage tick: climbing drop rate, one batched bomb pass, live stats."""
+        self.handle_gameplay_input()
+        if self.game_state != STATE_PLAYING:
+            return # 'R' ended the run
+        work_start = time.monotonic_ns()
+        self.bomber.update(self.level)
+
+        self.barrage_drops += self.barrage_rate
+        while self.barrage_drops >= 100:
+            self.barrage_drops -= 100
+            self.barrage.emit(self.bomber.group.x, self.drop_y)
+
+        self.move_players(self.local_inputs()[0])
+        caught, missed = self.barrage.update(BARRAGE_DROP_SPEED * self.unit, *self.player.get_rect())
+        if caught:
+            self.score += caught
+            self.score_area.set_value(self.score)
+            self.splash = True
+            self.audio.play(self.audio.sound_catch)
+        self.barrage_missed += missed
+        self.barrage.render()
+        self.bucket_splash(self.splash)
+        self.barrage_work_ns += time.monotonic_ns() - work_start
+
+        self.barrage_frames += 1
+        if self.barrage_frames == BARRAGE_REPORT_FRAMES:
+            self.report_barrage()
+
+    def report_barrage(self):
+        """Show bombs in flight and FPS for the last window, then raise the drop rate.
+
+        FPS counts the refreshes end_frame actually made, not the ticks.
+        """
+        now = time.monotonic_ns()
+        skipped = self.frames_skipped - self.barrage_window_skips
+        fps = (self.barrage_frames - skipped) * 1000000000 // max(now - self.barrage_window_start, 1)
+        work_us = self.barrage_work_ns // (self.barrage_frames * 1000)
+        self.labels.set("barrage", f"BOMBS:{self.barrage.count} FPS:{fps}")
+        if DEBUG_STATS:
+            print(f"barrage rate={self.barrage_rate}/s bombs={self.barrage.count} peak={self.barrage.peak} "
+                  f"fps={fps} skipped={skipped} update_render={work_us} us/frame missed={self.barrage_missed}")
+        self.barrage_rate += BARRAGE_RATE_STEP
+        self.barrage_frames = 0
+        self.barrage_work_ns = 0
+        self.barrage_window_start = now
+        self.barrage_window_skips = self.frames_skipped
+
+    def start_netplay_round(self):
+        """Start a network round; both boards are in the same state at this point."""
+        self.netplay.start_round()
+        # Both boards draw the same random numbers (explosion effects) from here
+        random.seed(self.netplay.round)
+        # Unused in 2-player, but part of the state the boards compare
+        self.drop_interval = self.level[LEVEL_DROP_LB]
+        self.bomber.direction_change = 0
+
+    def update_netplay(self):
+        """One network 2-player frame: send this board's input, roll back for the peer's."""
+        self.process_keyboard_input(self.read_input())
+        netplay = self.netplay
+        local_input = self.local_inputs()[netplay.role]
+        if not netplay.advance(local_input) and local_input & INPUT_DROP:
+            self.drop_requested = True # Stalled: keep the drop for the next tick
+        netplay.send()
+        if netplay.finished:
+            netplay.report()
+            if netplay.outcome == STATE_READY:
+                self.complete_level()
+            else:
+                self.game_state = netplay.outcome # Miss or game over, handled as usual
+
+    def simulate_netplay(self, p1_input, p2_input):
+        """RollbackSession callback: one tick. Returns STATE_PLAYING, or the state the round ended in."""
+        self.audio.muted = self.netplay.resimulating
+        self.tick_versus(p1_input, p2_input)
+        self.audio.muted = False
+        outcome = self.game_state
+        # The round only ends once the peer confirms every input up to this tick
         self.game_state = STATE_PLAYING
-        self.audio.play(self.audio.sound_start)
-        self.bomb_drop_timer = 0 # Reset bomb drop timer
+        if outcome == STATE_PLAYING and self.level_complete():
+            outcome = STATE_READY
+        return outcome
+
+    def sync_netplay(self):
+        """Outside PLAYING: tell the peer whether our player is ready, and resend inputs it lacks."""
+        netplay = self.netplay
+        netplay.poll()
+        ready = self.p2_ready if netplay.role else self.p1_ready
+        netplay.send(FLAG_READY if self.game_state == STATE_READY and ready else 0)
+
+    def save_tick_state(self, buffer):
+        """A snapshot, plus the sub-pixel positions and splash it leaves out."""
+        self.pack_state(buffer)
+        motion = self.motion
+        bucket = self.player.index
+        offset = SNAPSHOT_SIZE
+        struct.pack_into(TICK_STATE_FORMAT, buffer, offset, self.splash, self.splash_count, self.game_win,
+                         motion.x[bucket], motion.vx[bucket], motion.x[self.bomber.index])
+        offset += struct.calcsize(TICK_STATE_FORMAT)
+        for i in range(MAX_BOMBS):
+            if i < len(self.bombs):
+                index = self.bombs[i].index
+                struct.pack_into("<ll", buffer, offset, motion.x[index], motion.y[index])
+            else:
+                struct.pack_into("<ll", buffer, offset, 0, 0) # Boards compare whole states
+            offset += 8
+
+    def load_tick_state(self, buffer):
+        self.unpack_state(buffer)
+        motion = self.motion
+        bucket = self.player.index
+        offset = SNAPSHOT_SIZE
+        (splash, self.splash_count, game_win, bucket_x, bucket_vx,
+         bomber_x) = struct.unpack_from(TICK_STATE_FORMAT, buffer, offset)
+        self.splash = bool(splash)
+        self.game_win = bool(game_win)
+        motion.set_fixed(bucket, bucket_x, motion.y[bucket])
+        motion.vx[bucket] = bucket_vx
+        motion.set_fixed(self.bomber.index, bomber_x, motion.y[self.bomber.index])
+        offset += struct.calcsize(TICK_STATE_FORMAT)
+        for bomb in self.bombs:
+            x, y = struct.unpack_from("<ll", buffer, offset)
+            motion.set_fixed(bomb.index, x, y)
+            offset += 8
+
+    def show_score(self):
+        """Redraw changed score digits, every frame or as often as quality allows."""
+        if self.score_area.value != self.score and not self.frame % self.quality.score_every:
+            self.score_area.set_value(self.score)
+
+    def apply_quality(self):
+        """The governor changed level: pass its settings on and record it."""
+        quality = self.quality
+        self.explosions.limit = quality.explosion_limit
+        self.fuse_cycle.rate = quality.flicker_every
+        self.splash_cycle.set_tables(splash_tables(self.sprite_manager.palette[9], quality.cheap_splash))
+        self.telemetry.log(self.frame, EVENT_QUALITY, self.current_level, min(quality.average_us, 0xFFFF), quality.level)
+
+    def end_frame(self, manual_refresh, frame_start=0):
+        """Refresh if this tick is on schedule, then wait for the next one.
+
+        The simulation keeps its fixed TICK_NS rate. When a tick finishes
+        late, its refresh is skipped (up to MAX_FRAME_SKIP in a row) and the
+        next tick starts at once, so the ticks behind catch up. Outside
+        PLAYING displayio refreshes on its own and only the pacing applies.
+        A PLAYING tick passes its frame_start, and its whole cost, refresh
+        included, is measured before the sleep.
+        """
+        self.next_tick_ns += TICK_NS
+        now = time.monotonic_ns()
+        if manual_refresh:
+            if now > self.next_tick_ns and self.skip_run < MAX_FRAME_SKIP:
+                self.skip_run += 1
+                self.frames_skipped += 1
+                if self.skip_run > self.longest_skip_run:
+                    self.longest_skip_run = self.skip_run
+            else:
+                self.skip_run = 0
+                self.display.refresh()
+                if self.latency:
+                    self.latency.mark(HOP_REFRESHED)
+                now = time.monotonic_ns()
+        if frame_start:
+            self.observe_frame((now - frame_start) // 1000)
+        late = now - self.next_tick_ns
+        if late < 0:
+            time.sleep(-late / 1000000000)
+        elif late > MAX_TICK_LAG_NS:
+            # A blocking screen (pause explosions, loading) or a stall: don't try to replay it
+            self.next_tick_ns = now
+            if manual_refresh:
+                self.schedule_resets += 1
+
+    def observe_frame(self, frame_us):
+        """Check a PLAYING tick's cost against the frame budget and let the quality governor see it."""
+        if frame_us > FRAME_BUDGET_US:
+            self.telemetry.log(self.frame, EVENT_OVERRUN, self.current_level, 0, frame_us)
+        if self.quality.observe(frame_us):
+            self.apply_quality()
+        if DEBUG_OVERLAY and not self.quality.frames:
+            self.show_debug_overlay()
+
+    def show_debug_overlay(self):
+        """Rebuild the overlay text only when one of its numbers has changed."""
+        quality, shown = self.quality, self.debug_shown
+        if shown[0] == quality.level and shown[1] == quality.average_us and shown[2] == self.frames_skipped:
+            return
+        shown[0], shown[1], shown[2] = quality.level, quality.average_us, self.frames_skipped
+        self.labels.show("debug", f"Q{quality.level} {quality.average_us}US S{self.frames_skipped}")
+
+    def log_frame_skips(self):
+        """PLAYING ended: record how many refreshes gave way to ticks, then start counting afresh."""
+        if self.frames_skipped or self.schedule_resets:
+            self.telemetry.log(self.frame, EVENT_FRAMESKIP, self.current_level,
+                               min(self.longest_skip_run, 0xFFFF), self.frames_skipped)
+            print(f"Frame skip: {self.frames_skipped} refreshes skipped, longest run "
+                  f"{self.longest_skip_run}, {self.schedule_resets} schedule resets")
+        self.frames_skipped = self.longest_skip_run = self.schedule_resets = 0
+        self.skip_run = 0
+
+    def idle_screen(self):
+        """The screen is static until a key arrives: title or a local READY, once startup is done."""
+        if self.networked or self.latency:
+            return False # The peer or the latency timer needs every tick
+        if self.game_state == STATE_TITLE:
+            return self.title_animation_state == TITLE_ANIM_DONE and self.loader is None
+        return self.game_state == STATE_READY and self.loader is None
+
+    def idle_frame(self, state):
+        """End a tick on an idle screen: refresh only if something changed, then sleep."""
+        idle = self.idle
+        if idle.state != state:
+            idle.begin(state)
+        if idle.dirty:
+            idle.dirty = False
+            self.display.refresh()
+        idle.wait()
+        self.next_tick_ns = time.monotonic_ns() # end_frame's schedule carries on from here
+
+    def tick_frame(self):
+        """Advance the frame clock that drives timed effects."""
+        self.frame += 1
+        self.explosions.update(self.frame)
+        if self.particles is not None:
+            self.particles.step()
+
+    def explode(self, x, y, frames):
+        """Explosion sprite plus a particle burst from its center, as many as quality allows."""
+        self.explosions.spawn(x, y, self.frame, frames)
+        if self.quality.particles:
+            self.particles.emit(x + 8 * self.scale, y + 8 * self.scale, self.quality.particles)
 
     def handle_pause_state(self):
+        """A missed bomb, one tick at a time: blow up the rest, let the explosions
+        play out as the main loop ticks, then go to READY (or GAME OVER)."""
+        self.process_keyboard_input(self.read_input()) # Keeps the peer and the input buffers serviced
         if not self.success_state: # This is a failure (P1 miss) state
             self.audio.stop()
 
             # 1. Show explosions for all active bombs
-            explosion_groups = []
             for bomb in self.bombs:
-                exp_sprite = self.sprite_manager.create_sprite("explosion", 0, 0)
-                exp_group = Group(scale=self.scale, x=bomb.group.x, y=bomb.group.y)
-                exp_group.append(exp_sprite) # <-- THE FIX IS HERE
-                self.main_group.append(exp_group)
-                explosion_groups.append(exp_group)
+                self.explode(bomb.group.x, bomb.group.y, MISS_EXPLOSION_FRAMES)
                 bomb.destroy() # Remove original bomb
 
             self.bombs.clear()
 
             # 2. Change bomber (P2) state to happy
             self.bomber.set_state("happy")
+            self.success_state = True # Exploding; the main loop's tick_frame runs the explosions out
+            return
 
-            # 3. Show explosions
-            self.display.refresh()
-            time.sleep(1)
-
-            # 4. Clean up explosions
-            for exp_group in explosion_groups:
-                if exp_group in self.main_group:
-                    self.main_group.remove(exp_group)
-
-            # 5. Update game state
-            new_bucket_count = self.player.bucket_count - 1
-            if new_bucket_count <= 0:
-                self.game_win = False # P1 loses
-                self.game_state = STATE_GAME_OVER
-                return # Exit to main loop
+        # 3. Wait for the frame clock to expire the explosions
+        if self.explosions.active or self.particles.count:
+            return
 
-            self.player.set_buckets(new_bucket_count)
+        # 4. Update game state
+        new_bucket_count = self.player.bucket_count - 1
+        if new_bucket_count <= 0:
+            self.game_win = False # P1 loses
+            self.game_state = STATE_GAME_OVER
+            return # Exit to main loop
 
-            # 6. Decrease level
-            previous_bomb_count = self.bomb_count
-            self.current_level -= 1
-            if self.current_level < 1:
-                self.current_level = 1
+        self.player.set_buckets(new_bucket_count)
 
-            self.set_level_params(self.current_level)
+        # 5. Decrease level
+        self.current_level -= 1
+        if self.current_level < 1:
+            self.current_level = 1
 
-            # 7. Reset for next round
-            self.success_state = True
+        self.set_level_params(self.current_level)
 
-            if self.surprised_baddy_triggered:
-                self.bomber.set_state("surprised")
+        # 6. Reset for next round
+        if self.surprised_baddy_triggered:
+            self.bomber.set_state("surprised")
+        else:
+            self.bomber.set_state("sad")
+
+        self.telemetry.flush() # Idle until the players are ready
+        if self.latency:
+            self.latency.report()
+
+        # Both players start the next round from READY, as after a cleared level
+        self.enter_ready()
+
+    def pack_state(self, buffer, seed=0):
+        """Pack everything needed to resume the current game into buffer.
+
+        seed is stored for unpack_state to reseed with; rollback states leave it 0.
+        """
+        bomber = self.bomber
+        struct.pack_into(SNAPSHOT_HEADER, buffer, 0,
+                         SNAPSHOT_MAGIC, self.game_mode, self.current_level, self.level_reached,
+                         self.player.bucket_count, self.surprised_baddy_triggered, bomber.direction,
+                         self.score, self.next_extra_life, self.bombs_dropped, bomber.group.x // self.unit,
+                         bomber.move_timer, bomber.change_timer,
+                         bomber.direction_change, self.bomb_drop_timer, self.drop_interval,
+                         seed, len(self.bombs))
+        offset = SNAPSHOT_HEADER_SIZE
+        for i in range(MAX_BOMBS):
+            if i < len(self.bombs):
+                struct.pack_into("<hh", buffer, offset, self.bombs[i].group.x // self.unit,
+                                 self.bombs[i].group.y // self.unit)
             else:
-                self.bomber.set_state("sad")
-
-            # Wait for user input to continue
-            # This is still a blocking loop, which is fine for a pause state
-            while True:
-                available = supervisor.runtime.serial_bytes_available
-                cur_btn_val = sys.stdin.read(available) if available else None
-                self.process_keyboard_input(cur_btn_val)
-                                
-                # resume_game_from_pause() sets the state
-                if self.game_state == STATE_PLAYING:
-                    break
-                    
-                time.sleep(0.01)
+                struct.pack_into("<hh", buffer, offset, 0, 0)
+            offset += 4
+
+    def unpack_state(self, buffer):
+        """Load a packed game into the live objects. Returns False if buffer is invalid."""
+        if buffer[0] != SNAPSHOT_MAGIC:
+            return False
+        (_, mode, level, level_reached, buckets, surprised, direction,
+         score, next_extra_life, bombs_dropped, bomber_x, move_ticks, change_ticks,
+         direction_change, drop_ticks, drop_interval, seed, live_bombs) = struct.unpack_from(SNAPSHOT_HEADER, buffer)
+
+        self.game_mode = mode
+        if level != self.current_level or self.level is None:
+            self.set_level_params(level) # Network rollbacks mostly stay on one level
+        self.current_level = level
+        self.level_reached = level_reached
+        self.bombs_dropped = bombs_dropped
+        self.drop_interval = drop_interval
+        self.bomb_drop_timer = drop_ticks
+
+        self.score = score
+        self.next_extra_life = next_extra_life
+        self.score_area.set_value(score)
+        self.player.set_buckets(buckets)
+
+        self.surprised_baddy_triggered = bool(surprised)
+        bomber = self.bomber
+        bomber.set_state("surprised" if surprised else "sad")
+        self.motion.set_x(bomber.index, bomber_x * self.unit)
+        bomber.direction = direction
+        bomber.move_timer = move_ticks
+        bomber.change_timer = change_ticks
+        bomber.direction_change = direction_change
+
+        for bomb in self.bombs:
+            bomb.destroy()
+        self.bombs.clear()
+        offset = SNAPSHOT_HEADER_SIZE
+        for _ in range(live_bombs):
+            bomb = self.free_bombs.pop()
+            x, y = struct.unpack_from("<hh", buffer, offset)
+            # Sub-pixel remainders aren't saved, nor odd pixels at 640x480
+            bomb.place(x * self.unit, y * self.unit, self.level[LEVEL_DROP_VELOCITY] * self.unit)
+            self.bombs.append(bomb)
+            offset += 4
+
+        if seed:
+            random.seed(seed)
+        return True
+
+    def save_snapshot(self):
+        """Write a resumable snapshot of the current game to NVM."""
+        # Reseed so the restored game continues the same random sequence
+        seed = random.randint(1, 0x3FFFFFFF)
+        random.seed(seed)
+        self.pack_state(self.snapshot_buffer, seed)
+        struct.pack_into("<I", self.snapshot_buffer, SNAPSHOT_SIZE - 4,
+                         binascii.crc32(self.snapshot_body) & 0xFFFFFFFF)
+        self.nvm[SNAPSHOT_NVM_OFFSET:SNAPSHOT_NVM_OFFSET + SNAPSHOT_SIZE] = self.snapshot_buffer
+
+    def clear_snapshot(self):
+        if self.nvm[SNAPSHOT_NVM_OFFSET] == SNAPSHOT_MAGIC:
+            self.nvm[SNAPSHOT_NVM_OFFSET] = 0
+
+    def resume_from_snapshot(self):
+        """Restore a saved game straight into READY, skipping the title animation."""
+        if self.nvm[SNAPSHOT_NVM_OFFSET] != SNAPSHOT_MAGIC:
+            return False
+        self.finish_gameplay_loading()
+        self.snapshot_buffer[:] = self.nvm[SNAPSHOT_NVM_OFFSET:SNAPSHOT_NVM_OFFSET + SNAPSHOT_SIZE]
+        crc = struct.unpack_from("<I", self.snapshot_buffer, SNAPSHOT_SIZE - 4)[0]
+        if crc != binascii.crc32(self.snapshot_body) & 0xFFFFFFFF or not self.unpack_state(self.snapshot_buffer):
+            return False
+        self.title_animation_state = TITLE_ANIM_DONE
+        self.start_game_from_title()
+        return True
 
     def handle_game_over(self):
+        self.clear_snapshot() # Finished games don't resume
+        barrage = self.game_mode == MODE_BARRAGE
+        if barrage:
+            # A benchmark run, not a game: keep it out of the high scores
+            self.barrage.clear()
+            self.labels.hide("barrage")
+            if DEBUG_STATS:
+                print("Barrage peak:", self.barrage.peak, "bombs in flight")
+        else:
+            # Record the score first so restarting during the explosions can't skip it.
+            # One small NVM write, only when the score makes the table
+            self.high_scores.submit(self.score, self.level_reached, self.game_mode)
+            if self.leaderboard:
+                self.leaderboard.submit(self.score, self.level_reached, self.game_mode, self.replay_crc)
+        new_high = not barrage and self.score > self.high_score
+        if new_high:
+            self.high_score = self.score
         self.audio.stop()
         self.player.hide()
         self.bomber.group.hidden = True # Hide bomber
@@ -1204,90 +2702,61 @@ class Game:
         self.title_bg_group.hidden = False
         # --- END MOVE ---
 
-        game_over_labels = []
-
         if self.game_win:
-            win_text = "P1 (BUCKET) WINS!"
-            label_x = (self.display.width - (len(win_text) * 6 * self.scale)) // (2 * self.scale)
-            label_y = (self.display.height // 2) // self.scale - 10
-            win_label = Label(self.font, text=win_text, color=self.sprite_manager.palette[10], x=label_x, y=label_y)
-            self.text_group.append(win_label)
-            game_over_labels.append(win_label)
+            result_text = "P1 (BUCKET) WINS!"
         else:
             self.audio.play(self.audio.sound_game_over)
             
             if self.game_mode == 2:
-                game_over_text = "P2 (BOMBER) WINS!"
+                result_text = "P2 (BOMBER) WINS!"
+            elif barrage:
+                result_text = "BARRAGE OVER"
             else:
-                game_over_text = "GAME OVER"
-                
-            label_x = (self.display.width - (len(game_over_text) * 6 * self.scale)) // (2 * self.scale)
-            label_y = (self.display.height // 2) // self.scale - 10
-            game_over_label = Label(self.font, text=game_over_text, color=self.sprite_manager.palette[10], x=label_x, y=label_y)
-            self.text_group.append(game_over_label)
-            game_over_labels.append(game_over_label)
+                result_text = "GAME OVER"
+        self.labels.show("result", result_text, self.sprite_manager.palette[10], x=self.centered_label_x(result_text))
 
+        if not self.game_win:
             # Create explosions
-            explosion_groups = []
-            wall_y_start = 25 * self.scale # From top_wall_sprite.y
+            wall_y_start = self.sprite_manager.SPRITES["top_wall"]["y"] * self.scale
+            explosion_size = 16 * self.scale
             for _ in range(30):
-                exp_x = random.randint(0, self.display.width - (16 * self.scale))
-                exp_y = random.randint(wall_y_start, self.display.height - (16 * self.scale))
-                exp_sprite = self.sprite_manager.create_sprite("explosion", 0, 0)
-                exp_group = Group(scale=self.scale, x=exp_x, y=exp_y)
-                exp_group.append(exp_sprite) # <-- ***** THE REAL FIX IS HERE *****
-                self.main_group.append(exp_group)
-                explosion_groups.append(exp_group)
+                exp_x = random.randint(0, self.display.width - explosion_size)
+                exp_y = random.randint(wall_y_start, self.display.height - explosion_size)
+                self.explode(exp_x, exp_y, GAME_OVER_EXPLOSION_FRAMES)
 
             # Show explosions for 2 seconds using a non-blocking loop
-            # to allow auto-refresh
-            explosion_timer = 200 # 200 * (1/100) = 2 seconds
-            while explosion_timer > 0:
+            # to allow auto-refresh; the frame clock expires them
+            while self.explosions.active:
                 # We still need to poll for 'R' here in case
                 # the user wants to skip the explosion display
-                available = supervisor.runtime.serial_bytes_available
-                cur_btn_val = sys.stdin.read(available) if available else None
-                self.process_keyboard_input(cur_btn_val)
+                self.process_keyboard_input(self.read_input())
                 if self.game_state != STATE_GAME_OVER:
                     break # User reset during explosions
 
                 self.display.refresh()
                 time.sleep(0.01) # THIS IS THE FIX
-                explosion_timer -= 1
+                self.tick_frame()
                 
             
             if self.game_state != STATE_GAME_OVER:
                 # Clean up explosions and exit if user reset
-                for exp_group in explosion_groups:
-                    if exp_group in self.main_group:
-                        self.main_group.remove(exp_group)
+                self.explosions.clear()
+                self.particles.clear()
                 return # Exit handle_game_over
 
-            for exp_group in explosion_groups:
-                if exp_group in self.main_group:
-                    self.main_group.remove(exp_group)
+            if DEBUG_STATS:
+                print("Explosion pool peak:", self.explosions.peak, "of", MAX_EXPLOSIONS)
 
             # self.bomber.run_off_screen() # No longer run off screen
 
         # Handle Score Display
-        score_label_y = (self.display.height // 2) // self.scale + 10
-        if self.score > self.high_score:
-            self.high_score = self.score
-            score_text = f"New High: {self.score}"
-            score_label = Label(self.font, text=score_text, color=self.sprite_manager.palette[10], x=10, y=score_label_y)
+        if new_high:
+            self.labels.show("final_score", f"New High: {self.score}", self.sprite_manager.palette[10])
+        elif barrage:
+            self.labels.show("final_score", f"Peak: {self.barrage.peak} bombs", self.sprite_manager.palette[1])
         else:
-            score_text = f"Score: {self.score}"
-            score_label = Label(self.font, text=score_text, color=self.sprite_manager.palette[1], x=10, y=score_label_y)
-
-        self.text_group.append(score_label)
-        game_over_labels.append(score_label)
-
-        reset_text = "Press 'R' to Restart"
-        label_x = (self.display.width - (len(reset_text) * 6 * self.scale)) // (2 * self.scale)
-        label_y = score_label_y + 20
-        reset_label = Label(self.font, text=reset_text, color=self.sprite_manager.palette[1], x=label_x, y=label_y)
-        self.text_group.append(reset_label)
-        game_over_labels.append(reset_label)
+            self.labels.show("final_score", f"Score: {self.score}", self.sprite_manager.palette[1])
+        self.labels.show("restart")
 
         # Make sure the game over text is visible
         self.text_group.hidden = False
@@ -1301,16 +2770,27 @@ class Game:
         
         self.display.refresh() # <-- ADDED REFRESH CALL
 
+        self.telemetry.flush() # Idle until the player restarts
+        if self.latency:
+            self.latency.report()
+        self.idle.report() # Duty cycle of the idle screens so far
+
         # Wait for reset key
+        if not self.networked:
+            self.display.auto_refresh = False # idle_frame refreshes after each change
         while True:
-            available = supervisor.runtime.serial_bytes_available
-            cur_btn_val = sys.stdin.read(available) if available else None
-            self.process_keyboard_input(cur_btn_val)
+            self.process_keyboard_input(self.read_input())
 
             # reset action is in process_keyboard_input
             if self.game_state == STATE_TITLE:
                 break
-            time.sleep(0.01) # Keep polling
+            if self.leaderboard and not self.networked:
+                self.leaderboard.service() # Idle: one short upload step per frame
+            if self.networked:
+                time.sleep(0.01) # The peer keeps hearing from us at the full rate
+            else:
+                self.idle_frame(STATE_GAME_OVER)
+        self.idle.finish()
             
     def reset_game_from_game_over(self):
         """Action to reset from game over (called by input)."""
@@ -1319,6 +2799,7 @@ class Game:
         # --- Reset for TITLE State ---
         self.game_state = STATE_TITLE
         self.game_mode = 0 # Reset mode selection
+        self.networked = False
         
         # Hide all game over/gameplay elements
         self.title_group.hidden = False
@@ -1334,21 +2815,45 @@ class Game:
         self.title_text_group.hidden = False
         self.p1_mode_label.hidden = False
         self.p2_mode_label.hidden = False
+        self.p3_mode_label.hidden = False
         
         # We don't need to reset the animation, as we are not returning to Title
 
 
     def run(self):
         self.display.root_group = self.main_group
+        self.display.refresh()
+        self.mark_boot("first_frame")
+        self.resume_from_snapshot()
+        self.next_tick_ns = time.monotonic_ns()
 
         while True:
+            frame_start = time.monotonic_ns()
+            state = self.game_state
+            playing = state == STATE_PLAYING
+            idle = self.idle_screen()
+            if not idle and self.idle.state is not None:
+                self.idle.finish()
+            # While PLAYING (and always when timing latency) end_frame decides when to refresh,
+            # and idle_frame on idle screens
+            manual_refresh = playing or idle or self.latency is not None
+            if self.display.auto_refresh == manual_refresh:
+                self.display.auto_refresh = not manual_refresh
+            if not playing and (self.frames_skipped or self.schedule_resets):
+                self.log_frame_skips() # The round just ended
+
             if self.game_state == STATE_TITLE:
+                self.load_step() # Build gameplay assets while the title is up
                 if self.title_animation_state != TITLE_ANIM_DONE:
                     self.handle_title_animation()
                 else:
                     self.handle_title_input()
+                    if self.leaderboard and self.loader is None:
+                        self.leaderboard.service() # Idle: one short upload step per frame
 
             elif self.game_state == STATE_READY:
+                self.telemetry.flush() # Only writes if events are waiting
+                self.load_step() # A resumed game skips the title; finish startup here
                 self.handle_ready_input() # This now handles P1/P2 ready state
 
             elif self.game_state == STATE_PAUSED:
@@ -1357,95 +2862,67 @@ class Game:
             elif self.game_state == STATE_GAME_OVER:
                 self.handle_game_over()
 
+            elif self.game_state == STATE_PLAYING and self.game_mode == MODE_BARRAGE:
+                self.update_barrage()
+
+            elif self.game_state == STATE_PLAYING and self.networked:
+                self.update_netplay()
+
             elif self.game_state == STATE_PLAYING:
                 # Level complete = Bomber ran out of bombs and all are off-screen
-                level_complete = (self.bombs_dropped == self.bomb_count) and not self.bombs and not self.splash
-
-                if not level_complete:
+                if not self.level_complete():
                     self.handle_gameplay_input() # Handles P1 and P2 (if 2P) input
                 else:
                     # P1 (Bucket) WINS the round
-                    self.audio.stop()
-                    self.audio.play(self.audio.sound_level_up)
-                    self.current_level += 1
-
-                    for bomb in self.bombs:
-                        bomb.destroy()
-                    self.bombs.clear()
-                    self.bombs_dropped = 0
-
-                    self.set_level_params(self.current_level)
-                    self.bomb_drop_timer = 0
-                    
-                    # Go back to READY state, reset player ready status
-                    self.p1_ready = False
-                    self.p2_ready = False
-                    self.p1_ready_label.text = "P1: PRESS START"
-                    self.p1_ready_label.color = 0xFFFFFF
-                    self.p2_ready_label.text = "P2: PRESS START"
-                    self.p2_ready_label.color = 0xFFFFFF
-                    self.p1_ready_label.hidden = False
-                    if self.game_mode == 2:
-                        self.p2_ready_label.hidden = False
-                    
-                    self.game_state = STATE_READY 
+                    self.complete_level()
                     continue
 
-                # Update game logic
-                if self.game_mode == 1:
-                    # Call AI update
-                    self.bomber.update(self.bomber_speed, self.enemy_step, self.params["directionChangeLB"], self.params["directionChangeUB"])
-                
-                self.bomb_flicker()
-                
-                # Tick down bomb drop rate limiter (for P2)
                 if self.game_mode == 2:
-                    if self.bomb_drop_timer > 0:
-                        self.bomb_drop_timer -= 1
-                elif self.game_mode == 1:
+                    self.tick_versus(*self.local_inputs())
+                else:
+                    # Call AI update
+                    if self.level[LEVEL_AI_TIER]:
+                        self.plan_bomber()
+                    else:
+                        self.bomber.update(self.level)
+
                     # AI Bomb Spawning Logic
                     if not self.bombs_dropped == self.bomb_count:
-                        self.bomb_drop_timer += 1 / 100
+                        self.bomb_drop_timer += 1
                         if self.bombs_dropped == 0:
                             self.spawn_bomb()
                             self.bomb_drop_timer = 0
-                            if self.params["dropIntervalLB"] >= self.params["dropIntervalUB"]:
-                                self.drop_interval = self.params["dropIntervalLB"]
-                            else:
-                                self.drop_interval = random.randint(self.params["dropIntervalLB"], self.params["dropIntervalUB"])
-                        elif self.bomb_drop_timer >= self.drop_interval / 100 and self.bombs_dropped < self.bomb_count:
+                            self.drop_interval = self.next_drop_interval()
+                        elif self.bombs_dropped < self.bomb_count and self.drop_due():
                             self.bomb_drop_timer = 0
                             self.spawn_bomb()
-                            if self.params["dropIntervalLB"] >= self.params["dropIntervalUB"]:
-                                self.drop_interval = self.params["dropIntervalLB"]
-                            else:
-                                self.drop_interval = random.randint(self.params["dropIntervalLB"], self.params["dropIntervalUB"])
+                            self.drop_interval = self.next_drop_interval()
 
-                # Spawn bombs (now handled by P2 input in process_keyboard_input or AI logic above)
- 
-                # Update bombs and splash
-                self.update_bombs()
-                self.bucket_splash(self.splash)
+                    # Update bucket, bombs and splash
+                    self.move_players(self.local_inputs()[0])
+                    self.update_bombs()
+                    self.bucket_splash(self.splash)
 
-            #self.display.refresh() # <-- This was the slowdown, now commented out
-            time.sleep(1/100)
+            if playing:
+                self.animate_palette()
+                self.show_score()
+
+            self.tick_frame()
+            if idle:
+                self.idle_frame(state)
+            else:
+                self.end_frame(manual_refresh, frame_start if playing else 0)
 
 # --- Main execution ---
 if __name__ == "__main__":
-    try:
-        request_display_config(320,240)
-        main_display = supervisor.runtime.display
-    except (ImportError, AttributeError, OSError) as e:
-        print(f"Could not request display: {e}")
-        # Create a dummy display object if hardware fails
-        class DummyDisplay:
-            width = 320
-            height = 240
-            root_group = None
-            def refresh(self):
-                pass
-        main_display = DummyDisplay()
-
+    if DEBUG_RESOLUTION_BENCHMARK:
+        for width, height in ((320, 240), (640, 480)):
+            benchmark_resolution(Game(open_display(width, height)))
+            gc.collect()
+    main_display = open_display(DISPLAY_WIDTH, DISPLAY_HEIGHT)
 
     game = Game(main_display)
-    game.run()
\ No newline at end of file
+    if DEBUG_PARTICLE_BENCHMARK:
+        main_display.root_group = game.main_group
+        benchmark_particles(game)
+    game.run()
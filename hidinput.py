@@ -0,0 +1,224 @@
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+try:
+    from usb.core import USBError, USBTimeoutError
+except ImportError:
+    # No USB host here; ReplayDevice raises these off-device
+    class USBError(OSError):
+        pass
+
+    class USBTimeoutError(USBError):
+        pass
+
+# --- HID Constants ---
+REPORT_SIZE = const(8) # Boot keyboards and most cheap gamepads send 8 byte reports
+READ_TIMEOUT_MS = const(1) # Per poll; the game polls one device per tick, so a tick waits at most this
+ENDPOINT_IN = const(0x81)
+KEY_HOLD_TICKS = const(6) # A serial key stays held this long after its last byte
+
+# Boot keyboard usage ID -> the text the serial console would have sent
+KEY_USAGES = {
+    0x04: "a", 0x07: "d", 0x15: "r", 0x16: "s",
+    0x1E: "1", 0x1F: "2", 0x20: "3",
+    0x28: "\r", 0x2C: " ",
+    0x4F: "\x1b[C", 0x50: "\x1b[D", 0x51: "\x1b[B", 0x52: "\x1b[A",
+}
+
+# Gamepad buttons as (key, report byte, mask, value when pressed). This is
+# the common SNES-style pad (0079:0011): d-pad on bytes 3/4, buttons on 5/6.
+GAMEPAD_LAYOUT = (
+    ("a", 3, 0xFF, 0x00), # D-pad left
+    ("d", 3, 0xFF, 0xFF), # D-pad right
+    (" ", 5, 0x20, 0x20), # A: ready / resume
+    ("1", 5, 0x40, 0x40), # B: 1-player on the title
+    ("2", 5, 0x10, 0x10), # X: 2-player on the title
+    ("r", 6, 0x10, 0x10), # Select: restart after game over
+    (" ", 6, 0x20, 0x20), # Start
+)
+GAMEPAD_IDS = ((0x0079, 0x0011), (0x081F, 0xE401)) # (vendor, product)
+
+# --- KeyboardInput Class ---
+class KeyboardInput:
+    """USB boot-protocol keyboard read straight from its HID reports.
+
+    Each report lists up to six keys held down. Comparing it with the
+    previous report gives presses and releases exactly, so read() returns
+    each key once per press, the same text the serial console would send,
+    and is_held() reports keys that are still down.
+    """
+    def __init__(self, device, endpoint=ENDPOINT_IN):
+        self.device = device
+        self.endpoint = endpoint
+        self.report = bytearray(REPORT_SIZE)
+        self.previous = bytearray(REPORT_SIZE)
+        self.enabled = True
+
+    def poll(self):
+        """Read one report into self.report. Returns False when there is none."""
+        if not self.enabled:
+            return False
+        try:
+            count = self.device.read(self.endpoint, self.report, timeout=READ_TIMEOUT_MS)
+        except USBTimeoutError:
+            return False # No new report
+        except USBError as e:
+            # Unplugged: stop polling it
+            print(f"USB input disabled: {e}")
+            self.enabled = False
+            return False
+        return count > 0
+
+    def read(self):
+        """Text for every key pressed since the last read."""
+        if not self.poll():
+            return ""
+        keys = ""
+        report, previous = self.report, self.previous
+        for i in range(2, REPORT_SIZE):
+            usage = report[i]
+            if usage and not self._was_down(usage):
+                keys += KEY_USAGES.get(usage, "")
+        previous[:] = report
+        return keys
+
+    def _was_down(self, usage):
+        previous = self.previous
+        for i in range(2, REPORT_SIZE):
+            if previous[i] == usage:
+                return True
+        return False
+
+    def is_held(self, key):
+        for i in range(2, REPORT_SIZE):
+            if KEY_USAGES.get(self.previous[i]) == key:
+                return True
+        return False
+
+# --- GamepadInput Class ---
+class GamepadInput(KeyboardInput):
+    """USB gamepad decoded through a (key, byte, mask, value) layout."""
+    def __init__(self, device, layout=GAMEPAD_LAYOUT, endpoint=ENDPOINT_IN):
+        super().__init__(device, endpoint)
+        self.layout = layout
+        self.held = 0 # One bit per layout entry
+
+    def read(self):
+        if not self.poll():
+            return ""
+        keys = ""
+        held = 0
+        report = self.report
+        for bit in range(len(self.layout)):
+            key, index, mask, value = self.layout[bit]
+            if report[index] & mask == value:
+                held |= 1 << bit
+                if not self.held & (1 << bit):
+                    keys += key
+        self.held = held
+        self.previous[:] = report
+        return keys
+
+    def is_held(self, key):
+        for bit in range(len(self.layout)):
+            if self.layout[bit][0] == key and self.held & (1 << bit):
+                return True
+        return False
+
+# --- HeldKeys Class ---
+class HeldKeys:
+    """Held state for movement keys, from every input source.
+
+    USB devices report releases, so they are asked directly. The serial
+    console only sends a byte per press and per terminal autorepeat, so a
+    serial key counts as held until hold_ticks pass without another byte.
+    """
+    def __init__(self, keys, devices=(), hold_ticks=KEY_HOLD_TICKS):
+        self.keys = keys
+        self.devices = devices
+        self.hold_ticks = hold_ticks
+        self.timers = bytearray(len(keys)) # Ticks left per serial key
+
+    def press(self, key):
+        self.timers[self.keys.index(key)] = self.hold_ticks
+
+    def release(self):
+        for i in range(len(self.timers)):
+            self.timers[i] = 0
+
+    def tick(self):
+        timers = self.timers
+        for i in range(len(timers)):
+            if timers[i]:
+                timers[i] -= 1
+
+    def is_held(self, key):
+        if self.timers[self.keys.index(key)]:
+            return True
+        for device in self.devices:
+            if device.is_held(key):
+                return True
+        return False
+
+    def direction(self, left, right):
+        """-1, 0 or 1 from a pair of opposing keys; both held cancel out."""
+        return self.is_held(right) - self.is_held(left)
+
+def find_hid_inputs():
+    """Attach to every boot keyboard and known gamepad on the USB host ports."""
+    try:
+        import usb.core
+    except ImportError:
+        return [] # No USB host support on this board
+    inputs = []
+    for device in usb.core.find(find_all=True):
+        try:
+            if (device.idVendor, device.idProduct) in GAMEPAD_IDS:
+                interface, endpoint = 0, ENDPOINT_IN
+                make = GamepadInput
+            else:
+                import adafruit_usb_host_descriptors
+                interface, endpoint = adafruit_usb_host_descriptors.find_boot_keyboard_endpoint(device)
+                if interface is None:
+                    continue
+                make = KeyboardInput
+            device.set_configuration()
+            if device.is_kernel_driver_active(interface):
+                device.detach_kernel_driver(interface)
+        except (ImportError, AttributeError, OSError) as e:
+            print(f"Skipping USB device: {e}")
+            continue
+        print(f"USB input: {make.__name__} {device.idVendor:04x}:{device.idProduct:04x}")
+        inputs.append(make(device, endpoint=endpoint))
+    return inputs
+
+# --- ReplayDevice Class ---
+class ReplayDevice:
+    """Stands in for a usb.core.Device, playing back recorded HID reports.
+
+    Every read() returns the next report, or raises a timeout once they run
+    out, so KeyboardInput and GamepadInput run unchanged off-device.
+    """
+    def __init__(self, reports):
+        self.reports = list(reports)
+
+    def read(self, endpoint, buffer, timeout=None):
+        if not self.reports:
+            raise USBTimeoutError("no more reports")
+        report = self.reports.pop(0)
+        buffer[:len(report)] = report
+        return len(report)
+
+# --- Host-side decoder: python hidinput.py reports.bin [gamepad] ---
+if __name__ == "__main__":
+    import sys
+    with open(sys.argv[1], "rb") as report_file:
+        data = report_file.read()
+    reports = [data[i:i + REPORT_SIZE] for i in range(0, len(data) - REPORT_SIZE + 1, REPORT_SIZE)]
+    device = ReplayDevice(reports)
+    source = GamepadInput(device) if "gamepad" in sys.argv[2:] else KeyboardInput(device)
+    for number in range(len(reports)):
+        print(number, repr(source.read()))
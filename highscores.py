@@ -0,0 +1,94 @@
+import struct
+import binascii
+
+# --- High Score Constants ---
+HIGH_SCORE_ENTRIES = 5
+HIGH_SCORE_NVM_OFFSET = 0 # Region of microcontroller.nvm used by the log
+HIGH_SCORE_NVM_LENGTH = 1024
+RECORD_MAGIC = 0xB5
+_SEQUENCE_MASK = 0xFFFFFFFF
+
+# magic, sequence, then (score, level, mode) per entry; CRC32 follows
+_BODY_FORMAT = "<BI" + "IBB" * HIGH_SCORE_ENTRIES
+_BODY_SIZE = struct.calcsize(_BODY_FORMAT)
+RECORD_SIZE = _BODY_SIZE + 4
+
+# --- HighScoreTable Class ---
+class HighScoreTable:
+    """Top scores kept in NVM as an append-only, wear-leveled record log.
+
+    Every record is a full snapshot of the table with a sequence number and
+    CRC. New records go in the slot after the newest one and wrap around the
+    region, so each game over costs one small write and flash wear is spread
+    over every slot. At boot one linear scan finds the newest valid record.
+    Any bytearray works as nvm, which is how the table runs off-device.
+    """
+    def __init__(self, nvm, offset=HIGH_SCORE_NVM_OFFSET, length=HIGH_SCORE_NVM_LENGTH):
+        self.nvm = nvm
+        self.offset = offset
+        self.slots = min(length, len(nvm) - offset) // RECORD_SIZE
+        if self.slots < 1:
+            raise ValueError("NVM region too small for a high score record")
+        self.entries = [] # (score, level, mode), best first
+        self.sequence = 0
+        self.slot = -1 # Slot holding the newest record
+        self.load()
+
+    def load(self):
+        """Scan every slot once and keep the newest record whose CRC checks out."""
+        self.entries = []
+        self.sequence = 0
+        self.slot = -1
+        for slot in range(self.slots):
+            start = self.offset + slot * RECORD_SIZE
+            record = bytes(self.nvm[start:start + RECORD_SIZE])
+            if record[0] != RECORD_MAGIC:
+                continue
+            crc = struct.unpack_from("<I", record, _BODY_SIZE)[0]
+            if binascii.crc32(record[:_BODY_SIZE]) & 0xFFFFFFFF != crc:
+                continue
+            fields = struct.unpack_from(_BODY_FORMAT, record)
+            # Serial number compare, so the log keeps working after the sequence wraps
+            if self.slot >= 0 and not 0 < (fields[1] - self.sequence) & _SEQUENCE_MASK < 0x80000000:
+                continue
+            self.sequence = fields[1]
+            self.slot = slot
+            self.entries = [fields[i:i + 3] for i in range(2, len(fields), 3) if fields[i]]
+
+    def best(self):
+        return self.entries[0][0] if self.entries else 0
+
+    def qualifies(self, score):
+        if score <= 0:
+            return False
+        return len(self.entries) < HIGH_SCORE_ENTRIES or score > self.entries[-1][0]
+
+    def submit(self, score, level, mode):
+        """Insert a finished game. Returns its rank (0 = best) or -1 if it didn't place."""
+        if not self.qualifies(score):
+            return -1
+        rank = 0
+        while rank < len(self.entries) and self.entries[rank][0] >= score:
+            rank += 1
+        self.entries.insert(rank, (score, level, mode))
+        del self.entries[HIGH_SCORE_ENTRIES:]
+        self._append()
+        return rank
+
+    def _append(self):
+        self.sequence = (self.sequence + 1) & _SEQUENCE_MASK
+        self.slot = (self.slot + 1) % self.slots
+
+        values = [RECORD_MAGIC, self.sequence]
+        for i in range(HIGH_SCORE_ENTRIES):
+            if i < len(self.entries):
+                score, level, mode = self.entries[i]
+                values.extend((score, min(level, 255), mode))
+            else:
+                values.extend((0, 0, 0))
+        record = bytearray(RECORD_SIZE)
+        struct.pack_into(_BODY_FORMAT, record, 0, *values)
+        struct.pack_into("<I", record, _BODY_SIZE, binascii.crc32(record[:_BODY_SIZE]) & 0xFFFFFFFF)
+
+        start = self.offset + self.slot * RECORD_SIZE
+        self.nvm[start:start + RECORD_SIZE] = record
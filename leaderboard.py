@@ -0,0 +1,358 @@
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+import errno
+import struct
+import time
+
+# --- Leaderboard Constants ---
+LEADERBOARD_PATH = "/sd/leaderboard.bin" # Queued records survive power cycles here
+LEADERBOARD_QUEUE = const(64) # Oldest records are dropped past this
+LEADERBOARD_BATCH = const(16) # Records per upload
+LEADERBOARD_LINGER_MS = const(60000) # A part batch waits this long after the last game for company
+LEADERBOARD_TIMEOUT_MS = const(2000) # An upload spread over idle frames fails after this long
+LEADERBOARD_BACKOFF_MS = const(1000) # First retry delay, doubled per failure
+LEADERBOARD_MAX_BACKOFF_MS = const(300000)
+LEADERBOARD_MAX_FAILURES = const(8) # Then stop trying until the next boot
+
+_EISCONN = getattr(errno, "EISCONN", 106) # Not in every port's errno module
+
+# score, level, mode, replay hash
+QUEUE_RECORD_FORMAT = "<IBBI"
+QUEUE_RECORD_SIZE = struct.calcsize(QUEUE_RECORD_FORMAT)
+
+def parse_url(url):
+    """(host, port, path) for a plain http:// URL."""
+    if not url.startswith("http://"):
+        raise ValueError(f"Leaderboard URL must be http://, got {url!r}")
+    rest = url[7:]
+    slash = rest.find("/")
+    host, path = (rest, "/") if slash < 0 else (rest[:slash], rest[slash:])
+    port = 80
+    if ":" in host:
+        host, port = host.split(":")
+        port = int(port)
+    return host, port, path
+
+def _would_block(error):
+    """True for the error a non-blocking socket raises when it has nothing to do yet."""
+    return isinstance(error, TimeoutError) or (bool(error.args) and error.args[0] in (
+        errno.EAGAIN, errno.ETIMEDOUT, errno.EINPROGRESS, errno.EALREADY))
+
+def encode_batch(records):
+    """JSON body for a batch of (score, level, mode, replay hash) records."""
+    return ('{"scores":[' + ",".join(
+        '{"score":%d,"level":%d,"mode":%d,"replay":"%08x"}' % record for record in records) + "]}").encode()
+
+# --- Leaderboard Class ---
+class Leaderboard:
+    """Offline-first score uploads.
+
+    submit() only queues a finished game, in RAM and in a small file on the
+    SD card. Once a batch is full or the queue has sat for linger_ms,
+    service() starts one POST on a kept-alive HTTP connection and moves it
+    along one short step per call: a non-blocking connect polled until it
+    is up, then non-blocking sends and reads until the reply is in. The
+    server's address is looked up once, by attach(), when WiFi comes up. The game calls it from idle states only,
+    so nothing network-related ever runs during PLAYING. Failed uploads
+    back off exponentially and give up for the session after
+    LEADERBOARD_MAX_FAILURES in a row; the queue stays on the SD card for
+    the next boot.
+    """
+    def __init__(self, url, pool=None, path=LEADERBOARD_PATH, linger_ms=LEADERBOARD_LINGER_MS):
+        self.host, self.port, self.path = parse_url(url)
+        self.pool = None # Attached by the game once WiFi is up; uploads wait until then
+        self.address = None # The server's, resolved by attach()
+        self.queue_path = path
+        self.linger_ms = linger_ms
+        self.queue = []
+        self.submitted_at = 0 # ms; records left from the last boot are due at once
+        self.socket = None
+        self.reused = False # The open socket has already carried a request
+        self.upload = None # Generator for the POST in flight
+        self.batch_size = 0 # Records it carries
+        self.deadline = 0 # ms
+        self.response = bytearray(512)
+        self.failures = 0
+        self.retry_at = 0
+        # Totals, for report()
+        self.uploaded = 0
+        self.batches = 0
+        self.connections = 0
+        self.load()
+        if pool is not None:
+            self.attach(pool)
+
+    def attach(self, pool):
+        """Upload through pool from now on. Looks up the server here, not in an upload step."""
+        self.pool = pool
+        if pool is None:
+            return
+        try:
+            self.address = pool.getaddrinfo(self.host, self.port)[0][4]
+        except OSError as e:
+            print(f"Leaderboard server {self.host} not found: {e}")
+
+    def load(self):
+        try:
+            with open(self.queue_path, "rb") as queue_file:
+                data = queue_file.read()
+        except OSError:
+            return # Nothing queued, or no SD card
+        for offset in range(0, len(data) - QUEUE_RECORD_SIZE + 1, QUEUE_RECORD_SIZE):
+            self.queue.append(struct.unpack_from(QUEUE_RECORD_FORMAT, data, offset))
+        del self.queue[:-LEADERBOARD_QUEUE]
+
+    def save(self):
+        """Rewrite the queue file. Call only from idle states."""
+        try:
+            with open(self.queue_path, "wb") as queue_file:
+                for record in self.queue:
+                    queue_file.write(struct.pack(QUEUE_RECORD_FORMAT, *record))
+        except OSError:
+            pass # No SD card: the queue lives in RAM until power off
+
+    def submit(self, score, level, mode, replay_hash):
+        """Queue a finished game for upload."""
+        self.queue.append((score, level & 0xFF, mode, replay_hash & 0xFFFFFFFF))
+        del self.queue[:-LEADERBOARD_QUEUE]
+        self.submitted_at = time.monotonic_ns() // 1000000
+        self.save()
+
+    def service(self):
+        """Move the upload in flight one step, starting one if a batch is due. Call only from idle states."""
+        now = time.monotonic_ns() // 1000000
+        if self.upload is None:
+            if not self.queue or self.failures >= LEADERBOARD_MAX_FAILURES:
+                return
+            if now < self.retry_at:
+                return
+            if len(self.queue) < LEADERBOARD_BATCH and now - self.submitted_at < self.linger_ms:
+                return # More games may follow
+            batch = self.queue[:LEADERBOARD_BATCH]
+            self.batch_size = len(batch)
+            self.upload = self.post(encode_batch(batch))
+            self.deadline = now + LEADERBOARD_TIMEOUT_MS
+        try:
+            if now >= self.deadline:
+                raise OSError("timed out")
+            next(self.upload)
+            return # Still connecting, sending or waiting for the reply
+        except StopIteration:
+            pass
+        except (OSError, ValueError) as e:
+            self.upload = None
+            if isinstance(e, OSError):
+                self.close()
+            self.failures += 1
+            self.retry_at = now + min(LEADERBOARD_BACKOFF_MS << (self.failures - 1), LEADERBOARD_MAX_BACKOFF_MS)
+            print(f"Leaderboard upload failed ({self.failures}): {e}")
+            return
+        self.upload = None
+        self.failures = 0
+        del self.queue[:self.batch_size]
+        self.save()
+        self.uploaded += self.batch_size
+        self.batches += 1
+
+    def post(self, body):
+        """Generator: POST body on the kept-alive connection, reconnecting once if the server dropped it.
+
+        Yields whenever the network isn't ready, so each step returns at once."""
+        if self.socket is not None and self.reused:
+            try:
+                yield from self._request(body)
+                return
+            except OSError:
+                self.close() # Closed while idle; try a fresh connection
+        yield from self._request(body)
+
+    def _connect(self):
+        """Generator: connect without blocking, yielding until the connection is up."""
+        if self.address is None:
+            raise OSError("no network")
+        pool = self.pool
+        self.socket = pool.socket(pool.AF_INET, pool.SOCK_STREAM)
+        self.socket.settimeout(0) # The socket never blocks
+        self.reused = False
+        while True:
+            try:
+                self.socket.connect(self.address) # Asked again until it reports connected
+                break
+            except OSError as e:
+                if e.args and e.args[0] == _EISCONN:
+                    break
+                if not _would_block(e):
+                    raise
+            yield # Still connecting
+        self.connections += 1
+
+    def _request(self, body):
+        if self.socket is None:
+            yield from self._connect()
+        request = (f"POST {self.path} HTTP/1.1\r\nHost: {self.host}\r\n"
+                   f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                   "Connection: keep-alive\r\n\r\n").encode() + body
+        view = memoryview(request)
+        while view:
+            try:
+                view = view[self.socket.send(view):]
+            except OSError as e:
+                if not _would_block(e):
+                    raise
+                yield # Send buffer full
+        self.reused = True
+        status, keep_alive = yield from self._read_response()
+        if not keep_alive:
+            self.close()
+        if not 200 <= status < 300:
+            raise ValueError(f"HTTP {status}")
+
+    def _read_response(self):
+        """Generator: read one response. Returns (status, whether the connection stays open)."""
+        data = b""
+        while b"\r\n\r\n" not in data:
+            size = yield from self._recv(len(self.response))
+            data += self.response[:size]
+        head, body = data.split(b"\r\n\r\n", 1)
+        lines = head.decode().split("\r\n")
+        status = int(lines[0].split(" ")[1])
+        length = 0
+        keep_alive = True
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            name = name.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "connection" and value.strip().lower() == "close":
+                keep_alive = False
+        remaining = length - len(body)
+        while remaining > 0:
+            remaining -= yield from self._recv(min(remaining, len(self.response)))
+        return status, keep_alive
+
+    def _recv(self, size):
+        """Generator: read up to size bytes into self.response, yielding until some arrive."""
+        while True:
+            try:
+                size = self.socket.recv_into(self.response, size)
+            except OSError as e:
+                if not _would_block(e):
+                    raise
+                yield # Nothing yet
+                continue
+            if not size:
+                raise OSError("connection closed")
+            return size
+
+    def close(self):
+        if self.socket is not None:
+            try:
+                self.socket.close()
+            except OSError:
+                pass
+            self.socket = None
+
+    def report(self, out=None):
+        line = (f"leaderboard uploaded={self.uploaded} batches={self.batches} "
+                f"connections={self.connections} queued={len(self.queue)} failures={self.failures}")
+        if out is None:
+            print(line)
+        else:
+            out.write(line + "\n")
+
+def open_leaderboard():
+    """Leaderboard for the URL in settings.toml (PYBOOM_LEADERBOARD), or None."""
+    import os
+    url = os.getenv("PYBOOM_LEADERBOARD")
+    if not url:
+        return None
+    try:
+        return Leaderboard(url)
+    except ValueError as e:
+        print(f"Leaderboard disabled: {e}")
+        return None
+
+# --- Host-side stand-in server: python leaderboard.py --games 500 ---
+if __name__ == "__main__":
+    import argparse
+    import json
+    import random
+    import socket
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class StandInHandler(BaseHTTPRequestHandler):
+        """Accepts score batches like a leaderboard server would, failing some on purpose."""
+        protocol_version = "HTTP/1.1" # Keep-alive
+        disable_nagle_algorithm = True
+        received = []
+        connections = 0
+        fail = 0
+
+        def setup(self):
+            super().setup()
+            StandInHandler.connections += 1
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            if random.random() * 100 < self.fail:
+                status, reply = 503, b"busy"
+            else:
+                StandInHandler.received.extend(json.loads(body)["scores"])
+                status, reply = 200, b"ok"
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(reply)))
+            self.end_headers()
+            self.wfile.write(reply)
+
+        def log_message(self, *args):
+            pass
+
+    parser = argparse.ArgumentParser(description="Run the leaderboard client against a local stand-in server.")
+    parser.add_argument("--games", type=int, default=500, help="finished games to queue")
+    parser.add_argument("--fail", type=float, default=0, help="percent of uploads the server rejects")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--queue", default="leaderboard_test.bin")
+    args = parser.parse_args()
+
+    StandInHandler.fail = args.fail
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    client = Leaderboard(f"http://127.0.0.1:{args.port}/scores", pool=socket, path=args.queue, linger_ms=200)
+    client.queue.clear()
+    rng = random.Random(1)
+    submit_max_us = idle_frames = idle_us = idle_max_us = 0
+    start = time.monotonic_ns()
+    # Each game ends in a game over screen: one submit, then idle frames calling service()
+    for game in range(args.games):
+        frame_start = time.monotonic_ns()
+        client.submit(rng.randint(0, 20000), rng.randint(1, 12), rng.randint(1, 2), rng.getrandbits(32))
+        submit_max_us = max(submit_max_us, (time.monotonic_ns() - frame_start) // 1000)
+        for _ in range(20 if game < args.games - 1 else 100000):
+            if not client.queue or client.failures >= LEADERBOARD_MAX_FAILURES:
+                break
+            frame_start = time.monotonic_ns()
+            client.service()
+            us = (time.monotonic_ns() - frame_start) // 1000
+            idle_frames += 1
+            idle_us += us
+            idle_max_us = max(idle_max_us, us)
+            time.sleep(0.001)
+    seconds = (time.monotonic_ns() - start) / 1e9
+    client.close()
+    client.report()
+    print(f"server received {len(StandInHandler.received)} of {args.games} records "
+          f"over {StandInHandler.connections} connection(s) in {seconds:.1f}s")
+    print(f"submit() max {submit_max_us} us; service() avg {idle_us // max(idle_frames, 1)} us, "
+          f"max {idle_max_us} us over {idle_frames} idle frames; no calls while PLAYING")
+    server.shutdown()
+    try:
+        import os
+        os.remove(args.queue)
+    except OSError:
+        pass
@@ -0,0 +1,170 @@
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+# --- Level Record Layout ---
+# Each level is compiled into a tuple; the game indexes it with these
+# constants so per-frame code never looks up a string key.
+LEVEL_BOMB_COUNT = const(0)
+LEVEL_BOMB_SCORE = const(1)
+LEVEL_DROP_SPEED = const(2)
+LEVEL_DROP_LB = const(3)
+LEVEL_DROP_UB = const(4)
+LEVEL_BOMBER_SPEED = const(5)
+LEVEL_ENEMY_STEP = const(6)
+LEVEL_CHANGE_LB = const(7)
+LEVEL_CHANGE_UB = const(8)
+LEVEL_SUCCESS_STATE = const(9)
+LEVEL_AI_TIER = const(10) # 0: random walk, 1: predictive bomber (bomberai.py)
+# Derived values
+LEVEL_DROP_FIXED = const(11) # dropIntervalLB >= dropIntervalUB: no random draw needed
+LEVEL_CHANGE_FIXED = const(12) # Same for the AI direction change timer
+LEVEL_DROP_VELOCITY = const(13) # drop_speed in fixed point px/tick
+LEVEL_STEP_VELOCITY = const(14) # enemy_step in fixed point px/move
+
+# Positions and velocities in the simulation are 8.8 fixed point
+FIXED_SHIFT = const(8)
+
+# JSON key, minimum value, fractions allowed, in record order
+LEVEL_FIELDS = (
+    ("bombCount", 1, False),
+    ("bombScore", 0, False),
+    ("drop_speed", 0.25, True), # Speeds can be tuned in fractions of a pixel
+    ("dropIntervalLB", 1, False),
+    ("dropIntervalUB", 1, False),
+    ("bomberSpeed", 1, False),
+    ("enemy_step", 0.25, True),
+    ("directionChangeLB", 1, False),
+    ("directionChangeUB", 1, False),
+    ("successState", 0, False),
+    ("aiTier", 0, False),
+)
+LEVEL_DEFAULTS = {"aiTier": 0} # Fields a level may leave out
+MAX_AI_TIER = const(1)
+
+LEVEL_PATHS = ("/sd/levels.json", "levels.json") # The SD card overrides flash
+
+# levels.json is the level table. When no copy of it can be read the game
+# still starts on this one level; the rest are generated from it.
+DEFAULT_LEVELS = [
+    {"bombCount": 10, "bombScore": 1, "drop_speed": 4, "dropIntervalLB": 12, "dropIntervalUB": 22, "bomberSpeed": 1, "enemy_step": 4, "directionChangeLB": 80, "directionChangeUB": 150, "successState": 1},
+]
+
+def compile_level(number, definition):
+    """Validate one level definition and return its fixed-layout record."""
+    values = []
+    for key, minimum, fractional in LEVEL_FIELDS:
+        value = definition.get(key, LEVEL_DEFAULTS.get(key))
+        kinds = (int, float) if fractional else int
+        if not isinstance(value, kinds) or isinstance(value, bool) or value < minimum:
+            kind = "a number" if fractional else "an integer"
+            raise ValueError(f"Level {number}: '{key}' must be {kind} >= {minimum}, got {value!r}")
+        values.append(value)
+    if values[LEVEL_AI_TIER] > MAX_AI_TIER:
+        raise ValueError(f"Level {number}: 'aiTier' must be at most {MAX_AI_TIER}, got {values[LEVEL_AI_TIER]}")
+    values.append(values[LEVEL_DROP_LB] >= values[LEVEL_DROP_UB])
+    values.append(values[LEVEL_CHANGE_LB] >= values[LEVEL_CHANGE_UB])
+    values.append(round(values[LEVEL_DROP_SPEED] * (1 << FIXED_SHIFT)))
+    values.append(round(values[LEVEL_ENEMY_STEP] * (1 << FIXED_SHIFT)))
+    return tuple(values)
+
+def compile_levels(definitions):
+    if not definitions:
+        raise ValueError("No levels defined")
+    return [compile_level(number, definition) for number, definition in enumerate(definitions, 1)]
+
+def load_levels(paths=LEVEL_PATHS):
+    """Compile the first readable level file, falling back to DEFAULT_LEVELS."""
+    import json
+    for path in paths:
+        try:
+            with open(path) as level_file:
+                levels = compile_levels(json.load(level_file)["levels"])
+        except OSError:
+            continue # Not on this filesystem
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"Ignoring {path}: {e}")
+            continue
+        print(f"Loaded {len(levels)} levels from {path}")
+        return levels
+    print("No level file could be read. Using one built-in level.")
+    return compile_levels(DEFAULT_LEVELS)
+
+# --- Generated Levels ---
+# Limits for levels past the last defined one
+MAX_DROP_SPEED = const(20) # px/tick; faster bombs can skip past the bucket
+MIN_DROP_INTERVAL = const(2) # Ticks between AI drops
+MAX_ENEMY_STEP = const(16)
+MIN_DIRECTION_CHANGE = const(10)
+MAX_BOMB_COUNT = const(250)
+FALL_DISTANCE = const(240) # px a bomb covers before it is caught or missed
+# Rough per-frame costs, to be tuned against telemetry overrun events
+BASE_FRAME_COST_US = const(3000)
+BOMB_FRAME_COST_US = const(400)
+FRAME_BUDGET_US = const(10000)
+# A catch's bucket splash, which holds the level open until it has played
+SPLASH_STAGE_TICKS = const(10) # Ticks per splash stage
+SPLASH_TICKS = 3 * SPLASH_STAGE_TICKS # Then one more clears it: 31 ticks
+
+def bombs_in_flight(level):
+    """Worst case bombs on screen at once: fall time over the shortest drop interval."""
+    velocity = level[LEVEL_DROP_VELOCITY]
+    fall_ticks = ((FALL_DISTANCE << FIXED_SHIFT) + velocity - 1) // velocity
+    return (fall_ticks + level[LEVEL_DROP_LB] - 1) // level[LEVEL_DROP_LB]
+
+def within_budget(level, max_in_flight):
+    in_flight = bombs_in_flight(level)
+    return in_flight <= max_in_flight and \
+        BASE_FRAME_COST_US + in_flight * BOMB_FRAME_COST_US <= FRAME_BUDGET_US
+
+def generate_level(number, last, last_number, max_in_flight):
+    """Extrapolate a level past the defined ones, then slow drops until it fits the budget."""
+    steps = number - last_number
+    drop_lb = max(last[LEVEL_DROP_LB] - steps // 2, MIN_DROP_INTERVAL)
+    definition = {
+        "bombCount": min(last[LEVEL_BOMB_COUNT] + 10 * steps, MAX_BOMB_COUNT),
+        "bombScore": last[LEVEL_BOMB_SCORE] + steps,
+        "drop_speed": min(last[LEVEL_DROP_SPEED] + steps, MAX_DROP_SPEED),
+        "dropIntervalLB": drop_lb,
+        "dropIntervalUB": max(last[LEVEL_DROP_UB] - steps // 2, drop_lb),
+        "bomberSpeed": last[LEVEL_BOMBER_SPEED],
+        "enemy_step": min(last[LEVEL_ENEMY_STEP] + steps, MAX_ENEMY_STEP),
+        "directionChangeLB": max(last[LEVEL_CHANGE_LB] - 2 * steps, MIN_DIRECTION_CHANGE),
+        "directionChangeUB": max(last[LEVEL_CHANGE_UB] - 2 * steps, MIN_DIRECTION_CHANGE),
+        "successState": 0,
+        "aiTier": last[LEVEL_AI_TIER],
+    }
+    level = compile_level(number, definition)
+    while not within_budget(level, max_in_flight):
+        definition["dropIntervalLB"] += 1
+        definition["dropIntervalUB"] = max(definition["dropIntervalUB"], definition["dropIntervalLB"])
+        level = compile_level(number, definition)
+    return level
+
+class LevelTable:
+    """Defined levels, plus generated ones past the end kept in a small LRU."""
+    def __init__(self, levels, max_in_flight, cache_size=4):
+        self.levels = levels
+        self.max_in_flight = max_in_flight
+        self.cache_size = cache_size
+        self.cache = {}
+        self.recent = [] # Generated level numbers, least recently used first
+
+    def __len__(self):
+        return len(self.levels)
+
+    def get(self, number):
+        if number <= len(self.levels):
+            return self.levels[max(number, 1) - 1]
+        level = self.cache.get(number)
+        if level is None:
+            level = generate_level(number, self.levels[-1], len(self.levels), self.max_in_flight)
+            self.cache[number] = level
+            if len(self.recent) >= self.cache_size:
+                del self.cache[self.recent.pop(0)]
+        else:
+            self.recent.remove(number)
+        self.recent.append(number)
+        return level
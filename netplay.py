@@ -0,0 +1,485 @@
+try:
+    from micropython import const
+except ImportError:
+    def const(value):
+        return value
+
+import struct
+import time
+import array
+import binascii
+
+# --- Netplay Constants ---
+NET_PORT = const(24680) # UDP port on both boards
+NET_MAGIC = const(0x4E)
+INPUT_DELAY = const(2) # Local input is scheduled this many ticks ahead
+ROLLBACK_TICKS = const(8) # Furthest a late input can rewind; the game stalls beyond it
+INPUT_RING = const(64) # Per-tick input history, a power of two
+NET_MAX_INPUTS = const(32) # Inputs resent per packet until the peer acks them
+NO_TICK = const(0xFFFFFFFF)
+NET_WIFI_TIMEOUT_MS = const(15000) # Give up on joining the access point after this long
+
+# Input bits, one byte per player per tick
+INPUT_LEFT = const(1)
+INPUT_RIGHT = const(2)
+INPUT_DROP = const(4) # P2 only; a press, so it is never predicted
+
+# Packet flags
+FLAG_READY = const(1) # Sender's player has pressed start for the next round
+
+# magic, round, flags, ack (next tick wanted from the receiver), first tick
+# of the inputs that follow, checked tick, state CRC at that tick, input count
+PACKET_HEADER = "<BBBIIIIB"
+PACKET_HEADER_SIZE = struct.calcsize(PACKET_HEADER)
+PACKET_SIZE = PACKET_HEADER_SIZE + NET_MAX_INPUTS
+
+def input_bits(direction):
+    """Input bits for a -1, 0 or 1 direction."""
+    if direction < 0:
+        return INPUT_LEFT
+    if direction > 0:
+        return INPUT_RIGHT
+    return 0
+
+def input_direction(bits):
+    return ((bits & INPUT_RIGHT) >> 1) - (bits & INPUT_LEFT)
+
+# --- UdpLink Class ---
+class UdpLink:
+    """Non-blocking UDP socket to one peer.
+
+    pool is anything with the socketpool interface: a CircuitPython
+    SocketPool on the board, or Python's socket module on a computer.
+    """
+    def __init__(self, pool, port, peer):
+        self.peer = peer
+        self.socket = pool.socket(pool.AF_INET, pool.SOCK_DGRAM)
+        self.socket.bind(("0.0.0.0", port))
+        self.socket.setblocking(False)
+
+    def send(self, data):
+        try:
+            self.socket.sendto(data, self.peer)
+        except OSError:
+            pass # Lost like any other datagram
+
+    def receive(self, buffer):
+        """Read one datagram into buffer. Returns its size, or 0 if none is waiting."""
+        try:
+            size, _ = self.socket.recvfrom_into(buffer)
+        except OSError:
+            return 0
+        return size
+
+# --- LossyLink Class ---
+class LossyLink:
+    """Wraps a link, dropping and delaying outgoing packets like a bad network.
+
+    For host-side tests: it draws from its own random.Random so it never
+    disturbs the game's random sequence.
+    """
+    def __init__(self, link, latency_ms=0, jitter_ms=0, loss=0, seed=0):
+        import random
+        self.link = link
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.loss = loss # Percent of packets dropped
+        self.rng = random.Random(seed)
+        self.queue = [] # (due ms, packet)
+        self.sent = 0
+        self.dropped = 0
+
+    def send(self, data):
+        self.sent += 1
+        if self.rng.random() * 100 < self.loss:
+            self.dropped += 1
+            return
+        due = time.monotonic_ns() // 1000000 + self.latency_ms + self.rng.randint(0, self.jitter_ms)
+        self.queue.append((due, bytes(data)))
+        self.pump()
+
+    def pump(self):
+        """Send every packet whose delay is up; jitter can reorder them."""
+        now = time.monotonic_ns() // 1000000
+        waiting = []
+        for due, data in self.queue:
+            if due <= now:
+                self.link.send(data)
+            else:
+                waiting.append((due, data))
+        self.queue = waiting
+
+    def receive(self, buffer):
+        self.pump()
+        return self.link.receive(buffer)
+
+# --- RollbackSession Class ---
+class RollbackSession:
+    """Deterministic lockstep over UDP, with input prediction and rollback.
+
+    Both boards run the same simulation from the same start, one tick per
+    frame. Each tick needs both players' inputs: the local one is known
+    (scheduled input_delay ticks ahead), the remote one is predicted by
+    repeating the last one received. When the real input arrives and
+    differs, save_state's snapshot from before that tick is loaded and the
+    ticks since are simulated again within the same frame. The simulation
+    stalls rather than predict more than rollback_ticks ahead.
+
+    Every packet resends the local inputs the peer hasn't acknowledged, so
+    lost packets cost nothing unless several are lost in a row. simulate()
+    returns 0 while the round goes on; anything else ends the round, which
+    is only reported as finished once every input up to that tick is
+    confirmed, so a predicted miss that is rolled back never shows.
+    """
+    def __init__(self, link, role, state_size, save_state, load_state, simulate,
+                 rollback_ticks=ROLLBACK_TICKS, input_delay=INPUT_DELAY):
+        self.link = link
+        self.role = role # 0: this board plays P1 (bucket), 1: P2 (bomber)
+        self.save_state = save_state
+        self.load_state = load_state
+        self.simulate = simulate
+        self.rollback_ticks = rollback_ticks
+        self.input_delay = input_delay
+        self.states = [bytearray(state_size) for _ in range(rollback_ticks + 1)]
+        self.state_ticks = array.array("l", [-1] * (rollback_ticks + 1))
+        self.local = bytearray(INPUT_RING)
+        self.remote = bytearray(INPUT_RING) # Confirmed below remote_count, predicted above
+        self.packet = bytearray(PACKET_SIZE)
+        self.packet_view = memoryview(self.packet)
+        self.incoming = bytearray(PACKET_SIZE)
+        self.round = 0
+        self.resimulating = False
+        # Totals across rounds, for report()
+        self.rollbacks = 0
+        self.resimulated = 0
+        self.max_depth = 0
+        self.max_resim_us = 0
+        self.stalls = 0
+        self.desyncs = 0
+        self.start_round()
+
+    def start_round(self):
+        """Begin the next round at tick 0. Both boards must start from the same state."""
+        self.round = (self.round + 1) & 0xFF
+        self.tick = 0 # Next tick to simulate
+        self.local_count = self.input_delay # Local inputs scheduled so far
+        self.remote_count = self.input_delay # Remote inputs confirmed so far
+        self.remote_ack = 0 # First local input the peer is missing
+        self.rollback_to = NO_TICK
+        self.outcome = 0
+        self.end_tick = NO_TICK
+        self.checked_tick = -1
+        self.remote_ready = False
+        for i in range(INPUT_RING):
+            self.local[i] = 0
+            self.remote[i] = 0
+        for i in range(len(self.state_ticks)):
+            self.state_ticks[i] = -1
+
+    @property
+    def finished(self):
+        """The round has ended and every input up to its last tick is confirmed."""
+        return self.outcome != 0 and self.remote_count > self.end_tick
+
+    def advance(self, local_input):
+        """One frame: take in remote input, roll back if needed, then simulate the next tick.
+
+        Returns False when no new tick ran (stalled on the peer, or the round is over).
+        """
+        self.poll()
+        if self.rollback_to < self.tick:
+            self.resimulate()
+        if self.outcome:
+            return False
+        if self.tick - self.remote_count >= self.rollback_ticks:
+            self.stalls += 1
+            return False
+        self.local[self.local_count % INPUT_RING] = local_input
+        self.local_count += 1
+        self.run_tick()
+        return True
+
+    def run_tick(self):
+        tick = self.tick
+        slot = tick % len(self.states)
+        self.save_state(self.states[slot])
+        self.state_ticks[slot] = tick
+        index = tick % INPUT_RING
+        if tick >= self.remote_count:
+            # Predict: the same direction held as last time, and no new drop
+            self.remote[index] = self.remote[(self.remote_count - 1) % INPUT_RING] & ~INPUT_DROP
+        if self.role:
+            outcome = self.simulate(self.remote[index], self.local[index])
+        else:
+            outcome = self.simulate(self.local[index], self.remote[index])
+        self.tick = tick + 1
+        if outcome:
+            self.outcome = outcome
+            self.end_tick = tick
+
+    def resimulate(self):
+        """Load the state from before the first mispredicted tick and run forward again."""
+        start = time.monotonic_ns()
+        target = self.tick
+        depth = target - self.rollback_to
+        self.load_state(self.states[self.rollback_to % len(self.states)])
+        self.tick = self.rollback_to
+        self.rollback_to = NO_TICK
+        self.outcome = 0
+        self.end_tick = NO_TICK
+        self.resimulating = True
+        while self.tick < target and not self.outcome:
+            self.run_tick()
+        self.resimulating = False
+        self.rollbacks += 1
+        self.resimulated += depth
+        self.max_depth = max(self.max_depth, depth)
+        self.max_resim_us = max(self.max_resim_us, (time.monotonic_ns() - start) // 1000)
+
+    def poll(self):
+        """Read every waiting packet, confirming remote inputs and noting mispredictions."""
+        packet = self.incoming
+        while True:
+            size = self.link.receive(packet)
+            if not size:
+                return
+            if size < PACKET_HEADER_SIZE or packet[0] != NET_MAGIC:
+                continue
+            (_, round_number, flags, ack, first, check_tick, check_crc,
+             count) = struct.unpack_from(PACKET_HEADER, packet)
+            behind = (round_number - self.round) & 0xFF
+            if behind == 1:
+                self.remote_ready = True # The peer has already started the next round
+                continue
+            if behind:
+                continue # From an earlier round
+            self.remote_ready = bool(flags & FLAG_READY)
+            if ack > self.remote_ack:
+                self.remote_ack = ack
+            count = min(count, size - PACKET_HEADER_SIZE)
+            for tick in range(max(first, self.remote_count), first + count):
+                if tick != self.remote_count:
+                    break # A gap: wait for a resend
+                value = packet[PACKET_HEADER_SIZE + tick - first]
+                index = tick % INPUT_RING
+                if tick < self.tick and self.remote[index] != value and tick < self.rollback_to:
+                    self.rollback_to = tick
+                self.remote[index] = value
+                self.remote_count += 1
+            if check_tick != NO_TICK:
+                self.check(check_tick, check_crc)
+
+    def check(self, tick, crc):
+        """Compare the peer's state checksum with ours once both are final."""
+        slot = tick % len(self.states)
+        if tick <= self.checked_tick or tick >= self.tick or tick > self.remote_count or \
+           self.state_ticks[slot] != tick:
+            return
+        self.checked_tick = tick
+        if binascii.crc32(self.states[slot]) & 0xFFFFFFFF != crc:
+            self.desyncs += 1
+            print(f"netplay: desync at round {self.round} tick {tick}")
+
+    def send(self, flags=0):
+        """Send flags, every local input the peer hasn't acked, and a state checksum."""
+        first = self.remote_ack
+        count = min(self.local_count - first, NET_MAX_INPUTS)
+        # The newest saved state that no late input can change any more
+        check_tick = min(self.tick, self.remote_count) - 1
+        slot = check_tick % len(self.states)
+        if check_tick >= 0 and self.state_ticks[slot] == check_tick:
+            check_crc = binascii.crc32(self.states[slot]) & 0xFFFFFFFF
+        else:
+            check_tick, check_crc = NO_TICK, 0
+        struct.pack_into(PACKET_HEADER, self.packet, 0, NET_MAGIC, self.round, flags,
+                         self.remote_count, first, check_tick, check_crc, count)
+        for i in range(count):
+            self.packet[PACKET_HEADER_SIZE + i] = self.local[(first + i) % INPUT_RING]
+        self.link.send(self.packet_view[:PACKET_HEADER_SIZE + count])
+
+    def report(self, out=None):
+        line = (f"netplay round={self.round} ticks={self.tick} rollbacks={self.rollbacks} "
+                f"resimulated={self.resimulated} max_depth={self.max_depth} "
+                f"max_resim_us={self.max_resim_us} stalls={self.stalls} desyncs={self.desyncs}")
+        if out is None:
+            print(line)
+        else:
+            out.write(line + "\n")
+
+_socket_pool = False # Not tried yet; None once WiFi has failed
+
+def connect_socket_pool():
+    """Generator that brings up WiFi a step at a time. Returns the shared socketpool, or None.
+
+    Each step only asks the radio whether it has joined yet, so the game
+    runs one per frame instead of waiting for the access point. Once
+    tried, the result is kept and later calls return it at once.
+    """
+    global _socket_pool
+    if _socket_pool is False:
+        _socket_pool = yield from _connect_socket_pool()
+    return _socket_pool
+
+def _connect_socket_pool():
+    deadline = time.monotonic_ns() // 1000000 + NET_WIFI_TIMEOUT_MS
+    try:
+        import wifi
+        import socketpool
+    except ImportError:
+        pass
+    else:
+        # settings.toml starts the join at boot; wait for it without blocking
+        while not wifi.radio.connected:
+            if time.monotonic_ns() // 1000000 > deadline:
+                print("No network: WiFi did not connect")
+                return None
+            yield
+        return socketpool.SocketPool(wifi.radio)
+    # Fruit Jam: WiFi is on the ESP32-C6 coprocessor
+    try:
+        import os
+        import board
+        from digitalio import DigitalInOut
+        import adafruit_connection_manager
+        from adafruit_esp32spi import adafruit_esp32spi
+        esp = adafruit_esp32spi.ESP_SPIcontrol(board.SPI(), DigitalInOut(board.ESP_CS),
+                                               DigitalInOut(board.ESP_BUSY), DigitalInOut(board.ESP_RESET))
+        # connect_AP() would poll the radio for seconds; start the join and poll once per step
+        esp.wifi_set_passphrase(bytes(os.getenv("CIRCUITPY_WIFI_SSID"), "utf-8"),
+                                bytes(os.getenv("CIRCUITPY_WIFI_PASSWORD"), "utf-8"))
+        while esp.status != adafruit_esp32spi.WL_CONNECTED:
+            if time.monotonic_ns() // 1000000 > deadline:
+                raise ConnectionError("WiFi did not connect")
+            yield
+        return adafruit_connection_manager.get_radio_socketpool(esp)
+    except (ImportError, AttributeError, OSError, RuntimeError, ConnectionError, TypeError) as e:
+        print(f"No network: {e}")
+        return None
+
+def open_link():
+    """Generator returning (link, role) for the peer set in settings.toml, or (None, 0).
+
+    PYBOOM_PEER is the other board's IP address; PYBOOM_ROLE is 1 on the
+    board that plays the bucket and 2 on the one that plays the bomber.
+    WiFi comes up through connect_socket_pool(), so step this once per
+    frame as well.
+    """
+    import os
+    peer = os.getenv("PYBOOM_PEER")
+    if not peer:
+        return None, 0
+    pool = yield from connect_socket_pool()
+    if pool is None:
+        return None, 0
+    try:
+        link = UdpLink(pool, NET_PORT, (peer, NET_PORT))
+    except OSError as e:
+        print(f"Network play disabled: {e}")
+        return None, 0
+    role = int(os.getenv("PYBOOM_ROLE", 1)) - 1
+    print(f"Network play with {peer} as P{role + 1}")
+    return link, role
+
+# --- Host-side loopback test: python netplay.py --latency 60 --loss 10 ---
+if __name__ == "__main__":
+    import argparse
+    import random
+    import socket
+    import sys
+
+    class DemoSimulation:
+        """Stand-in for the game: a bucket and bomber driven by input bits, and falling bombs."""
+        BOMBS = 8
+        def __init__(self, ticks):
+            # tick, bucket x, bucket velocity, bomber x, drop timer, score, misses, bomb count, then bomb (x, y) pairs
+            self.values = array.array("i", [0] * (8 + 2 * self.BOMBS))
+            self.values[1] = 148 << 8
+            self.values[3] = 10 << 8
+            self.ticks = ticks
+
+        def save(self, buffer):
+            buffer[:] = self.values.tobytes()
+
+        def load(self, buffer):
+            self.values = array.array("i", bytes(buffer))
+
+        def simulate(self, p1_input, p2_input):
+            v = self.values
+            v[0] += 1
+            direction = input_direction(p1_input)
+            if direction:
+                v[2] = max(min(v[2] + direction * 256, 1536), -1536)
+            else:
+                v[2] = v[2] * 3 // 4
+            v[1] = max(min(v[1] + v[2], 296 << 8), 0)
+            v[3] = max(min(v[3] + input_direction(p2_input) * 900, 288 << 8), 8 << 8)
+            if v[4]:
+                v[4] -= 1
+            elif p2_input & INPUT_DROP and v[7] < self.BOMBS:
+                v[8 + 2 * v[7]] = v[3]
+                v[9 + 2 * v[7]] = 25 << 8
+                v[7] += 1
+                v[4] = 50
+            i = 0
+            while i < v[7]:
+                v[9 + 2 * i] += 1152
+                if v[9 + 2 * i] >= 184 << 8:
+                    v[5 if abs(v[8 + 2 * i] - v[1]) < 24 << 8 else 6] += 1
+                    v[7] -= 1
+                    v[8 + 2 * i] = v[8 + 2 * v[7]]
+                    v[9 + 2 * i] = v[9 + 2 * v[7]]
+                else:
+                    i += 1
+            return 1 if v[0] >= self.ticks else 0
+
+    class Bot:
+        """Holds a random direction for a random number of ticks; P2 also drops."""
+        def __init__(self, seed, dropper):
+            self.rng = random.Random(seed)
+            self.dropper = dropper
+            self.held = 0
+            self.hold = 0
+
+        def input(self):
+            if not self.hold:
+                self.held = input_bits(self.rng.randint(-1, 1))
+                self.hold = self.rng.randint(5, 60)
+            self.hold -= 1
+            if self.dropper and self.rng.random() < 0.05:
+                return self.held | INPUT_DROP
+            return self.held
+
+    parser = argparse.ArgumentParser(description="Two rollback peers over loopback UDP with injected latency and loss.")
+    parser.add_argument("--ticks", type=int, default=2000)
+    parser.add_argument("--latency", type=int, default=40, help="one-way delay in ms")
+    parser.add_argument("--jitter", type=int, default=10, help="extra random delay in ms")
+    parser.add_argument("--loss", type=float, default=5, help="percent of packets dropped")
+    parser.add_argument("--port", type=int, default=NET_PORT)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    peers = []
+    for role in (0, 1):
+        link = UdpLink(socket, args.port + role, ("127.0.0.1", args.port + 1 - role))
+        lossy = LossyLink(link, args.latency, args.jitter, args.loss, seed=args.seed + role)
+        simulation = DemoSimulation(args.ticks)
+        session = RollbackSession(lossy, role, len(simulation.values.tobytes()),
+                                  simulation.save, simulation.load, simulation.simulate)
+        peers.append((session, simulation, Bot(args.seed * 10 + role, role == 1), lossy))
+
+    start = time.monotonic()
+    frames = 0
+    while not all(session.finished for session, _, _, _ in peers):
+        for session, simulation, bot, _ in peers:
+            session.advance(bot.input())
+            session.send()
+        frames += 1
+        time.sleep(0.01)
+
+    print(f"{frames} frames for {args.ticks} ticks in {time.monotonic() - start:.1f}s")
+    for session, simulation, _, lossy in peers:
+        print(f"P{session.role + 1}: sent={lossy.sent} lost={lossy.dropped} ", end="")
+        session.report()
+    final = [binascii.crc32(simulation.values.tobytes()) for _, simulation, _, _ in peers]
+    print("final state", "match" if final[0] == final[1] else "MISMATCH", [hex(crc) for crc in final])
+    sys.exit(0 if final[0] == final[1] and not any(session.desyncs for session, _, _, _ in peers) else 1)
@@ -0,0 +1,446 @@
+"""Host-side self-play harness for balancing levels.json.
+
+Runs headless games with a bot-controlled bucket (and optionally a bot P2
+bomber) across a multiprocessing pool, one seed per worker task, and
+prints per-level statistics:
+
+    python selfplay.py --games 20000 --workers 8
+    python selfplay.py --levels sd/levels.json --p2 --csv balance.csv
+    python selfplay.py --ai-tier 1 --ai-budget 500
+
+The simulation mirrors the rules in code.py tick for tick at the game's
+100 Hz rate, using the same compiled level records from levels.py, so
+changes to drop_speed, dropIntervalLB/UB and enemy_step can be checked
+without playing them on the device.
+"""
+import random
+
+from bomberai import BomberPlanner, approach, AI_BUDGET_US
+from levels import (load_levels, LevelTable, BASE_FRAME_COST_US, BOMB_FRAME_COST_US, FRAME_BUDGET_US,
+                    FIXED_SHIFT, LEVEL_BOMB_COUNT, LEVEL_BOMB_SCORE, LEVEL_DROP_LB, LEVEL_DROP_UB,
+                    LEVEL_BOMBER_SPEED, LEVEL_CHANGE_LB, LEVEL_CHANGE_UB, LEVEL_DROP_FIXED,
+                    LEVEL_CHANGE_FIXED, LEVEL_DROP_VELOCITY, LEVEL_STEP_VELOCITY, LEVEL_AI_TIER, SPLASH_TICKS)
+
+# --- Playfield (code.py geometry at 320x240, scale 2) ---
+SCREEN_WIDTH = 320
+SCREEN_HEIGHT = 240
+MAX_BUCKETS = 3
+MAX_BOMBS = 16
+MAX_LIFE_INTERVAL = 1000
+WIN_SCORE = 100000
+BUCKET_WIDTH = 24 # 12 px tile at scale 2; also the step per key press
+BUCKET_TOP = 164 + 20 # Collision top, as in Player.get_rect
+BUCKET_BOTTOM = 164 + 72
+BOMBER_START_X = 10
+BOMBER_WIDTH = 32
+BOMBER_LEFT_WALL = 8
+BOMB_START_Y = 4 * 2 + 17
+BOMB_WIDTH = 16
+BOMB_HEIGHT = 24
+P2_DROP_TICKS = 50 # Rate limit on P2's drop key
+BUCKET_MAX_SPEED = 1536 # Held-key movement, 8.8 fixed point, as in code.py
+BUCKET_ACCEL = 256
+BUCKET_FRICTION = 512
+FIXED_HALF = 1 << (FIXED_SHIFT - 1)
+MISS_COLUMNS = 8 # Miss positions are binned into this many screen columns
+
+# Stats kept per level, summed across games and workers
+STAT_GAMES = 0 # Games that played this level at least once
+STAT_DROPPED = 1
+STAT_CAUGHT = 2
+STAT_MISSED = 3
+STAT_TICKS = 4
+STAT_COST = 5 # Sum of simulated frame cost in microseconds
+STAT_COST_MAX = 6
+STAT_OVERRUNS = 7
+STAT_AI_FRAMES = 8 # Ticks the predictive bomber planned on
+STAT_AI_US = 9 # Planning time spent in those ticks
+STAT_AI_MAX_US = 10
+STAT_AI_OVER = 11 # Ticks the planner ran past its budget
+STAT_MISS_COLUMN = 12 # First of MISS_COLUMNS counters
+STAT_COUNT = STAT_MISS_COLUMN + MISS_COLUMNS
+
+def pixel(value):
+    """Round an 8.8 fixed-point position to the pixel code.py would draw."""
+    return (value + FIXED_HALF) >> FIXED_SHIFT
+
+class Simulation:
+    """One headless game: bucket bot versus the level AI or a P2 bot."""
+    def __init__(self, levels, rng, key_interval=3, p2_bot=False, max_ticks=200000, ai_tier=None, ai_budget_us=None):
+        self.levels = levels
+        self.rng = rng
+        self.key_interval = key_interval # Ticks between bot decisions (reaction time)
+        self.p2_bot = p2_bot
+        self.max_ticks = max_ticks
+        self.ai_tier = ai_tier # Overrides every level's aiTier when set
+        self.planner = BomberPlanner(BOMBER_LEFT_WALL, SCREEN_WIDTH - BOMBER_WIDTH, BOMB_WIDTH, BUCKET_WIDTH,
+                                     BOMB_START_Y + BOMB_HEIGHT, BUCKET_TOP, SCREEN_WIDTH)
+        if ai_budget_us is not None:
+            self.planner.budget_ns = ai_budget_us * 1000
+        self.stats = {}
+
+    def level_stats(self, number):
+        stats = self.stats.get(number)
+        if stats is None:
+            stats = self.stats[number] = [0] * STAT_COUNT
+            stats[STAT_GAMES] = 1
+        return stats
+
+    def set_level(self, number):
+        self.number = number
+        self.level = self.levels.get(number)
+        self.bombs_dropped = 0
+        self.drop_timer = 0
+        self.drop_interval = self.next_drop_interval()
+        self.planned_drop = -1 # bombs_dropped when the last plan began
+        self.planner.planning = False
+        self.tier = self.level[LEVEL_AI_TIER] if self.ai_tier is None else self.ai_tier
+
+    def next_drop_interval(self):
+        if self.level[LEVEL_DROP_FIXED]:
+            return self.level[LEVEL_DROP_LB]
+        return self.rng.randint(self.level[LEVEL_DROP_LB], self.level[LEVEL_DROP_UB])
+
+    def next_direction_change(self):
+        if self.level[LEVEL_CHANGE_FIXED]:
+            return self.level[LEVEL_CHANGE_LB]
+        return self.rng.randint(self.level[LEVEL_CHANGE_LB], self.level[LEVEL_CHANGE_UB])
+
+    def run(self):
+        """Play one game to the end. Returns (ticks, score, level reached)."""
+        # Bucket and bomber positions are 8.8 fixed point, like code.py's Motion
+        self.bucket_x = (SCREEN_WIDTH // 2 - BUCKET_WIDTH // 2) << FIXED_SHIFT
+        self.bucket_velocity = 0
+        self.held = 0 # Direction the bot is holding
+        self.buckets = MAX_BUCKETS
+        self.score = 0
+        self.next_extra_life = MAX_LIFE_INTERVAL
+        self.bomber_x = BOMBER_START_X << FIXED_SHIFT
+        self.direction = 1
+        self.move_ticks = 0
+        self.change_ticks = 0
+        self.direction_change = 0
+        self.bombs = [] # [pixel x, fixed-point y] pairs
+        self.splash = False # A catch holds the level open while the splash plays
+        self.splash_count = 0
+        self.set_level(1)
+        reached = 1
+        ticks = 0
+
+        while ticks < self.max_ticks:
+            ticks += 1
+            stats = self.level_stats(self.number)
+            stats[STAT_TICKS] += 1
+            cost = BASE_FRAME_COST_US + len(self.bombs) * BOMB_FRAME_COST_US
+            stats[STAT_COST] += cost
+            if cost > stats[STAT_COST_MAX]:
+                stats[STAT_COST_MAX] = cost
+            if cost > FRAME_BUDGET_US:
+                stats[STAT_OVERRUNS] += 1
+
+            if self.bombs_dropped == self.level[LEVEL_BOMB_COUNT] and not self.bombs and not self.splash:
+                self.set_level(self.number + 1)
+                reached = max(reached, self.number)
+                continue
+
+            if ticks % self.key_interval == 0:
+                self.bucket_bot()
+                if self.p2_bot:
+                    self.bomber_bot()
+            if self.p2_bot:
+                if self.drop_timer > 0:
+                    self.drop_timer -= 1
+            elif self.tier:
+                self.plan_bomber(stats)
+                self.drop_ai()
+            else:
+                self.bomber_ai()
+                self.drop_ai()
+
+            self.update_bucket()
+            missed = self.update_bombs(stats)
+            if self.score >= WIN_SCORE:
+                break
+            # As Game.bucket_splash: a later catch doesn't restart a splash already playing
+            if not self.splash:
+                self.splash_count = 0
+            elif self.splash_count < SPLASH_TICKS:
+                self.splash_count += 1
+            else:
+                self.splash_count = 0
+                self.splash = False
+            if missed:
+                self.bombs.clear()
+                self.buckets -= 1
+                if self.buckets <= 0:
+                    break
+                self.set_level(max(self.number - 1, 1))
+        return ticks, self.score, reached
+
+    def bucket_bot(self):
+        """Hold toward the lowest bomb; re-decided every key_interval ticks."""
+        if not self.bombs:
+            target = pixel(self.bomber_x) + BOMBER_WIDTH // 2
+        else:
+            target = max(self.bombs, key=lambda bomb: bomb[1])[0] + BOMB_WIDTH // 2
+        center = pixel(self.bucket_x) + BUCKET_WIDTH // 2
+        if target < center - BUCKET_WIDTH // 4:
+            self.held = -1
+        elif target > center + BUCKET_WIDTH // 4:
+            self.held = 1
+        else:
+            self.held = 0
+
+    def update_bucket(self):
+        """Player.update."""
+        direction = self.held
+        vx = self.bucket_velocity
+        if direction:
+            if vx * direction < 0:
+                vx = 0
+            vx = max(min(vx + direction * BUCKET_ACCEL, BUCKET_MAX_SPEED), -BUCKET_MAX_SPEED)
+        elif vx > 0:
+            vx = max(vx - BUCKET_FRICTION, 0)
+        elif vx < 0:
+            vx = min(vx + BUCKET_FRICTION, 0)
+        self.bucket_velocity = vx
+        if not vx:
+            return
+        self.bucket_x += vx
+        x = pixel(self.bucket_x)
+        if x <= 0 or x > SCREEN_WIDTH - BUCKET_WIDTH:
+            self.bucket_x = min(max(x, 0), SCREEN_WIDTH - BUCKET_WIDTH) << FIXED_SHIFT
+            self.bucket_velocity = 0
+
+    def bomber_bot(self):
+        """P2 bot: run away from the bucket, dropping as fast as the rate limit allows."""
+        velocity = self.level[LEVEL_STEP_VELOCITY]
+        if pixel(self.bucket_x) + BUCKET_WIDTH // 2 < SCREEN_WIDTH // 2:
+            self.bomber_x += velocity
+        else:
+            self.bomber_x -= velocity
+        x = pixel(self.bomber_x)
+        if x <= BOMBER_LEFT_WALL or x >= SCREEN_WIDTH - BOMBER_WIDTH:
+            self.bomber_x = min(max(x, BOMBER_LEFT_WALL), SCREEN_WIDTH - BOMBER_WIDTH) << FIXED_SHIFT
+        if self.drop_timer <= 0:
+            if self.spawn_bomb():
+                self.drop_timer = P2_DROP_TICKS
+
+    def bomber_ai(self):
+        """Bomber.update."""
+        self.move_ticks += 1
+        self.change_ticks += 1
+        if self.direction_change == 0:
+            self.direction_change = self.next_direction_change()
+        if self.move_ticks >= self.level[LEVEL_BOMBER_SPEED]:
+            self.move_ticks = 0
+            self.bomber_x += self.level[LEVEL_STEP_VELOCITY] * self.direction
+            x = pixel(self.bomber_x)
+            if (x <= BOMBER_LEFT_WALL and self.direction < 0) or \
+               (x >= SCREEN_WIDTH - BOMBER_WIDTH and self.direction > 0):
+                self.direction = -self.direction
+                self.change_ticks = 0
+                self.direction_change = self.next_direction_change()
+            if self.change_ticks >= self.direction_change:
+                self.direction = -self.direction
+                self.change_ticks = 0
+                self.direction_change = self.next_direction_change()
+
+    def plan_bomber(self, stats):
+        """Bomber.update for aiTier 1: a slice of planning, then a move toward the planned drop."""
+        planner = self.planner
+        level = self.level
+        if not planner.planning:
+            if self.planned_drop == self.bombs_dropped:
+                return self.move_bomber() # Planned already; replan once this drop is made
+            self.planned_drop = self.bombs_dropped
+            planner.begin(pixel(self.bomber_x), pixel(self.bucket_x), self.bucket_velocity,
+                          level[LEVEL_STEP_VELOCITY], level[LEVEL_BOMBER_SPEED], level[LEVEL_DROP_VELOCITY],
+                          self.drop_interval - self.drop_timer)
+            for bomb in self.bombs:
+                planner.add_bomb(bomb[0], pixel(bomb[1]) + BOMB_HEIGHT)
+        spent = planner.total_ns
+        over = planner.over_budget
+        planner.run()
+        spent = (planner.total_ns - spent) // 1000
+        stats[STAT_AI_FRAMES] += 1
+        stats[STAT_AI_US] += spent
+        if spent > stats[STAT_AI_MAX_US]:
+            stats[STAT_AI_MAX_US] = spent
+        stats[STAT_AI_OVER] += planner.over_budget - over
+        self.move_bomber()
+
+    def move_bomber(self):
+        self.move_ticks += 1
+        if self.move_ticks >= self.level[LEVEL_BOMBER_SPEED]:
+            self.move_ticks = 0
+            self.bomber_x = approach(self.bomber_x, self.planner.target, self.level[LEVEL_STEP_VELOCITY])
+
+    def drop_ai(self):
+        if self.bombs_dropped == self.level[LEVEL_BOMB_COUNT]:
+            return
+        self.drop_timer += 1
+        if self.tier:
+            ready = self.planner.ready_to_drop(pixel(self.bomber_x), self.drop_timer, self.drop_interval)
+        else:
+            ready = self.drop_timer >= self.drop_interval
+        if self.bombs_dropped == 0 or ready:
+            self.spawn_bomb()
+            self.drop_timer = 0
+            self.drop_interval = self.next_drop_interval()
+
+    def spawn_bomb(self):
+        if self.bombs_dropped >= self.level[LEVEL_BOMB_COUNT] or len(self.bombs) >= MAX_BOMBS:
+            return False
+        self.bombs.append([pixel(self.bomber_x), BOMB_START_Y << FIXED_SHIFT])
+        self.bombs_dropped += 1
+        self.level_stats(self.number)[STAT_DROPPED] += 1
+        return True
+
+    def update_bombs(self, stats):
+        """Move, catch and miss like Game.update_bombs. Returns True on a miss."""
+        velocity = self.level[LEVEL_DROP_VELOCITY]
+        left = pixel(self.bucket_x)
+        right = left + BUCKET_WIDTH
+        i = 0
+        while i < len(self.bombs):
+            bomb = self.bombs[i]
+            bomb[1] += velocity
+            x = bomb[0]
+            y = pixel(bomb[1])
+            if x + BOMB_WIDTH >= left and x <= right and y + BOMB_HEIGHT >= BUCKET_TOP and y <= BUCKET_BOTTOM:
+                last = self.bombs.pop() # Swap-remove, in the game's order
+                if i < len(self.bombs):
+                    self.bombs[i] = last
+                stats[STAT_CAUGHT] += 1
+                self.splash = True
+                self.score += self.level[LEVEL_BOMB_SCORE]
+                if self.score >= WIN_SCORE:
+                    return False
+                if self.score >= self.next_extra_life:
+                    self.next_extra_life += MAX_LIFE_INTERVAL
+                    self.buckets = min(self.buckets + 1, MAX_BUCKETS)
+                continue
+            if y + BOMB_HEIGHT > SCREEN_HEIGHT:
+                stats[STAT_MISSED] += 1
+                column = min(x * MISS_COLUMNS // SCREEN_WIDTH, MISS_COLUMNS - 1)
+                stats[STAT_MISS_COLUMN + column] += 1
+                return True
+            i += 1
+        return False
+
+def run_batch(job):
+    """Worker entry point: play games with one seed. Returns (stats, games, ticks, scores)."""
+    seed, games, records, options = job
+    levels = LevelTable(records, MAX_BOMBS)
+    rng = random.Random(seed)
+    totals = {}
+    total_ticks = 0
+    total_score = 0
+    for _ in range(games):
+        sim = Simulation(levels, rng, **options)
+        ticks, score, _ = sim.run()
+        total_ticks += ticks
+        total_score += score
+        merge_stats(totals, sim.stats)
+    return totals, games, total_ticks, total_score
+
+def merge_stats(totals, stats):
+    for number, values in stats.items():
+        merged = totals.get(number)
+        if merged is None:
+            totals[number] = list(values)
+            continue
+        for i in range(STAT_COUNT):
+            if i == STAT_COST_MAX or i == STAT_AI_MAX_US:
+                merged[i] = max(merged[i], values[i])
+            else:
+                merged[i] += values[i]
+
+def run_pool(games, workers, seed, levels_path=None, batch=250, **options):
+    """Spread games over a process pool. Returns (stats, games, ticks, scores)."""
+    from multiprocessing import Pool
+    # Compiled once here; workers get the records, not the file
+    records = load_levels((levels_path,)) if levels_path else load_levels()
+    jobs = []
+    remaining = games
+    while remaining > 0:
+        count = min(batch, remaining)
+        jobs.append((seed + len(jobs), count, records, options))
+        remaining -= count
+    totals = {}
+    played = ticks = scores = 0
+    with Pool(workers) as pool:
+        for stats, count, batch_ticks, batch_score in pool.imap_unordered(run_batch, jobs):
+            merge_stats(totals, stats)
+            played += count
+            ticks += batch_ticks
+            scores += batch_score
+    return totals, played, ticks, scores
+
+def report(totals, games, ticks, scores, out, ai_budget_us=AI_BUDGET_US):
+    out.write(f"games={games} avg_length={ticks / games / 100:.1f}s avg_score={scores / games:.0f}\n")
+    out.write("level  games  bombs     catch%  misses  avg_ticks  avg_cost_us  max_cost_us  overrun%  ai_avg_us  ai_max_us"
+              "  miss_columns\n")
+    for number in sorted(totals):
+        stats = totals[number]
+        dropped = stats[STAT_DROPPED]
+        resolved = stats[STAT_CAUGHT] + stats[STAT_MISSED]
+        catch_rate = 100 * stats[STAT_CAUGHT] / resolved if resolved else 0
+        columns = " ".join(str(count) for count in stats[STAT_MISS_COLUMN:])
+        out.write(f"{number:5d}  {stats[STAT_GAMES]:5d}  {dropped:8d}  {catch_rate:6.2f}  {stats[STAT_MISSED]:6d}"
+                  f"  {stats[STAT_TICKS] // stats[STAT_GAMES]:9d}  {stats[STAT_COST] // stats[STAT_TICKS]:11d}"
+                  f"  {stats[STAT_COST_MAX]:11d}  {100 * stats[STAT_OVERRUNS] / stats[STAT_TICKS]:8.2f}"
+                  f"  {stats[STAT_AI_US] // max(stats[STAT_AI_FRAMES], 1):9d}  {stats[STAT_AI_MAX_US]:9d}  {columns}\n")
+    # Miss rate with the predictive bomber against the random walk, over the levels each played
+    outcomes = [[0, 0], [0, 0]] # [missed, resolved] for random walk, predictive
+    planned = planned_us = planned_max = over = 0
+    for stats in totals.values():
+        tier = 1 if stats[STAT_AI_FRAMES] else 0
+        outcomes[tier][0] += stats[STAT_MISSED]
+        outcomes[tier][1] += stats[STAT_CAUGHT] + stats[STAT_MISSED]
+        planned += stats[STAT_AI_FRAMES]
+        planned_us += stats[STAT_AI_US]
+        planned_max = max(planned_max, stats[STAT_AI_MAX_US])
+        over += stats[STAT_AI_OVER]
+    rates = ["-" if resolved == 0 else f"{100 * missed / resolved:.2f}%" for missed, resolved in outcomes]
+    out.write(f"bomber ai: budget={ai_budget_us}us/tick planned_ticks={planned} avg={planned_us // max(planned, 1)}us"
+              f" max={planned_max}us over_budget={over} miss_rate={rates[1]} (random walk {rates[0]})\n")
+
+def write_csv(totals, path):
+    with open(path, "w") as csv_file:
+        csv_file.write("level,games,dropped,caught,missed,ticks,cost_us,max_cost_us,overruns,"
+                       "ai_ticks,ai_us,ai_max_us,ai_over_budget,"
+                       + ",".join(f"miss_col{i}" for i in range(MISS_COLUMNS)) + "\n")
+        for number in sorted(totals):
+            csv_file.write(f"{number}," + ",".join(str(value) for value in totals[number]) + "\n")
+
+# --- Host-side harness: python selfplay.py --games 10000 ---
+if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+    import time
+    parser = argparse.ArgumentParser(description="Balance levels.json with headless bot games.")
+    parser.add_argument("--games", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--levels", help="levels.json to test (default: the one load_levels finds)")
+    parser.add_argument("--key-interval", type=int, default=3, help="ticks between bucket bot decisions")
+    parser.add_argument("--p2", action="store_true", help="use a P2 bomber bot instead of the 1P AI")
+    parser.add_argument("--ai-tier", type=int, choices=(0, 1), help="bomber AI on every level (default: each level's aiTier)")
+    parser.add_argument("--ai-budget", type=int, default=AI_BUDGET_US, help="bomber planning time per tick, in us")
+    parser.add_argument("--max-ticks", type=int, default=200000, help="cut off games longer than this")
+    parser.add_argument("--csv", help="also write per-level totals to this file")
+    args = parser.parse_args()
+
+    start = time.monotonic()
+    totals, games, ticks, scores = run_pool(args.games, args.workers, args.seed, args.levels,
+                                            key_interval=args.key_interval, p2_bot=args.p2,
+                                            max_ticks=args.max_ticks, ai_tier=args.ai_tier,
+                                            ai_budget_us=args.ai_budget)
+    report(totals, games, ticks, scores, sys.stdout, args.ai_budget)
+    bombs = sum(stats[STAT_DROPPED] for stats in totals.values())
+    print(f"{bombs} bombs simulated in {time.monotonic() - start:.1f}s")
+    if args.csv:
+        write_csv(totals, args.csv)
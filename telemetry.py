@@ -0,0 +1,173 @@
+import struct
+import time
+import array
+
+# --- Telemetry Constants ---
+EVENT_BOOT = 0
+EVENT_SPAWN = 1 # x = bomb x, value = bombs dropped this level
+EVENT_CATCH = 2 # x = bomb x, value = score after the catch
+EVENT_MISS = 3 # x = bomb x, value = buckets before the miss
+EVENT_LEVEL = 4 # level = new level, value = bombs in the level
+EVENT_OVERRUN = 5 # value = frame time in microseconds
+EVENT_QUALITY = 6 # x = average frame time in microseconds, value = new quality level
+EVENT_FRAMESKIP = 7 # End of a round: x = longest run of skipped refreshes, value = refreshes skipped
+EVENT_NAMES = ("boot", "spawn", "catch", "miss", "level", "overrun", "quality", "frameskip")
+
+# frame, event, level, x, value
+RECORD_FORMAT = "<IBBHI"
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+TELEMETRY_RECORDS = 512
+TELEMETRY_PATH = "/sd/telemetry.bin"
+
+# --- Telemetry Class ---
+class Telemetry:
+    """Binary gameplay event log backed by a preallocated ring buffer.
+
+    log() only packs a fixed-size record into the buffer. Nothing touches
+    the filesystem until flush(), which the game calls from idle states, and
+    which writes the buffered records in at most two large blocks. When the
+    buffer fills before a flush the oldest records are overwritten and
+    counted in dropped.
+    """
+    def __init__(self, path=TELEMETRY_PATH, records=TELEMETRY_RECORDS):
+        self.path = path
+        self.records = records
+        self.buffer = bytearray(records * RECORD_SIZE)
+        self.view = memoryview(self.buffer)
+        self.head = 0 # Next record index to write
+        self.count = 0
+        self.dropped = 0
+        self.enabled = True
+
+    def log(self, frame, event, level, x=0, value=0):
+        struct.pack_into(RECORD_FORMAT, self.buffer, self.head * RECORD_SIZE,
+                         frame & 0xFFFFFFFF, event, level & 0xFF, x & 0xFFFF, value & 0xFFFFFFFF)
+        self.head += 1
+        if self.head == self.records:
+            self.head = 0
+        if self.count < self.records:
+            self.count += 1
+        else:
+            self.dropped += 1
+
+    def flush(self):
+        """Append buffered records to the log file. Call only from idle states."""
+        if not self.count or not self.enabled:
+            return
+        first = (self.head - self.count) % self.records
+        try:
+            with open(self.path, "ab") as log_file:
+                if first + self.count <= self.records:
+                    log_file.write(self.view[first * RECORD_SIZE:(first + self.count) * RECORD_SIZE])
+                else:
+                    log_file.write(self.view[first * RECORD_SIZE:])
+                    log_file.write(self.view[:self.head * RECORD_SIZE])
+        except OSError as e:
+            # No SD card or read-only filesystem: stop trying
+            print(f"Telemetry disabled: {e}")
+            self.enabled = False
+        self.count = 0
+
+# --- Input Latency ---
+# Hops a key press passes through, in order
+HOP_AVAILABLE = 0 # Input bytes or a HID report seen by read_input
+HOP_DECODED = 1 # process_keyboard_input recognized a movement key
+HOP_APPLIED = 2 # The sprite's pixel position changed
+HOP_REFRESHED = 3 # The next display refresh returned
+LATENCY_STAGES = ("decode", "apply", "display", "total") # Intervals between hops
+LATENCY_BUCKET_US = 250
+LATENCY_BUCKETS = 256 # The last bucket also counts everything slower (64 ms+)
+
+class LatencyHistogram:
+    """Fixed-width microsecond buckets; recording never allocates."""
+    def __init__(self, name):
+        self.name = name
+        self.counts = array.array("L", [0] * LATENCY_BUCKETS)
+        self.count = 0
+        self.max_us = 0
+
+    def add(self, us):
+        self.counts[min(us // LATENCY_BUCKET_US, LATENCY_BUCKETS - 1)] += 1
+        self.count += 1
+        if us > self.max_us:
+            self.max_us = us
+
+    def percentile(self, percent):
+        """Upper edge, in microseconds, of the bucket holding the given percentile."""
+        if not self.count:
+            return 0
+        target = (self.count * percent + 99) // 100
+        seen = 0
+        for bucket in range(LATENCY_BUCKETS):
+            seen += self.counts[bucket]
+            if seen >= target:
+                return (bucket + 1) * LATENCY_BUCKET_US
+        return self.max_us
+
+class LatencyTracker:
+    """Times one key press at a time from input to the refresh that shows it.
+
+    mark() stamps each hop as it happens. When the refresh after a state
+    change arrives, the intervals between hops go into one histogram per
+    stage. A press that hasn't moved anything by the next refresh (a key
+    that isn't movement, or the bucket against a wall) is dropped.
+    """
+    def __init__(self, clock=None):
+        self.clock = clock or time.monotonic_ns
+        self.stamps = [0] * 4
+        self.reached = -1 # Last hop stamped for the press being timed
+        self.histograms = [LatencyHistogram(name) for name in LATENCY_STAGES]
+
+    def mark(self, hop):
+        if hop == HOP_AVAILABLE:
+            if self.reached >= 0:
+                return # Already timing a press this frame
+        elif hop != self.reached + 1:
+            if hop == HOP_REFRESHED:
+                self.reached = -1 # Nothing moved
+            return
+        self.stamps[hop] = self.clock()
+        self.reached = hop
+        if hop == HOP_REFRESHED:
+            stamps = self.stamps
+            for stage in range(3):
+                self.histograms[stage].add((stamps[stage + 1] - stamps[stage]) // 1000)
+            self.histograms[3].add((stamps[HOP_REFRESHED] - stamps[HOP_AVAILABLE]) // 1000)
+            self.reached = -1
+
+    def report(self, out=None):
+        """Print p50/p95/p99 per stage, in microseconds."""
+        for histogram in self.histograms:
+            line = (f"latency {histogram.name}: n={histogram.count} p50={histogram.percentile(50)} "
+                    f"p95={histogram.percentile(95)} p99={histogram.percentile(99)} max={histogram.max_us}")
+            if out is None:
+                print(line)
+            else:
+                out.write(line + "\n")
+
+    def write_csv(self, path):
+        """Bucket counts per stage, for headless runs."""
+        with open(path, "w") as csv_file:
+            csv_file.write("bucket_us," + ",".join(LATENCY_STAGES) + "\n")
+            for bucket in range(LATENCY_BUCKETS):
+                counts = ",".join(str(histogram.counts[bucket]) for histogram in self.histograms)
+                csv_file.write(f"{bucket * LATENCY_BUCKET_US},{counts}\n")
+
+def decode(log_bytes):
+    """Yield (frame, event_name, level, x, value) for every record in a log."""
+    for offset in range(0, len(log_bytes) - RECORD_SIZE + 1, RECORD_SIZE):
+        frame, event, level, x, value = struct.unpack_from(RECORD_FORMAT, log_bytes, offset)
+        name = EVENT_NAMES[event] if event < len(EVENT_NAMES) else str(event)
+        yield frame, name, level, x, value
+
+# --- Host-side decoder: python telemetry.py telemetry.bin > telemetry.csv ---
+if __name__ == "__main__":
+    import sys
+    with open(sys.argv[1], "rb") as log_file:
+        data = log_file.read()
+    out = open(sys.argv[2], "w") if len(sys.argv) > 2 else sys.stdout
+    out.write("frame,event,level,x,value\n")
+    for record in decode(data):
+        out.write("%d,%s,%d,%d,%d\n" % record)
+    if out is not sys.stdout:
+        out.close()
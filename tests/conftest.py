@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The game modules live at the top of the repo, next to code.py
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,135 @@
+from hidinput import (KeyboardInput, GamepadInput, HeldKeys, ReplayDevice,
+                      USBError, KEY_HOLD_TICKS)
+
+# Boot keyboard usages
+A, D, SPACE, RIGHT, LEFT = 0x04, 0x07, 0x2C, 0x4F, 0x50
+MOVE_KEYS = ("a", "d", "\x1b[D", "\x1b[C")
+
+
+def keyboard_report(*usages):
+    report = bytearray(8)
+    report[2:2 + len(usages)] = bytes(usages)
+    return report
+
+
+def gamepad_report(x=0x7F, buttons=0x00, extra=0x00):
+    """SNES-style pad: d-pad x on byte 3, face buttons on byte 5, Select/Start on byte 6."""
+    return bytes((0x01, 0x7F, 0x7F, x, 0x7F, buttons, extra, 0x00))
+
+
+class UnpluggedDevice(ReplayDevice):
+    """Plays its reports, then fails like a device pulled from the port."""
+    def read(self, endpoint, buffer, timeout=None):
+        if not self.reports:
+            raise USBError("No such device")
+        return super().read(endpoint, buffer, timeout)
+
+
+def read_all(source, polls):
+    return [source.read() for _ in range(polls)]
+
+
+def test_keyboard_reports_each_press_once():
+    device = ReplayDevice([
+        keyboard_report(A),
+        keyboard_report(A), # Still down: no repeat
+        keyboard_report(A, D),
+        keyboard_report(D),
+        keyboard_report(),
+        keyboard_report(A),
+    ])
+    assert read_all(KeyboardInput(device), 7) == ["a", "", "d", "", "", "a", ""]
+
+
+def test_keyboard_maps_arrows_and_ignores_unknown_usages():
+    device = ReplayDevice([keyboard_report(RIGHT, 0x3A), keyboard_report(LEFT, SPACE)])
+    assert read_all(KeyboardInput(device), 2) == ["\x1b[C", "\x1b[D "]
+
+
+def test_keyboard_is_held_until_released():
+    keyboard = KeyboardInput(ReplayDevice([keyboard_report(D), keyboard_report(D), keyboard_report()]))
+    keyboard.read()
+    assert keyboard.is_held("d")
+    assert not keyboard.is_held("a")
+    keyboard.read()
+    assert keyboard.is_held("d")
+    keyboard.read()
+    assert not keyboard.is_held("d")
+
+
+def test_keyboard_held_state_survives_a_poll_without_a_report():
+    keyboard = KeyboardInput(ReplayDevice([keyboard_report(A)]))
+    keyboard.read()
+    assert keyboard.read() == "" # Timeout: nothing new
+    assert keyboard.is_held("a")
+
+
+def test_gamepad_reports_each_press_once():
+    device = ReplayDevice([
+        gamepad_report(x=0x00),
+        gamepad_report(x=0x00),
+        gamepad_report(x=0xFF),
+        gamepad_report(buttons=0x20),
+        gamepad_report(buttons=0x20 | 0x40),
+        gamepad_report(extra=0x10),
+        gamepad_report(),
+    ])
+    assert read_all(GamepadInput(device), 7) == ["a", "", "d", " ", "1", "r", ""]
+
+
+def test_gamepad_is_held_until_released():
+    pad = GamepadInput(ReplayDevice([gamepad_report(x=0xFF), gamepad_report()]))
+    pad.read()
+    assert pad.is_held("d")
+    assert not pad.is_held("a")
+    pad.read()
+    assert not pad.is_held("d")
+
+
+def test_usb_error_disables_the_device():
+    keyboard = KeyboardInput(UnpluggedDevice([keyboard_report(A)]))
+    assert keyboard.read() == "a"
+    assert keyboard.enabled
+    assert keyboard.read() == ""
+    assert not keyboard.enabled
+    keyboard.device.reports.append(keyboard_report(D))
+    assert keyboard.read() == "" # Never polled again
+    assert keyboard.device.reports
+
+
+def test_held_keys_serial_timer_runs_out():
+    held = HeldKeys(MOVE_KEYS)
+    held.press("a")
+    for _ in range(KEY_HOLD_TICKS):
+        assert held.is_held("a")
+        held.tick()
+    assert not held.is_held("a")
+
+
+def test_held_keys_release_clears_serial_keys():
+    held = HeldKeys(MOVE_KEYS)
+    held.press("d")
+    held.press("\x1b[C")
+    held.release()
+    assert not held.is_held("d")
+    assert not held.is_held("\x1b[C")
+
+
+def test_held_keys_follow_usb_releases():
+    keyboard = KeyboardInput(ReplayDevice([keyboard_report(D), keyboard_report()]))
+    held = HeldKeys(MOVE_KEYS, devices=[keyboard])
+    keyboard.read()
+    assert held.direction("a", "d") == 1
+    keyboard.read()
+    assert not held.is_held("d") # No serial hold timer to wait out
+    assert held.direction("a", "d") == 0
+
+
+def test_held_keys_combine_sources():
+    pad = GamepadInput(ReplayDevice([gamepad_report(x=0x00)]))
+    held = HeldKeys(MOVE_KEYS, devices=[pad])
+    pad.read()
+    assert held.direction("a", "d") == -1
+    held.press("d") # Serial right at the same time cancels out
+    assert held.direction("a", "d") == 0
+    assert held.direction("\x1b[D", "\x1b[C") == 0
@@ -0,0 +1,139 @@
+import pytest
+
+from highscores import HighScoreTable, RECORD_SIZE, HIGH_SCORE_ENTRIES
+
+SLOTS = 4
+
+
+def make_nvm(slots=SLOTS):
+    """A bytearray standing in for microcontroller.nvm, erased to 0xFF."""
+    return bytearray(b"\xff" * (slots * RECORD_SIZE))
+
+
+def slot_bytes(nvm, slot):
+    return nvm[slot * RECORD_SIZE:(slot + 1) * RECORD_SIZE]
+
+
+def test_blank_nvm_is_empty():
+    table = HighScoreTable(make_nvm())
+    assert table.entries == []
+    assert table.best() == 0
+    assert table.slot == -1
+
+
+def test_region_too_small():
+    with pytest.raises(ValueError):
+        HighScoreTable(bytearray(RECORD_SIZE - 1))
+
+
+def test_submit_rotates_slots_and_reloads():
+    nvm = make_nvm()
+    table = HighScoreTable(nvm)
+    for i in range(SLOTS + 2):
+        table.submit(100 + i, 1, 1)
+        assert table.slot == i % SLOTS
+        assert table.sequence == i + 1
+    reloaded = HighScoreTable(nvm)
+    assert reloaded.slot == (SLOTS + 1) % SLOTS
+    assert reloaded.sequence == SLOTS + 2
+    assert reloaded.entries == table.entries
+    assert reloaded.best() == 100 + SLOTS + 1
+
+
+def test_submit_ranks_and_keeps_the_top_entries():
+    table = HighScoreTable(make_nvm())
+    assert table.submit(50, 2, 1) == 0
+    assert table.submit(80, 3, 2) == 0
+    assert table.submit(60, 2, 1) == 1
+    for score in (10, 20, 30):
+        table.submit(score, 1, 1)
+    assert len(table.entries) == HIGH_SCORE_ENTRIES
+    assert [e[0] for e in table.entries] == [80, 60, 50, 30, 20]
+    assert table.submit(5, 1, 1) == -1 # Doesn't place, nothing written
+    assert table.sequence == 6
+    assert table.submit(0, 1, 1) == -1
+
+
+def test_levels_past_255_are_clamped():
+    nvm = make_nvm()
+    HighScoreTable(nvm).submit(100, 300, 1)
+    assert HighScoreTable(nvm).entries == [(100, 255, 1)]
+
+
+def test_newest_valid_slot_wins_regardless_of_position():
+    nvm = make_nvm()
+    table = HighScoreTable(nvm)
+    for score in (10, 20, 30, 40, 50, 60): # Slots 0, 1 now hold the newest two
+        table.submit(score, 1, 1)
+    reloaded = HighScoreTable(nvm)
+    assert reloaded.slot == 1
+    assert reloaded.best() == 60
+
+
+def test_torn_record_falls_back_to_previous_table():
+    nvm = make_nvm()
+    table = HighScoreTable(nvm)
+    table.submit(10, 1, 1)
+    table.submit(20, 1, 1)
+    # Power lost halfway through the write into slot 1
+    start = RECORD_SIZE + RECORD_SIZE // 2
+    nvm[start:2 * RECORD_SIZE] = b"\xff" * (2 * RECORD_SIZE - start)
+    reloaded = HighScoreTable(nvm)
+    assert reloaded.slot == 0
+    assert reloaded.sequence == 1
+    assert reloaded.entries == [(10, 1, 1)]
+
+
+def test_bad_crc_and_bad_magic_are_skipped():
+    nvm = make_nvm()
+    table = HighScoreTable(nvm)
+    table.submit(10, 1, 1)
+    table.submit(20, 1, 1)
+    table.submit(30, 1, 1)
+    nvm[2 * RECORD_SIZE + 6] ^= 0x01 # Flip a bit in the newest record's body
+    nvm[RECORD_SIZE] = 0x00 # And break the magic byte of the one before it
+    reloaded = HighScoreTable(nvm)
+    assert reloaded.slot == 0
+    assert reloaded.best() == 10
+
+
+def test_next_write_goes_after_the_newest_valid_slot():
+    nvm = make_nvm()
+    table = HighScoreTable(nvm)
+    table.submit(10, 1, 1)
+    table.submit(20, 1, 1)
+    nvm[RECORD_SIZE + 6] ^= 0x01 # Corrupt slot 1
+    reloaded = HighScoreTable(nvm)
+    reloaded.submit(30, 1, 1)
+    assert reloaded.slot == 1 # Overwrites the corrupt record
+    assert reloaded.sequence == 2
+    assert bytes(slot_bytes(nvm, 2)) == b"\xff" * RECORD_SIZE
+    assert [e[0] for e in HighScoreTable(nvm).entries] == [30, 10]
+
+
+def test_sequence_wrap():
+    nvm = make_nvm()
+    table = HighScoreTable(nvm)
+    table.sequence = 0xFFFFFFFD # As if the log had been written ~4 billion times
+    table.submit(10, 1, 1)
+    table.submit(20, 1, 1)
+    table.submit(30, 1, 1) # Sequence wraps to 0 here
+    table.submit(40, 1, 1)
+    assert table.sequence == 1
+    reloaded = HighScoreTable(nvm)
+    assert reloaded.slot == table.slot
+    assert reloaded.sequence == 1
+    assert reloaded.best() == 40
+    reloaded.submit(50, 1, 1)
+    assert reloaded.sequence == 2
+    assert HighScoreTable(nvm).best() == 50
+
+
+def test_offset_region_leaves_the_rest_of_nvm_alone():
+    nvm = bytearray(b"\xab" * 16) + make_nvm() + bytearray(b"\xcd" * 16)
+    table = HighScoreTable(nvm, offset=16, length=SLOTS * RECORD_SIZE)
+    for score in range(1, 10):
+        table.submit(score * 10, 1, 1)
+    assert nvm[:16] == b"\xab" * 16
+    assert nvm[-16:] == b"\xcd" * 16
+    assert HighScoreTable(nvm, offset=16, length=SLOTS * RECORD_SIZE).best() == 90